@@ -33,6 +33,7 @@ setup(
         "pyperclip",
         "PyYAML",
         "Faker",
+        "cryptography",
     ],
     entry_points={
         "console_scripts": [
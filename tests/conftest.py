@@ -0,0 +1,49 @@
+import pytest
+
+PASSWORD = "correct horse 'battery'"
+# SQLCipher default KDF makes every connect slow
+KDF_ITER = 4000
+
+
+def make_account(item, url="", username="", password="secret", date=1600000000):
+    from twopasswords.utils.database import Account
+
+    return Account(item, url, username, password, "", date, date)
+
+
+@pytest.fixture
+def fast_kdf(monkeypatch):
+    from twopasswords.utils import database
+
+    monkeypatch.setitem(database.database_settings, "kdf_iter", KDF_ITER)
+    return KDF_ITER
+
+
+@pytest.fixture
+def db_path(tmp_path, fast_kdf):
+    from twopasswords.utils.database import create_db
+
+    path: str = str(tmp_path / "test.db")
+    create_db(path, PASSWORD, to_create=True)
+    return path
+
+
+@pytest.fixture
+def database(db_path):
+    from twopasswords.utils.database import DatabaseEngine
+
+    engine = DatabaseEngine(db_path, PASSWORD)
+    yield engine
+    engine.close()
+
+
+@pytest.fixture
+def keyed_database(db_path):
+    # other connections are reopened with a raw session key
+    from twopasswords.utils.database import DatabaseEngine
+    from twopasswords.utils.session_key import SessionKey
+
+    session_key = SessionKey.derive(db_path, PASSWORD, KDF_ITER)
+    engine = DatabaseEngine(db_path, session_key=session_key)
+    yield engine
+    engine.close()
@@ -0,0 +1,126 @@
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip("sqlcipher3")
+
+from sqlcipher3 import dbapi2 as sqlite3
+
+from twopasswords.utils.async_database import AsyncDatabaseEngine
+
+from conftest import make_account
+
+
+def test_calls_run_in_order(keyed_database):
+    async def scenario():
+        async with AsyncDatabaseEngine(keyed_database, max_pending=2) as engine:
+            ids: list = await asyncio.gather(
+                *(engine.add_account(make_account(f"item {i}")) for i in range(10))
+            )
+            accounts: list = await engine.get_all_accounts()
+        return ids, accounts
+
+    ids, accounts = asyncio.run(scenario())
+    assert ids == sorted(ids)
+    assert [account.item for account in accounts] == [f"item {i}" for i in range(10)]
+
+
+def test_import_progress_runs_on_event_loop(keyed_database, tmp_path):
+    filename: str = str(tmp_path / "accounts.json")
+
+    async def scenario():
+        progress: list = []
+
+        def on_progress(processed):
+            # get_running_loop raises outside of an event loop thread
+            asyncio.get_running_loop()
+            progress.append(processed)
+
+        accounts: list = [make_account(f"item {i}") for i in range(5)]
+        async with AsyncDatabaseEngine(keyed_database) as engine:
+            summary: tuple = await engine.import_accounts(accounts, 2, on_progress)
+            exported: int = await engine.export_json(filename)
+            # progress callbacks are scheduled, let them run
+            await asyncio.sleep(0)
+        return summary, exported, progress
+
+    summary, exported, progress = asyncio.run(scenario())
+    assert summary == (5, 0, 0)
+    assert exported == 5
+    assert progress == [2, 4, 5]
+
+
+def test_failed_write_is_rolled_back(keyed_database):
+    async def scenario():
+        async with AsyncDatabaseEngine(keyed_database) as engine:
+            await engine.add_account(make_account("a", "https://x.com", "bob"))
+            with pytest.raises(sqlite3.IntegrityError):
+                await engine.add_account(make_account("b", "https://x.com", "bob"))
+            return await engine.get_all_accounts()
+
+    assert [account.item for account in asyncio.run(scenario())] == ["a"]
+
+
+LONG_QUERY = """WITH RECURSIVE numbers (n) AS (
+SELECT 1 UNION ALL SELECT n + 1 FROM numbers WHERE n < 10000000000
+) SELECT count(*) FROM numbers"""
+
+
+def test_cancel_interrupts_only_running_call(keyed_database):
+    started = threading.Event()
+    errors: list = []
+
+    def endless(engine):
+        started.set()
+        try:
+            return engine.cursor.execute(LONG_QUERY).fetchone()
+        except sqlite3.OperationalError as error:
+            errors.append(error)
+            raise
+
+    async def scenario():
+        async with AsyncDatabaseEngine(keyed_database) as engine:
+            task = asyncio.ensure_future(engine._run(endless))
+            # next call is queued behind the interrupted one
+            queued = asyncio.ensure_future(engine.add_account(make_account("a")))
+            await asyncio.to_thread(started.wait, 5)
+            # let the query start, interrupt is a no-op before that
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            await queued
+            return await engine.get_all_accounts()
+
+    accounts: list = asyncio.run(asyncio.wait_for(scenario(), 10))
+    assert "interrupted" in str(errors[0])
+    assert [account.item for account in accounts] == ["a"]
+
+
+def test_cancelled_call_keeps_slot_until_it_stops(keyed_database):
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking(engine):
+        started.set()
+        release.wait(5)
+
+    async def scenario():
+        async with AsyncDatabaseEngine(keyed_database, max_pending=1) as engine:
+            task = asyncio.ensure_future(engine._run(blocking))
+            await asyncio.to_thread(started.wait, 5)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+            # call is still running, so no other call may be queued
+            waiting = asyncio.ensure_future(engine.get_all_accounts())
+            await asyncio.sleep(0.05)
+            assert not waiting.done()
+            assert engine._pending.locked()
+
+            release.set()
+            return await waiting
+
+    assert asyncio.run(asyncio.wait_for(scenario(), 10)) == []
@@ -0,0 +1,114 @@
+import os
+
+import pytest
+
+pytest.importorskip("sqlcipher3")
+pytest.importorskip("cryptography")
+
+from twopasswords.utils import backup
+from twopasswords.utils.backup import (
+    HEADER,
+    MAX_KDF_ITER,
+    iter_backup,
+    restore_backup,
+    write_backup,
+)
+from twopasswords.utils.database import Account
+
+from conftest import make_account
+
+BACKUP_PASSWORD = "backup password"
+KDF_ITER = 1000
+
+ACCOUNTS: list = [
+    Account("plain", "https://a.com", "bob", "p1", "", 1600000000, 1600000100),
+    Account("unicode é ✓", "https://c.com", "é", "✓", "a\nb", 1, 2),
+    Account(None, None, None, "nulls", None, 1600000000, 1600000000),
+    Account("", "", "", "", "", 0, 0),
+]
+
+
+def fields(accounts) -> list:
+    return [account.as_dict() for account in accounts]
+
+
+@pytest.fixture
+def source(database):
+    database.load_accounts(ACCOUNTS)
+    return database
+
+
+@pytest.mark.parametrize("compression", ["zlib", "lzma", "none"])
+def test_backup_round_trip(source, tmp_path, compression):
+    filename: str = str(tmp_path / "accounts.2pw")
+    written: int = write_backup(
+        source, filename, BACKUP_PASSWORD, compression, kdf_iter=KDF_ITER
+    )
+
+    assert written == len(ACCOUNTS)
+    assert fields(iter_backup(filename, BACKUP_PASSWORD)) == fields(ACCOUNTS)
+
+
+def test_backup_of_many_blocks(database, tmp_path, monkeypatch):
+    monkeypatch.setattr(backup, "BLOCK_SIZE", 256)
+    accounts: list = [make_account(f"item {index}") for index in range(100)]
+    database.load_accounts(accounts)
+    filename: str = str(tmp_path / "accounts.2pw")
+    write_backup(database, filename, BACKUP_PASSWORD, kdf_iter=KDF_ITER)
+
+    assert fields(iter_backup(filename, BACKUP_PASSWORD)) == fields(accounts)
+
+    # every truncation is detected, not only a cut inside a block
+    with open(filename, "rb") as backup_file:
+        data: bytes = backup_file.read()
+    for size in range(HEADER.size, len(data), 97):
+        with open(filename, "wb") as backup_file:
+            backup_file.write(data[:size])
+        with pytest.raises(ValueError):
+            list(iter_backup(filename, BACKUP_PASSWORD))
+
+
+def test_backup_rejects_wrong_password_and_changes(source, tmp_path):
+    filename: str = str(tmp_path / "accounts.2pw")
+    write_backup(source, filename, BACKUP_PASSWORD, kdf_iter=KDF_ITER)
+    with pytest.raises(ValueError, match="password"):
+        list(iter_backup(filename, "wrong password"))
+
+    with open(filename, "rb") as backup_file:
+        data: bytearray = bytearray(backup_file.read())
+    # flipped byte in a block and data after the last block
+    for changed in (data[:-1] + bytes([data[-1] ^ 1]), data + b"\0"):
+        with open(filename, "wb") as backup_file:
+            backup_file.write(changed)
+        with pytest.raises(ValueError):
+            list(iter_backup(filename, BACKUP_PASSWORD))
+
+
+def test_backup_kdf_iterations_are_bounded(source, tmp_path):
+    filename: str = str(tmp_path / "accounts.2pw")
+    for kdf_iter in (0, MAX_KDF_ITER + 1):
+        with pytest.raises(ValueError):
+            write_backup(source, filename, BACKUP_PASSWORD, kdf_iter=kdf_iter)
+    assert not os.path.exists(filename)
+
+    # header with a huge iteration count fails before key derivation
+    write_backup(source, filename, BACKUP_PASSWORD, kdf_iter=KDF_ITER)
+    with open(filename, "rb") as backup_file:
+        data: bytes = backup_file.read()
+    magic, version, compression, _, salt = HEADER.unpack(data[: HEADER.size])
+    header: bytes = HEADER.pack(magic, version, compression, 2**32 - 1, salt)
+    with open(filename, "wb") as backup_file:
+        backup_file.write(header + data[HEADER.size :])
+    with pytest.raises(ValueError, match="KDF"):
+        list(iter_backup(filename, BACKUP_PASSWORD))
+
+
+def test_restore_backup_loads_empty_and_merges_non_empty(source, tmp_path):
+    filename: str = str(tmp_path / "accounts.2pw")
+    write_backup(source, filename, BACKUP_PASSWORD, kdf_iter=KDF_ITER)
+
+    # non-empty Database is merged: known logins are skipped
+    assert restore_backup(source, filename, BACKUP_PASSWORD) == (2, 0, 2)
+
+    source.clear_database()
+    assert restore_backup(source, filename, BACKUP_PASSWORD) == (len(ACCOUNTS), 0, 0)
@@ -0,0 +1,304 @@
+import pytest
+
+pytest.importorskip("sqlcipher3")
+
+from sqlcipher3 import dbapi2 as sqlite3
+
+from twopasswords.utils import database as database_module
+from twopasswords.utils import timestamps
+from twopasswords.utils.account_cache import AccountCache
+from twopasswords.utils.database import MIGRATIONS, DatabaseEngine, create_db
+
+from conftest import make_account
+
+OLD_ROWS: list = [
+    (1, "older", "https://x.com", "bob", "p1", "2021-01-01 10:00:00"),
+    (2, "tie lower id", "https://x.com", "bob", "p2", "2021-06-01 10:00:00"),
+    (3, "tie higher id", "https://x.com", "bob", "p3", "2021-06-01 10:00:00"),
+    (4, "note one", "", "", "n1", "2021-01-01 10:00:00"),
+    (5, "note two", "", "", "n2", "2021-01-01 10:00:00"),
+    (6, "bad date", "https://y.com", "bob", "p6", "not a date"),
+]
+
+
+@pytest.fixture
+def old_db_path(tmp_path, monkeypatch):
+    # schema version 2 Database with TEXT dates and duplicate logins
+    path: str = str(tmp_path / "old.db")
+    with monkeypatch.context() as patch:
+        patch.setattr(database_module, "MIGRATIONS", MIGRATIONS[:2])
+        create_db(path, None, to_create=True)
+
+    connection = sqlite3.connect(path)
+    connection.executemany(
+        "INSERT INTO accounts VALUES (?, ?, ?, ?, ?, '', ?, ?)",
+        [row + (row[-1],) for row in OLD_ROWS],
+    )
+    connection.commit()
+    connection.close()
+    return path
+
+
+def test_migrations_move_duplicate_logins(old_db_path):
+    engine = DatabaseEngine(old_db_path)
+    try:
+        version: int = engine.cursor.execute("PRAGMA user_version").fetchone()[0]
+        assert version == len(MIGRATIONS)
+        assert engine.moved_conflicts == 2
+        assert engine.count_conflicts() == 2
+
+        kept: list = engine.cursor.execute(
+            "SELECT id FROM accounts ORDER BY id"
+        ).fetchall()
+        moved: list = engine.cursor.execute(
+            "SELECT id, password FROM accounts_conflicts ORDER BY id"
+        ).fetchall()
+        # empty logins are not logins, both notes are kept
+        assert kept == [(3,), (4,), (5,), (6,)]
+        assert moved == [(1, "p1"), (2, "p2")]
+    finally:
+        engine.close()
+
+    # migrated Database does not move anything on the next connect
+    engine = DatabaseEngine(old_db_path)
+    assert engine.moved_conflicts == 0
+    engine.close()
+
+
+def test_migrations_convert_dates_to_unix_time(old_db_path):
+    before: int = timestamps.now()
+    engine = DatabaseEngine(old_db_path)
+    try:
+        dates: dict = {
+            row[0]: row[1:]
+            for row in engine.cursor.execute(
+                "SELECT id, date_created, date_modified FROM accounts"
+            )
+        }
+        expected: int = timestamps.parse_date("2021-06-01 10:00:00")
+        assert dates[3] == (expected, expected)
+        # unparsable dates are set to migration time
+        assert before <= dates[6][0] <= timestamps.now()
+
+        conflict_dates: list = engine.cursor.execute(
+            "SELECT date_modified FROM accounts_conflicts ORDER BY id"
+        ).fetchall()
+        assert conflict_dates == [
+            (timestamps.parse_date("2021-01-01 10:00:00"),),
+            (expected,),
+        ]
+    finally:
+        engine.close()
+
+
+def test_unique_login_allows_empty_logins(database):
+    database.add_account(make_account("a", "https://x.com", "bob"))
+    database.add_account(make_account("note"))
+    database.add_account(make_account("another note"))
+    database.safe_push()
+
+    with pytest.raises(sqlite3.IntegrityError):
+        database.add_account(make_account("b", "https://x.com", "bob"))
+    database.connection.rollback()
+    assert database.cursor.execute("SELECT count(*) FROM accounts").fetchone() == (3,)
+
+
+def test_add_accounts_inserts_in_chunks(database):
+    progress: list = []
+    accounts = (make_account(f"item {index}") for index in range(5))
+    assert database.add_accounts(accounts, 2, progress.append) == 5
+    assert progress == [2, 4, 5]
+
+    duplicates: list = [
+        make_account("a", "https://x.com", "bob"),
+        make_account("b", "https://x.com", "bob"),
+        make_account("note"),
+    ]
+    assert database.add_accounts(duplicates, skip_duplicates=True) == 2
+    # failed chunk is rolled back, committed chunks stay
+    with pytest.raises(sqlite3.IntegrityError):
+        database.add_accounts(duplicates[::-1], chunk_size=1)
+    assert database.cursor.execute("SELECT count(*) FROM accounts").fetchone() == (8,)
+
+
+def test_upsert_accounts_merges_by_login(database):
+    database.add_account(make_account("a", "https://x.com", "bob", "old", 100))
+    database.safe_push()
+
+    incoming: list = [
+        make_account("a", "https://x.com", "bob", "new", 200),
+        make_account("a", "https://x.com", "bob", "older", 50),
+        make_account("b", "https://y.com", "bob", "other", 100),
+        make_account("note"),
+        make_account("note"),
+    ]
+    assert database.upsert_accounts(incoming, chunk_size=2) == (3, 1, 1)
+
+    account = database.get_exact_account("a")
+    assert (account.password, account.date_modified) == ("new", 200)
+    # merging the same logins again changes nothing
+    assert database.upsert_accounts(incoming[:3]) == (0, 0, 3)
+
+
+ITEMS: list = [None, "beta", "Alpha", "alpha", "émile", "Zulu", None, "_x", "b"]
+
+
+@pytest.fixture
+def paged_database(database):
+    for item in ITEMS:
+        database.add_account(make_account(item))
+    database.safe_push()
+    return database
+
+
+def test_list_items_orders_by_item_then_id(paged_database):
+    items: list = paged_database.list_items()
+    assert [item for _, item in items] == [
+        None,
+        None,
+        "_x",
+        "Alpha",
+        "alpha",
+        "b",
+        "beta",
+        "Zulu",
+        "émile",
+    ]
+    assert items[3][0] < items[4][0]
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 4, 100])
+def test_list_items_page_walks_all_items_in_order(paged_database, limit):
+    pages: list = []
+    last: tuple = None
+    while True:
+        page: list = paged_database.list_items_page(last, limit)
+        pages.extend(page)
+        if len(page) < limit:
+            break
+        last = page[-1]
+
+    assert pages == paged_database.list_items()
+
+
+@pytest.mark.parametrize("page_size", [1, 2, 5, 200])
+def test_account_cache_pages_match_sql_order(paged_database, page_size):
+    cache = AccountCache(paged_database, page_size)
+    cache.reload()
+    while not cache.exhausted:
+        cache.load_page()
+
+    entries: list = [(entry.id, entry.item) for entry in cache.items()]
+    assert entries == paged_database.list_items()
+    assert cache.exhausted
+
+
+def test_account_cache_put_keeps_order(paged_database):
+    cache = AccountCache(paged_database, 2)
+    cache.reload()
+
+    account = make_account("Beta")
+    account.id = paged_database.add_account(account)
+    paged_database.safe_push()
+    cache.put(account)
+    cache.load_through(account)
+    while not cache.exhausted:
+        cache.load_page()
+
+    entries: list = [(entry.id, entry.item) for entry in cache.items()]
+    assert entries == paged_database.list_items()
+    assert len(entries) == len(ITEMS) + 1
+
+
+def test_account_cache_indexes_item_names(paged_database):
+    cache = AccountCache(paged_database, 3)
+    cache.reload()
+    # only loaded pages are indexed
+    assert cache.get_by_item("Zulu") is None
+    while not cache.exhausted:
+        cache.load_page()
+
+    assert len(cache.by_item["alpha"]) == len(cache.by_item["Alpha"]) == 1
+    account = cache.get_by_item("Zulu")
+    account.item = "Yankee"
+    cache.put(account)
+    assert "Zulu" not in cache.by_item
+    assert cache.get_by_item("Yankee") is account
+
+    cache.discard(account.id)
+    assert "Yankee" not in cache.by_item
+
+
+@pytest.fixture
+def three_accounts(database):
+    ids: list = [
+        database.add_account(make_account(item, url, "bob", date=100))
+        for item, url in (("a", "https://a.com"), ("b", "https://b.com"), ("c", ""))
+    ]
+    database.safe_push()
+    return ids
+
+
+class BatchCounter:
+    # cursor wrapper that records executemany statements
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.batches: list = []
+
+    def executemany(self, sql, params):
+        self.batches.append(sql)
+        return self.cursor.executemany(sql, params)
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+
+def test_update_accounts_batches_partial_changes(database, three_accounts, monkeypatch):
+    first, second, third = three_accounts
+    counter = BatchCounter(database.cursor)
+    monkeypatch.setattr(database, "cursor", counter)
+    updated: int = database.update_accounts(
+        {
+            first: {"password": "new a"},
+            second: {"password": "new b"},
+            third: {"item": "renamed", "date_modified": 500},
+            # missing Account is not counted
+            10**6: {"password": "nobody"},
+        }
+    )
+
+    assert updated == 3
+    # one statement per set of changed fields
+    assert len(counter.batches) == 2
+    a, b, c = (database.get_account_by_id(account_id) for account_id in three_accounts)
+    assert (a.password, a.item, b.password) == ("new a", "a", "new b")
+    assert a.date_modified > 100
+    assert (c.item, c.password, c.date_modified) == ("renamed", "secret", 500)
+
+
+@pytest.mark.parametrize("fields", [{"id": 5}, {"password": "x", "colour": "red"}])
+def test_update_accounts_rejects_unknown_fields(database, three_accounts, fields):
+    with pytest.raises(ValueError):
+        database.update_accounts({three_accounts[0]: fields})
+
+
+def test_update_accounts_rolls_back_on_login_conflict(database, three_accounts):
+    first, second, third = three_accounts
+    with pytest.raises(sqlite3.IntegrityError):
+        database.update_accounts(
+            {first: {"password": "changed"}, second: {"url": "https://a.com"}}
+        )
+    assert database.get_account_by_id(first).password == "secret"
+    assert database.get_account_by_id(second).url == "https://b.com"
+
+
+def test_delete_accounts_by_primary_key(database, three_accounts):
+    first, second, third = three_accounts
+    assert database.delete_accounts([first, third, 10**6]) == 2
+    assert [item for _, item in database.list_items()] == ["b"]
+
+    account = database.get_account_by_id(second)
+    database.update_account(account, "by id")
+    assert database.get_account_by_id(second).password == "by id"
+    database.delete_account(account)
+    assert database.is_empty()
@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("face_recognition")
+
+from twopasswords.utils.face_scanner import FaceScanner
+
+
+class FakeScanner(FaceScanner):
+    """
+    FaceScanner with a fake camera and face recognition:
+    frame i scores results[i], next frame is captured only
+    after a previous one is scored, so early exit is
+    deterministic.
+
+    """
+
+    def __init__(self, results: list):
+        super().__init__("user.png", "try.png", burst=len(results))
+        self.results = results
+        self.captured: list = []
+        self.scored: list = []
+        self.saved: list = []
+        self._done = threading.Event()
+
+    def load_user_encoding(self):
+        return None
+
+    def take_pictures(self, count: int = 1):
+        # camera returns no frames past results
+        for index in range(min(count, len(self.results))):
+            self._done.clear()
+            self.captured.append(index)
+            yield f"frame {index}"
+            self._done.wait(5)
+            # let auth see a finished future
+            time.sleep(0.02)
+
+    def score_frame(self, image, stop=None):
+        try:
+            if stop is not None and stop.is_set():
+                return None, []
+            index: int = int(image.split()[1])
+            self.scored.append(index)
+            return self.results[index], [(index, index, index, index)]
+        finally:
+            self._done.set()
+
+    def save_picture(self, image, locations=(), report=None):
+        self.saved.append((image, locations, report))
+
+
+def test_first_match_returns_early():
+    scanner = FakeScanner([0, 1, -1, -1])
+    assert scanner.auth() == 1
+    assert scanner.scored == [0, 1]
+    assert scanner.captured == [0, 1, 2]
+    assert scanner.frames == 2
+    assert not scanner.saved
+
+
+@pytest.mark.parametrize(
+    "results, expected",
+    [
+        ([-1, -1, 0], -1),
+        ([0, -1, -1], -1),
+        # stranger needs a strict majority
+        ([-1, 0], 0),
+        ([-1, 2, -1, 0], 2),
+        # ties go to multiple faces
+        ([0, 2], 2),
+        ([0, 0, 2], 0),
+        ([0], 0),
+    ],
+)
+def test_failed_frames_vote(results, expected):
+    scanner = FakeScanner(results)
+    assert scanner.auth() == expected
+    assert scanner.frames == len(results)
+
+
+def test_stranger_report_gets_first_stranger_frame():
+    scanner = FakeScanner([0, -1, -1])
+    assert scanner.auth() == -1
+
+    ((image, locations, report),) = scanner.saved
+    assert (image, locations) == ("frame 1", [(1, 1, 1, 1)])
+    assert "Stranger" in report
+
+
+def test_multiple_faces_picture_has_no_report():
+    scanner = FakeScanner([-1, 2, 0, 2])
+    assert scanner.auth() == 2
+    assert scanner.saved == [("frame 1", [(1, 1, 1, 1)], None)]
+
+
+def test_no_frames_means_no_face():
+    scanner = FakeScanner([])
+    assert scanner.auth() == 0
+    assert not scanner.saved
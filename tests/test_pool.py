@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("sqlcipher3")
+
+from twopasswords.utils.pool import ConnectionPool
+
+from conftest import make_account
+
+
+@pytest.fixture
+def pool(keyed_database):
+    connection_pool = ConnectionPool(keyed_database)
+    yield connection_pool
+    connection_pool.close()
+
+
+def test_writes_run_one_at_a_time_on_one_thread(pool):
+    running: list = []
+    threads: set = set()
+    overlaps: list = []
+
+    def write(engine, index):
+        threads.add(threading.get_ident())
+        running.append(index)
+        if len(running) > 1:
+            overlaps.append(tuple(running))
+        time.sleep(0.001)
+        account_id: int = engine.add_account(make_account(f"item {index}"))
+        running.remove(index)
+        return account_id
+
+    # writes are submitted from many threads at once
+    futures: list = []
+    submitters: list = [
+        threading.Thread(
+            target=lambda start=start: futures.extend(
+                pool.submit_write(write, index) for index in range(start, start + 10)
+            )
+        )
+        for start in range(0, 50, 10)
+    ]
+    for submitter in submitters:
+        submitter.start()
+    for submitter in submitters:
+        submitter.join()
+
+    ids: list = [future.result(timeout=10) for future in futures]
+    assert not overlaps
+    assert len(threads) == 1
+    assert len(set(ids)) == 50
+
+    count: int = pool.submit_read(
+        lambda engine: engine.cursor.execute(
+            "SELECT count(*) FROM accounts"
+        ).fetchone()[0]
+    ).result(timeout=10)
+    assert count == 50
+
+
+def test_failed_write_is_rolled_back(pool):
+    def failing_write(engine):
+        engine.add_account(make_account("lost"))
+        raise RuntimeError("write failed")
+
+    with pytest.raises(RuntimeError):
+        pool.submit_write(failing_write).result(timeout=10)
+    # writer keeps working after a failed write
+    pool.submit_write(lambda engine: engine.add_account(make_account("kept"))).result(
+        timeout=10
+    )
+
+    items: list = pool.submit_read(lambda engine: engine.list_items_page()).result(
+        timeout=10
+    )
+    assert [item for _, item in items] == ["kept"]
+
+
+def test_closed_pool_rejects_operations(pool):
+    pool.close()
+    with pytest.raises(RuntimeError):
+        pool.submit_write(lambda engine: None)
+    with pytest.raises(RuntimeError):
+        pool.submit_read(lambda engine: None)
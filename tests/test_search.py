@@ -0,0 +1,69 @@
+import pytest
+
+pytest.importorskip("sqlcipher3")
+
+from twopasswords.utils.database import Account, _fts_query
+
+from conftest import make_account
+
+
+@pytest.fixture
+def fts_database(database):
+    if not database.full_text_search:
+        pytest.skip("SQLCipher is built without FTS5")
+    return database
+
+
+def found(database, query: str) -> list:
+    return [account.item for account in database.search_accounts(query)]
+
+
+def test_search_index_follows_changes(fts_database):
+    account_id: int = fts_database.add_account(
+        make_account("Github", "https://github.com", "octocat")
+    )
+    fts_database.safe_push()
+    assert found(fts_database, "git") == found(fts_database, "octo") == ["Github"]
+
+    fts_database.update_accounts({account_id: {"item": "Gitlab", "username": "fox"}})
+    assert found(fts_database, "octocat") == []
+    assert found(fts_database, "gitl fox") == ["Gitlab"]
+
+    fts_database.delete_accounts([account_id])
+    assert found(fts_database, "gitlab") == []
+
+
+def test_search_ranks_item_matches_first(fts_database):
+    fts_database.add_account(
+        Account("Mail", "https://mail.com", "bob", "p", "see github", 1, 1)
+    )
+    fts_database.add_account(make_account("Github", "https://git.com", "bob"))
+    fts_database.safe_push()
+
+    assert found(fts_database, "github") == ["Github", "Mail"]
+    assert found(fts_database, "github mail") == ["Mail"]
+    assert len(fts_database.search_accounts("bob", limit=1)) == 1
+
+
+def test_fts_query_quotes_words():
+    assert _fts_query('say "hi" there') == '"say"* """hi"""* "there"*'
+    assert _fts_query("AND OR NOT") == '"AND"* "OR"* "NOT"*'
+    assert _fts_query(" % -- * ") == ""
+
+
+def test_search_ignores_symbol_only_queries(fts_database):
+    fts_database.add_account(make_account("percent % sign"))
+    fts_database.safe_push()
+    assert found(fts_database, '% " *') == []
+
+
+def test_like_fallback_escapes_wildcards(database):
+    database.full_text_search = False
+    for item in ("100% free", "1000 free", "a_b", "axb", "back\\slash"):
+        database.add_account(make_account(item))
+    database.safe_push()
+
+    assert found(database, "100%") == ["100% free"]
+    assert found(database, "a_b") == ["a_b"]
+    assert found(database, "k\\s") == ["back\\slash"]
+    assert sorted(found(database, "free")) == ["100% free", "1000 free"]
@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+pytest.importorskip("sqlcipher3")
+
+from twopasswords.utils.database import DatabaseEngine
+from twopasswords.utils.session_key import SessionKey
+from twopasswords.utils.snapshot import list_snapshots, take_snapshot
+
+from conftest import KDF_ITER, PASSWORD, make_account
+
+
+def test_snapshots_within_a_second_are_kept(keyed_database, tmp_path):
+    directory: str = str(tmp_path / "snapshots")
+    taken: list = [take_snapshot(keyed_database, directory) for _ in range(5)]
+
+    assert len(set(taken)) == 5
+    assert list_snapshots(keyed_database, directory) == taken
+
+
+def test_rotation_keeps_newest_snapshots(keyed_database, tmp_path):
+    directory: str = str(tmp_path / "snapshots")
+    os.makedirs(directory)
+    # one second resolution name of an older version
+    legacy: str = os.path.join(directory, "test-20200101-120000.sqlite")
+    open(legacy, "wb").close()
+
+    taken: list = [take_snapshot(keyed_database, directory, keep=2) for _ in range(3)]
+    assert list_snapshots(keyed_database, directory) == taken[1:]
+    assert not os.path.exists(legacy)
+
+
+def test_snapshot_opens_with_the_same_key(keyed_database, tmp_path):
+    keyed_database.add_account(make_account("kept"))
+    keyed_database.safe_push()
+    progress: list = []
+    path: str = take_snapshot(
+        keyed_database,
+        str(tmp_path / "snapshots"),
+        pages=1,
+        progress=lambda copied, total: progress.append((copied, total)),
+    )
+
+    assert progress[-1][0] == progress[-1][1]
+    snapshot = DatabaseEngine(
+        path, session_key=SessionKey.derive(path, PASSWORD, KDF_ITER)
+    )
+    assert [item for _, item in snapshot.list_items()] == ["kept"]
+    snapshot.close()
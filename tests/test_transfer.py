@@ -0,0 +1,180 @@
+import io
+import json
+import os
+
+import pytest
+
+pytest.importorskip("sqlcipher3")
+
+from twopasswords.utils.database import Account, DatabaseEngine, create_db
+from twopasswords.utils.transfer import (
+    CHECKPOINT_SUFFIX,
+    CSV_PROFILES,
+    export_csv,
+    export_json,
+    import_csv,
+    import_json,
+    iter_json_array,
+    validate_account,
+)
+
+from conftest import PASSWORD
+
+
+ELEMENTS: list = [
+    0,
+    1,
+    -7,
+    12.5,
+    -2.5e-3,
+    1e10,
+    123456789012,
+    "plain",
+    'quote " and backslash \\',
+    "unicode é ✓ \n tab \t",
+    "\\u escapes are text",
+    {"item": "x", "nested": [1, 2.0, {"a": None}]},
+    [],
+    True,
+    False,
+    None,
+]
+
+
+@pytest.mark.parametrize("buffer_size", range(1, 16))
+def test_iter_json_array_tiny_buffers(buffer_size):
+    text: str = json.dumps(ELEMENTS)
+    assert list(iter_json_array(io.StringIO(text), buffer_size)) == ELEMENTS
+
+
+@pytest.mark.parametrize("buffer_size", [1, 2, 3, 5])
+def test_iter_json_array_ascii_escapes(buffer_size):
+    text: str = json.dumps(ELEMENTS, ensure_ascii=True, indent=2)
+    assert list(iter_json_array(io.StringIO(text), buffer_size)) == ELEMENTS
+
+
+def test_iter_json_array_float_cut_at_buffer_end():
+    text: str = "[" + json.dumps("x" * 65528) + ", 12.5]"
+    assert list(iter_json_array(io.StringIO(text)))[1] == 12.5
+
+
+@pytest.mark.parametrize("text", ["[]", " [ ] \n", "[1] \n\t"])
+def test_iter_json_array_trailing_whitespace(text):
+    assert len(list(iter_json_array(io.StringIO(text), 1))) == text.count("1")
+
+
+@pytest.mark.parametrize(
+    "text", ["[1]]", "[] x", "[1,]", "[1 2]", "[1", "{}", "", "[1,, 2]"]
+)
+def test_iter_json_array_rejects_invalid(text):
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO(text), 2))
+
+
+class CountingStream(io.StringIO):
+    read_size: int = 0
+
+    def read(self, size=-1):
+        chunk: str = super().read(size)
+        self.read_size += len(chunk)
+        return chunk
+
+
+def test_iter_json_array_stops_reading_at_broken_element():
+    element: str = json.dumps({"item": "x" * 100})
+    stream = CountingStream('[{"item": bad}, ' + ", ".join([element] * 10000) + "]")
+    with pytest.raises(ValueError, match="longer than 1000"):
+        list(iter_json_array(stream, 100, max_element_size=1000))
+    assert stream.read_size <= 1100
+
+
+def test_iter_json_array_limits_element_size():
+    text: str = json.dumps([{"notes": "x" * 999}, {"notes": "x" * 2000}])
+    elements = iter_json_array(io.StringIO(text), 100, max_element_size=1100)
+    assert len(next(elements)["notes"]) == 999
+    with pytest.raises(ValueError, match="longer than 1100"):
+        next(elements)
+
+
+def test_validate_account_accepts_empty_item():
+    account = validate_account({"item": "", "url": "", "password": "p"}, now=100)
+    assert account.item == ""
+    assert account.date_created == account.date_modified == 100
+
+
+@pytest.mark.parametrize(
+    "element", [[], {"item": "x"}, {"item": "x", "password": "p", "url": []}]
+)
+def test_validate_account_rejects_invalid(element):
+    with pytest.raises(ValueError):
+        validate_account(element)
+
+
+ACCOUNTS: list = [
+    Account("plain", "https://a.com", "bob", "p1", "", 1600000000, 1600000100),
+    Account(
+        "quotes \"'",
+        "https://b.com/?q=1,2",
+        "ann",
+        'p,"2',
+        "a\nb",
+        1300000000,
+        1400000000,
+    ),
+    Account("unicode é ✓", "https://c.com", "é", "✓", "note", 1500000000, 1600000000),
+    Account("", "", "", "no login", "", 1600000000, 1600000000),
+    Account("", "", "", "no login", "", 1600000000, 1600000000),
+]
+
+
+@pytest.fixture
+def source(database):
+    database.load_accounts(ACCOUNTS)
+    return database
+
+
+@pytest.fixture
+def target(tmp_path, fast_kdf):
+    path: str = str(tmp_path / "target.db")
+    create_db(path, PASSWORD, to_create=True)
+    engine = DatabaseEngine(path, PASSWORD)
+    yield engine
+    engine.close()
+
+
+def stored(database, fields: tuple = None) -> list:
+    # as_dict has no primary key, it differs between Databases
+    records: list = [account.as_dict() for account in database.iter_accounts()]
+    if fields is not None:
+        records = [{field: record[field] for field in fields} for record in records]
+    return sorted(records, key=lambda record: sorted(record.items()))
+
+
+def test_json_round_trip(source, target, tmp_path):
+    filename: str = str(tmp_path / "accounts.json")
+    assert export_json(source, filename) == len(ACCOUNTS)
+
+    summary = import_json(target, filename, chunk_size=2)
+    assert (summary.inserted, summary.rejected) == (len(ACCOUNTS), 0)
+    assert stored(target) == stored(source)
+    assert not os.path.exists(filename + CHECKPOINT_SUFFIX)
+
+    # importing the same file again only skips logins
+    summary = import_json(target, filename)
+    assert (summary.inserted, summary.updated, summary.skipped) == (2, 0, 3)
+
+
+@pytest.mark.parametrize("profile", sorted(CSV_PROFILES))
+def test_csv_round_trip(source, target, tmp_path, profile):
+    filename: str = str(tmp_path / "accounts.csv")
+    assert export_csv(source, filename, profile) == len(ACCOUNTS)
+
+    summary = import_csv(target, filename, profile)
+    assert summary.rejected == 0
+    assert summary.inserted == len(ACCOUNTS)
+
+    # only fields a layout has survive, item comes from url if missing
+    fields: tuple = tuple(
+        field for field in CSV_PROFILES[profile].columns if field != "item"
+    )
+    assert stored(target, fields) == stored(source, fields)
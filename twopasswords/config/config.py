@@ -32,3 +32,40 @@ def load_config() -> tuple[dict, dict]:
         email_settings: dict = config[1]["email"]
 
     return local_paths, email_settings
+
+
+# used if config has no database section or some of it's settings
+DATABASE_DEFAULTS: dict = {
+    "profile": "interactive",
+    "kdf_iter": None,
+    "cipher_page_size": None,
+    "snapshot_dir": None,
+    "snapshot_keep": 5,
+}
+
+
+def load_database_settings() -> dict:
+    """
+    Load Database settings from YAML config file.
+    Missing settings fall back to DATABASE_DEFAULTS.
+
+    Returns
+    -------
+    dict
+        database settings used on Database connect:
+            profile:          Tuning profile name (interactive, bulk, paranoid)
+            kdf_iter:         SQLCipher KDF iterations, None for SQLCipher default
+            cipher_page_size: SQLCipher page size, None for SQLCipher default
+            snapshot_dir:     Snapshots directory, None for "snapshots" next to db
+            snapshot_keep:    Number of newest snapshots kept
+    """
+
+    with open(CONFIG_DIR / "config.yaml", "r") as config_file:
+        config = yaml.safe_load(config_file)
+
+    settings: dict = dict(DATABASE_DEFAULTS)
+    for section in config:
+        if "database" in section:
+            settings.update(section["database"] or {})
+
+    return settings
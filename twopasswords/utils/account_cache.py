@@ -0,0 +1,386 @@
+"""
+# TODO: should place some nice text here...
+
+This module is responsible for keeping Database
+Accounts in memory, so TUI can browse them
+without querying a Database on every key press.
+Menu entries are loaded page by page on demand.
+...
+
+"""
+
+from __future__ import annotations
+
+from twopasswords.utils.database import Account, DatabaseEngine
+
+# SQLite NOCASE collation folds ASCII letters only
+ASCII_LOWER: dict = str.maketrans(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"
+)
+
+
+def sort_key(account_id: int, item: str) -> tuple:
+    """
+    Gets sort key of an Account that mirrors
+    ORDER BY item COLLATE NOCASE, id: NULL items first,
+    then items with ASCII letters folded, then ids.
+
+    """
+
+    if item is None:
+        return 0, "", account_id
+    return 1, item.translate(ASCII_LOWER), account_id
+
+
+class AccountEntry:
+    """
+    A class used to represent an Account entry
+    in a TUI accounts menu. Menus show str(entry),
+    while entry keeps Account primary key,
+    so Accounts with the same item name stay apart.
+
+    Attributes
+    ----------
+    id : int
+        The Account's primary key in a Database
+    item : str
+        The item name (description) of an Account
+    marked : bool
+        Whether entry is marked for bulk operations
+
+    """
+
+    __slots__ = ("id", "item", "marked")
+
+    # prefix of marked entries, used for menu color rules
+    MARK: str = "* "
+
+    def __init__(self, account_id: int, item: str):
+        self.id = account_id
+        self.item = item
+        self.marked: bool = False
+
+    def __str__(self) -> str:
+        item: str = self.item or ""
+        return self.MARK + item if self.marked else item
+
+    def __repr__(self) -> str:
+        return f"AccountEntry(id={self.id}, item={self.item}, marked={self.marked})"
+
+
+class AccountCache:
+    """
+    A class used to represent an in-memory
+    Accounts cache keyed by primary key and item name.
+    Only primary keys and item names are kept, loaded
+    in pages ordered by item name, so a cache holds
+    a sorted prefix of all Accounts. Whole Accounts
+    (with secrets) are loaded from a Database
+    on first access and memoized.
+
+    Attributes
+    ----------
+    database : DatabaseEngine
+        Database whole Accounts are loaded from
+    page_size : int
+        Number of entries loaded at once
+    entries : dict[int, AccountEntry]
+        Menu entries of loaded Accounts by primary key
+    by_item : dict[str, list[int]]
+        Primary keys of loaded Accounts by item name,
+        several Accounts may share the same item name
+    by_id : dict[int, Account]
+        Memoized whole Accounts by primary key
+    exhausted : bool
+        Whether all pages were loaded
+
+    Methods
+    -------
+    reload
+        Replaces cache content with the first page
+    load_page
+        Loads next page of entries
+    load_through(account)
+        Loads pages until Account entry is loaded
+    put(account)
+        Adds or replaces Account in cache
+    discard(account_id)
+        Removes Account from cache
+    forget(account_id)
+        Drops memoized Account, keeps it's item name
+    get(account_id)
+        Gets Account by primary key
+    get_by_item(item)
+        Gets first Account with such item name
+    items
+        Gets ordered list of menu entries
+    toggle_mark(account_id)
+        Marks or unmarks Account for bulk operations
+    marked
+        Gets primary keys of marked Accounts
+    clear
+        Removes all Accounts from cache
+
+    """
+
+    def __init__(self, database: DatabaseEngine, page_size: int = 200):
+        self.database = database
+        self.page_size = page_size
+        self.entries: dict[int, AccountEntry] = {}
+        self.by_item: dict[str, list[int]] = {}
+        self.by_id: dict[int, Account] = {}
+        self.exhausted: bool = False
+        self._last: tuple[int, str] = None
+        self._order: list[int] = []
+        self._ordered: bool = True
+
+    def reload(self) -> list[AccountEntry]:
+        """
+        Replaces cache content with the first page of entries.
+
+        Returns
+        -------
+        list[AccountEntry]
+            Loaded entries
+
+        """
+
+        self.clear()
+        return self.load_page()
+
+    def load_page(self) -> list[AccountEntry]:
+        """
+        Loads next page of entries after the last loaded one.
+        Entries already added by put are skipped.
+
+        Returns
+        -------
+        list[AccountEntry]
+            Newly loaded entries in order, empty if all were loaded
+
+        """
+
+        if self.exhausted:
+            return []
+
+        page: list = self.database.list_items_page(self._last, self.page_size)
+        if len(page) < self.page_size:
+            self.exhausted = True
+        if page:
+            self._last = page[-1]
+
+        loaded: list[AccountEntry] = []
+        for account_id, item in page:
+            if account_id in self.entries:
+                continue
+            entry = self.entries[account_id] = AccountEntry(account_id, item)
+            self.by_item.setdefault(item, []).append(account_id)
+            self._order.append(account_id)
+            loaded.append(entry)
+        return loaded
+
+    def load_through(self, account: Account) -> list[AccountEntry]:
+        """
+        Loads pages until Account entry is loaded.
+
+        Parameters
+        ----------
+        account : Account
+            Account with primary key set
+
+        Returns
+        -------
+        list[AccountEntry]
+            Newly loaded entries in order
+
+        """
+
+        loaded: list[AccountEntry] = []
+        while account.id not in self.entries and not self.exhausted:
+            loaded.extend(self.load_page())
+        return loaded
+
+    def _loaded(self, account: Account) -> bool:
+        # whether Account sorts within already loaded pages
+        return self.exhausted or (
+            self._last is not None
+            and sort_key(account.id, account.item) <= sort_key(*self._last)
+        )
+
+    def put(self, account: Account) -> None:
+        """
+        Adds Account to cache or replaces
+        cached Account with the same primary key.
+        Accounts sorting after loaded pages are only
+        memoized, their entries come with a later page.
+
+        Parameters
+        ----------
+        account : Account
+            Account with primary key set
+
+        """
+
+        entry: AccountEntry = self.entries.get(account.id)
+        if entry is None or entry.item != account.item:
+            self.discard(account.id)
+            if not self._loaded(account):
+                self.by_id[account.id] = account
+                return
+            self.entries[account.id] = AccountEntry(account.id, account.item)
+            self.by_item.setdefault(account.item, []).append(account.id)
+            self._order.append(account.id)
+            self._ordered = False
+        self.by_id[account.id] = account
+
+    def discard(self, account_id: int) -> None:
+        """
+        Removes Account from cache if it is cached.
+
+        Parameters
+        ----------
+        account_id : int
+            The account primary key
+
+        """
+
+        entry: AccountEntry = self.entries.pop(account_id, None)
+        self.by_id.pop(account_id, None)
+        if entry is None:
+            return
+
+        self._order.remove(account_id)
+        ids: list[int] = self.by_item[entry.item]
+        ids.remove(account_id)
+        if not ids:
+            del self.by_item[entry.item]
+
+    def forget(self, account_id: int) -> None:
+        """
+        Drops memoized Account, so it is loaded
+        from a Database again on next access.
+
+        Parameters
+        ----------
+        account_id : int
+            The account primary key
+
+        """
+
+        self.by_id.pop(account_id, None)
+
+    def get(self, account_id: int) -> Account:
+        """
+        Gets Account by primary key, loads it
+        from a Database if not memoized, even if
+        it's entry is not loaded yet.
+
+        Parameters
+        ----------
+        account_id : int
+            The account primary key
+
+        Returns
+        -------
+        Account
+            Cached Account, None if there is no such Account
+
+        """
+
+        account: Account = self.by_id.get(account_id)
+        if account is None:
+            account = self.database.get_account_by_id(account_id)
+            if account is not None:
+                self.by_id[account_id] = account
+        return account
+
+    def get_by_item(self, item: str) -> Account:
+        """
+        Gets first loaded Account with such item name.
+
+        Parameters
+        ----------
+        item : str
+            The account item name (description)
+
+        Returns
+        -------
+        Account
+            Cached Account, None if there is no such Account
+
+        """
+
+        ids: list[int] = self.by_item.get(item)
+        if not ids:
+            return None
+        return self.get(ids[0])
+
+    def items(self) -> list[AccountEntry]:
+        """
+        Gets list of loaded menu entries,
+        ordered by item name case insensitive.
+
+        Returns
+        -------
+        list[AccountEntry]
+            Ordered menu entries
+
+        """
+
+        if not self._ordered:
+            self._order.sort(key=self._sort_key)
+            self._ordered = True
+        return [self.entries[account_id] for account_id in self._order]
+
+    def _sort_key(self, account_id: int) -> tuple:
+        return sort_key(account_id, self.entries[account_id].item)
+
+    def toggle_mark(self, account_id: int) -> bool:
+        """
+        Marks or unmarks Account for bulk operations.
+
+        Parameters
+        ----------
+        account_id : int
+            The account primary key
+
+        Returns
+        -------
+        bool
+            True if Account is marked now, False otherwise
+
+        """
+
+        entry: AccountEntry = self.entries[account_id]
+        entry.marked = not entry.marked
+        return entry.marked
+
+    def marked(self) -> list[int]:
+        """
+        Gets primary keys of marked Accounts.
+
+        Returns
+        -------
+        list[int]
+            Primary keys of marked Accounts
+
+        """
+
+        return [entry.id for entry in self.entries.values() if entry.marked]
+
+    def clear(self) -> None:
+        """
+        Removes all Accounts from cache.
+
+        """
+
+        self.entries.clear()
+        self.by_item.clear()
+        self.by_id.clear()
+        self._order.clear()
+        self._ordered = True
+        self.exhausted = False
+        self._last = None
+
+    def __len__(self) -> int:
+        return len(self.entries)
@@ -0,0 +1,324 @@
+"""
+# TODO: should place some nice text here...
+
+This module is responsible for asyncio access
+to a Database: every call runs on a dedicated
+executor thread with it's own connection,
+so event loop is never blocked by SQL.
+...
+
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterable
+
+from twopasswords.utils.database import Account, DatabaseEngine
+from twopasswords.utils.transfer import export_json
+
+
+class AsyncDatabaseEngine:
+    """
+    A class used to represent an asyncio facade over DatabaseEngine.
+    Calls are queued to a single executor thread that owns
+    a connection reopened with a session key of a base
+    DatabaseEngine, so they run in order, one at a time.
+
+    Cancelling an awaiting task drops a queued call,
+    or interrupts a running SQL statement.
+    At most max_pending calls may be queued or running
+    at once, further callers wait (backpressure).
+    A cancelled call holds it's slot until it stops.
+
+    Attributes
+    ----------
+    database : DatabaseEngine
+        Base DatabaseEngine with a session key
+    max_pending : int
+        Maximum number of queued calls
+
+    Methods
+    -------
+    add_account(account)
+        Adds Account to a Database
+    get_account(item)
+        Gets Account by item name or best search match
+    get_all_accounts
+        Gets all Accounts from a Database
+    search_accounts(query, limit=50)
+        Gets ranked list of Accounts matching search query
+    import_accounts(accounts, chunk_size=1000, progress=None)
+        Adds or updates many Accounts in chunked transactions
+    export_json(filename, progress=None)
+        Streams all Accounts to a JSON file
+    close
+        Closes connection and stops executor thread
+
+    """
+
+    def __init__(self, database: DatabaseEngine, max_pending: int = 32):
+        """
+        Parameters
+        ----------
+        database : DatabaseEngine
+            Base DatabaseEngine with a session key
+        max_pending : int
+            Maximum number of queued calls (default is 32)
+
+        """
+
+        self.database = database
+        self.max_pending = max_pending
+
+        self._engine: DatabaseEngine = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="twopasswords-async-db"
+        )
+        self._pending: asyncio.Semaphore = None
+        # token of a call running on the executor thread,
+        # guarded by _running_lock together with interrupts
+        self._running: object = None
+        self._running_lock = threading.Lock()
+
+    def _call(self, token: object, operation: Callable, *args, write: bool = False):
+        """
+        Runs operation with executor thread DatabaseEngine,
+        opens it on first call. Writes are committed
+        on success and rolled back on error.
+        Call is marked running with it's token,
+        so only this call may be interrupted.
+
+        """
+
+        if self._engine is None:
+            self._engine = self.database.reopen()
+
+        with self._running_lock:
+            self._running = token
+        try:
+            result = operation(self._engine, *args)
+            if write:
+                self._engine.safe_push()
+        except Exception:
+            if write:
+                self._engine.connection.rollback()
+            raise
+        finally:
+            with self._running_lock:
+                self._running = None
+        return result
+
+    def _interrupt(self, token: object) -> None:
+        """
+        Interrupts SQL of a call if it is still running.
+        Lock keeps the call from finishing meanwhile,
+        so a next queued call is never interrupted.
+        SQLite ignores an interrupt between statements.
+
+        """
+
+        with self._running_lock:
+            if self._running is token:
+                self._engine.connection.interrupt()
+
+    def _release(self, loop: asyncio.AbstractEventLoop) -> None:
+        # releases backpressure slot, may be called from any thread
+        try:
+            loop.call_soon_threadsafe(self._pending.release)
+        except RuntimeError:
+            # event loop is closed, nobody waits for a slot
+            pass
+
+    async def _run(self, operation: Callable, *args, write: bool = False):
+        """
+        Queues operation to the executor thread and awaits result.
+
+        """
+
+        if self._pending is None:
+            self._pending = asyncio.Semaphore(self.max_pending)
+
+        await self._pending.acquire()
+        token: object = object()
+        try:
+            future: Future = self._executor.submit(
+                self._call, token, operation, *args, write=write
+            )
+        except BaseException:
+            self._pending.release()
+            raise
+        # slot is released when a call stops, not when awaiting it is cancelled
+        loop = asyncio.get_running_loop()
+        future.add_done_callback(lambda _: self._release(loop))
+
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # queued call is cancelled by wrap_future, running one is interrupted
+            self._interrupt(token)
+            raise
+
+    @staticmethod
+    def _threadsafe(callback: Callable) -> Callable:
+        """
+        Wraps callback, so it is called on an event loop
+        thread when called from the executor thread.
+
+        """
+
+        if callback is None:
+            return None
+
+        loop = asyncio.get_running_loop()
+        return lambda *args: loop.call_soon_threadsafe(callback, *args)
+
+    async def add_account(self, account: Account) -> int:
+        """
+        Adds Account to a Database.
+
+        Parameters
+        ----------
+        account : Account
+            The account that will be added
+
+        Returns
+        -------
+        int
+            The primary key of added Account
+
+        """
+
+        return await self._run(DatabaseEngine.add_account, account, write=True)
+
+    async def get_account(self, item: str) -> Account:
+        """
+        Gets Account by exact item name or best search match.
+
+        Parameters
+        ----------
+        item : str
+            The account item name (description) or search text
+
+        Returns
+        -------
+        Account
+            Found Account, None if nothing was found
+
+        """
+
+        return await self._run(DatabaseEngine.get_account, item)
+
+    async def get_all_accounts(self) -> list[Account]:
+        """
+        Gets all Accounts from a Database.
+
+        Returns
+        -------
+        list[Account]
+            The list of all Accounts stored in a Database
+
+        """
+
+        return await self._run(DatabaseEngine.get_all_accounts)
+
+    async def search_accounts(self, query: str, limit: int = 50) -> list[Account]:
+        """
+        Searches Accounts by item, url, username and notes.
+
+        Parameters
+        ----------
+        query : str
+            Search text
+        limit : int
+            Maximum number of results (default is 50)
+
+        Returns
+        -------
+        list[Account]
+            Accounts matching query, best matches first
+
+        """
+
+        return await self._run(DatabaseEngine.search_accounts, query, limit)
+
+    async def import_accounts(
+        self,
+        accounts: Iterable[Account],
+        chunk_size: int = 1000,
+        progress: Callable[[int], None] = None,
+    ) -> tuple[int, int, int]:
+        """
+        Adds many Accounts or updates existing ones with the same
+        (url, username) if newer, in chunked transactions.
+        Progress callback is called on an event loop thread.
+
+        Parameters
+        ----------
+        accounts : Iterable[Account]
+            The accounts that will be added
+        chunk_size : int
+            Number of accounts merged per transaction (default is 1000)
+        progress : Callable[[int], None], optional
+            Called with a total number of processed accounts
+
+        Returns
+        -------
+        tuple[int, int, int]
+            Numbers of inserted, updated and skipped accounts
+
+        """
+
+        return await self._run(
+            DatabaseEngine.upsert_accounts,
+            accounts,
+            chunk_size,
+            self._threadsafe(progress),
+            write=True,
+        )
+
+    async def export_json(
+        self, filename: str, progress: Callable[[int], None] = None
+    ) -> int:
+        """
+        Streams all Accounts to a JSON file.
+        Progress callback is called on an event loop thread.
+
+        Parameters
+        ----------
+        filename : str
+            Path to a JSON file
+        progress : Callable[[int], None], optional
+            Called with a number of exported Accounts
+
+        Returns
+        -------
+        int
+            Number of exported Accounts
+
+        """
+
+        return await self._run(export_json, filename, self._threadsafe(progress))
+
+    async def close(self) -> None:
+        """
+        Waits for queued calls, closes connection
+        and stops executor thread.
+
+        """
+
+        def close_engine() -> None:
+            if self._engine is not None:
+                self._engine.close()
+                self._engine = None
+
+        await asyncio.wrap_future(self._executor.submit(close_engine))
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self) -> AsyncDatabaseEngine:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
@@ -0,0 +1,394 @@
+"""
+# TODO: should place some nice text here...
+
+This module is responsible for binary encrypted
+Database backups. Backup file layout:
+- header: magic, format version, compression,
+  KDF iterations and salt
+- blocks: length, last block flag, nonce and AES-GCM
+  encrypted, compressed batch of length-prefixed Accounts
+...
+
+"""
+
+from __future__ import annotations
+
+import os
+import lzma
+import zlib
+import struct
+import hashlib
+from typing import Callable, IO, Iterator
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from twopasswords.utils import timestamps
+from twopasswords.utils.database import ACCOUNT_COLUMNS, Account, DatabaseEngine
+from twopasswords.utils.session_key import DEFAULT_KDF_ITER, KDF_HASH, KEY_SIZE
+from twopasswords.utils.transfer import atomic_writer, commit_atomic, discard_atomic
+
+MAGIC = b"2PWBAK"
+FORMAT_VERSION = 1
+SALT_SIZE = 16
+NONCE_SIZE = 12
+# magic, version, compression, KDF iterations, salt
+HEADER = struct.Struct(f">{len(MAGIC)}sBBI{SALT_SIZE}s")
+# encrypted block length and last block flag
+BLOCK_HEADER = struct.Struct(">I?")
+# block index and last block flag, authenticated with every block
+BLOCK_AAD = struct.Struct(">Q?")
+# uncompressed size a block is flushed at
+BLOCK_SIZE = 1024 * 1024
+
+# Account fields stored in a backup, primary key is not kept
+FIELDS: tuple = ACCOUNT_COLUMNS[1:]
+# lengths of every field of a record, NULL_LENGTH for None
+RECORD_HEADER = struct.Struct(f"<{len(FIELDS)}I")
+NULL_LENGTH = 0xFFFFFFFF
+DATE_FIELDS: tuple = ("date_created", "date_modified")
+
+COMPRESSION: dict[str, int] = {"none": 0, "zlib": 1, "lzma": 2}
+
+# KDF iterations read from a backup header are bounded,
+# so a crafted backup can not make restore run for hours
+MAX_KDF_ITER = 10 * DEFAULT_KDF_ITER
+
+
+def _compress(data: bytes, compression: int) -> bytes:
+    if compression == COMPRESSION["zlib"]:
+        return zlib.compress(data, 6)
+    if compression == COMPRESSION["lzma"]:
+        return lzma.compress(data, preset=6)
+    return data
+
+
+def _decompress(data: bytes, compression: int) -> bytes:
+    if compression == COMPRESSION["zlib"]:
+        return zlib.decompress(data)
+    if compression == COMPRESSION["lzma"]:
+        return lzma.decompress(data)
+    return data
+
+
+def derive_backup_key(passphrase: str, salt: bytes, kdf_iter: int) -> bytes:
+    """
+    Derives backup encryption key from a passphrase
+    with PBKDF2-HMAC-SHA512, the same KDF SQLCipher uses.
+
+    Parameters
+    ----------
+    passphrase : str
+        Backup password
+    salt : bytes
+        Backup salt, random for every backup
+    kdf_iter : int
+        KDF iterations
+
+    Returns
+    -------
+    bytes
+        256 bit AES key
+
+    """
+
+    return hashlib.pbkdf2_hmac(
+        KDF_HASH, passphrase.encode(), salt, int(kdf_iter), KEY_SIZE
+    )
+
+
+def pack_account(account: Account) -> bytes:
+    """
+    Serializes Account to a record: field lengths
+    followed by UTF-8 encoded field values.
+
+    Parameters
+    ----------
+    account : Account
+        The account that will be serialized
+
+    Returns
+    -------
+    bytes
+        Binary record
+
+    """
+
+    values: list[bytes] = []
+    lengths: list[int] = []
+    for field in FIELDS:
+        value = getattr(account, field)
+        if value is None:
+            lengths.append(NULL_LENGTH)
+            continue
+        encoded: bytes = str(value).encode()
+        lengths.append(len(encoded))
+        values.append(encoded)
+    return RECORD_HEADER.pack(*lengths) + b"".join(values)
+
+
+def unpack_accounts(data: bytes) -> Iterator[Account]:
+    """
+    Deserializes Accounts from a decrypted block.
+
+    Parameters
+    ----------
+    data : bytes
+        Concatenated records
+
+    Returns
+    -------
+    Iterator[Account]
+        Accounts stored in a block
+
+    Raises
+    ------
+    ValueError
+        Raises error if a record is truncated
+
+    """
+
+    view = memoryview(data)
+    position: int = 0
+    while position < len(data):
+        if position + RECORD_HEADER.size > len(data):
+            raise ValueError("Backup record is truncated")
+        lengths: tuple = RECORD_HEADER.unpack_from(data, position)
+        position += RECORD_HEADER.size
+
+        values: list = []
+        for length in lengths:
+            if length == NULL_LENGTH:
+                values.append(None)
+                continue
+            if position + length > len(data):
+                raise ValueError("Backup record is truncated")
+            values.append(str(view[position : position + length], "utf-8"))
+            position += length
+
+        account = Account(*values)
+        # dates are stored as text of Unix time, or date text in old backups
+        for field in DATE_FIELDS:
+            value = getattr(account, field)
+            if value is not None:
+                setattr(account, field, timestamps.parse_date(value))
+        yield account
+
+
+def write_backup(
+    database: DatabaseEngine,
+    filename: str,
+    passphrase: str,
+    compression: str = "zlib",
+    kdf_iter: int = DEFAULT_KDF_ITER,
+    progress: Callable[[int], None] = None,
+) -> int:
+    """
+    Writes all Accounts to an encrypted binary backup.
+    Accounts are streamed from a cursor and packed into
+    blocks of about BLOCK_SIZE bytes, every block is compressed
+    and encrypted with AES-GCM on it's own, with block index
+    and last block flag authenticated, so reordered,
+    dropped or truncated blocks are detected on restore.
+
+    Parameters
+    ----------
+    database : DatabaseEngine
+        Database to back up
+    filename : str
+        Path to a backup file
+    passphrase : str
+        Backup password
+    compression : str
+        "zlib", "lzma" or "none" (default is "zlib")
+    kdf_iter : int
+        KDF iterations (default is SQLCipher default)
+    progress : Callable[[int], None], optional
+        Called with a number of written Accounts after every block
+
+    Returns
+    -------
+    int
+        Number of written Accounts
+
+    Raises
+    ------
+    ValueError
+        Raises error if compression is unknown
+        or kdf_iter is out of range
+
+    """
+
+    if compression not in COMPRESSION:
+        raise ValueError(f"Unknown compression {compression}")
+    if not 0 < int(kdf_iter) <= MAX_KDF_ITER:
+        raise ValueError(f"KDF iterations should be from 1 to {MAX_KDF_ITER}")
+
+    salt: bytes = os.urandom(SALT_SIZE)
+    header: bytes = HEADER.pack(
+        MAGIC, FORMAT_VERSION, COMPRESSION[compression], int(kdf_iter), salt
+    )
+    cipher = AESGCM(derive_backup_key(passphrase, salt, kdf_iter))
+
+    written: int = 0
+    index: int = 0
+    out, temp_path = atomic_writer(filename, "wb")
+
+    def write_block(records: list[bytes], last: bool) -> None:
+        nonlocal index
+        nonce: bytes = os.urandom(NONCE_SIZE)
+        block: bytes = cipher.encrypt(
+            nonce,
+            _compress(b"".join(records), COMPRESSION[compression]),
+            header + BLOCK_AAD.pack(index, last),
+        )
+        out.write(BLOCK_HEADER.pack(len(block), last) + nonce + block)
+        index += 1
+
+    try:
+        out.write(header)
+        records: list[bytes] = []
+        size: int = 0
+        for account in database.iter_accounts():
+            record: bytes = pack_account(account)
+            records.append(record)
+            size += len(record)
+            written += 1
+            if size >= BLOCK_SIZE:
+                write_block(records, False)
+                records, size = [], 0
+                if progress is not None:
+                    progress(written)
+        # last block is always written, even if empty
+        write_block(records, True)
+        commit_atomic(out, temp_path, filename)
+    except BaseException:
+        discard_atomic(out, temp_path)
+        raise
+
+    if progress is not None:
+        progress(written)
+    return written
+
+
+def _read_exactly(stream: IO[bytes], size: int) -> bytes:
+    data: bytes = stream.read(size)
+    if len(data) != size:
+        raise ValueError("Backup file is truncated")
+    return data
+
+
+def iter_backup(filename: str, passphrase: str) -> Iterator[Account]:
+    """
+    Reads Accounts from an encrypted binary backup
+    block by block, only one block is held in memory.
+
+    Parameters
+    ----------
+    filename : str
+        Path to a backup file
+    passphrase : str
+        Backup password
+
+    Returns
+    -------
+    Iterator[Account]
+        Accounts stored in a backup
+
+    Raises
+    ------
+    ValueError
+        Raises error if file is not a backup, password
+        is wrong or backup is corrupted or truncated
+
+    """
+
+    with open(filename, "rb") as backup_file:
+        header: bytes = _read_exactly(backup_file, HEADER.size)
+        magic, version, compression, kdf_iter, salt = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError("File is not a TwoPasswords backup")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported backup version {version}")
+        if compression not in COMPRESSION.values():
+            raise ValueError(f"Unknown backup compression {compression}")
+        if not 0 < kdf_iter <= MAX_KDF_ITER:
+            raise ValueError(f"Invalid backup KDF iterations {kdf_iter}")
+
+        cipher = AESGCM(derive_backup_key(passphrase, salt, kdf_iter))
+        index: int = 0
+        while True:
+            size, last = BLOCK_HEADER.unpack(
+                _read_exactly(backup_file, BLOCK_HEADER.size)
+            )
+            nonce: bytes = _read_exactly(backup_file, NONCE_SIZE)
+            block: bytes = _read_exactly(backup_file, size)
+
+            # last flag is authenticated, so a changed flag fails too
+            try:
+                data: bytes = cipher.decrypt(
+                    nonce, block, header + BLOCK_AAD.pack(index, last)
+                )
+            except InvalidTag:
+                if index == 0:
+                    raise ValueError(
+                        "Wrong backup password or corrupted backup"
+                    ) from None
+                raise ValueError("Backup file is corrupted") from None
+
+            yield from unpack_accounts(_decompress(data, compression))
+            index += 1
+            if last:
+                if backup_file.read(1):
+                    raise ValueError("Backup file has data after the last block")
+                return
+
+
+def restore_backup(
+    database: DatabaseEngine,
+    filename: str,
+    passphrase: str,
+    chunk_size: int = 5000,
+    progress: Callable[[int], None] = None,
+) -> tuple[int, int, int]:
+    """
+    Restores Accounts from an encrypted binary backup.
+    Empty Database is loaded in a single transaction
+    with DatabaseEngine.load_accounts, non-empty one
+    is merged by (url, username) with bulk upserts.
+
+    Parameters
+    ----------
+    database : DatabaseEngine
+        Database to restore Accounts to
+    filename : str
+        Path to a backup file
+    passphrase : str
+        Backup password
+    chunk_size : int
+        Number of Accounts inserted at once (default is 5000)
+    progress : Callable[[int], None], optional
+        Called with a number of processed Accounts
+        after every committed chunk
+
+    Returns
+    -------
+    tuple[int, int, int]
+        Numbers of inserted, updated and skipped Accounts
+
+    Raises
+    ------
+    ValueError
+        Raises error if backup can not be read, chunks committed
+        before the error stay in a non-empty Database
+
+    """
+
+    accounts: Iterator[Account] = iter_backup(filename, passphrase)
+    if database.is_empty():
+        loaded: int = database.load_accounts(
+            accounts, chunk_size=chunk_size, progress=progress
+        )
+        return loaded, 0, 0
+
+    return database.upsert_accounts(accounts, chunk_size=chunk_size, progress=progress)
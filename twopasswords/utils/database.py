@@ -7,12 +7,446 @@ This module is responsible for Database and it's entries (Accounts) work.
 """
 
 from __future__ import annotations
-from datetime import datetime
+import hashlib
+import os
+from contextlib import contextmanager
+from itertools import islice
+from time import perf_counter
+from typing import Callable, Iterable, Iterator
 
 from faker import Faker
 from sqlcipher3 import dbapi2 as sqlite3
 
+from twopasswords.config.config import load_database_settings
+from twopasswords.utils import timestamps
 from twopasswords.utils.pwd_generator import PasswordGenerator
+from twopasswords.utils.session_key import (
+    DEFAULT_KDF_ITER,
+    DEFAULT_PAGE_SIZE,
+    KDF_HASH,
+    SessionKey,
+    has_salt,
+)
+
+# load configuration
+database_settings = load_database_settings()
+
+# Runtime PRAGMA sets applied on connect, may be switched any time.
+# cache_size is negative, so it is in KiB rather than in pages.
+# SQLCipher decrypts pages in it's own buffers, so mmap_size only
+# speeds up unencrypted Databases and is ignored otherwise.
+TUNING_PROFILES: dict = {
+    # everyday TUI usage: big enough cache for 100k+ accounts,
+    # WAL lets readers work while something is written
+    "interactive": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -32000,
+        "temp_store": "MEMORY",
+        "mmap_size": 67108864,
+        "secure_delete": "OFF",
+    },
+    # imports, fake fills, restores: large cache, no fsync per commit
+    "bulk": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -262144,
+        "temp_store": "MEMORY",
+        "mmap_size": 268435456,
+        "secure_delete": "OFF",
+    },
+    # nothing left on disk or in freed memory
+    "paranoid": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "cache_size": -8000,
+        "temp_store": "MEMORY",
+        "mmap_size": 0,
+        "secure_delete": "ON",
+        "cipher_memory_security": "ON",
+    },
+}
+
+# SQLCipher 3 default, lower values are not recommended
+KDF_MIN_ITER = 64000
+
+# accounts table columns in a storage order
+ACCOUNT_COLUMNS: tuple = (
+    "id",
+    "item",
+    "url",
+    "username",
+    "password",
+    "notes",
+    "date_created",
+    "date_modified",
+)
+
+INSERT_ACCOUNT_SQL = (
+    "INSERT INTO accounts (item, url, username, password, notes, date_created, date_modified) "
+    "VALUES (:item, :url, :username, :password, :notes, :date_created, :date_modified)"
+)
+
+# Insert that skips an Account if it's login already exists.
+INSERT_NEW_ACCOUNT_SQL = INSERT_ACCOUNT_SQL + " ON CONFLICT DO NOTHING"
+
+# Accounts with both url and username empty are not logins,
+# (url, username) is unique only for other Accounts.
+LOGIN_WHERE = "url <> '' OR username <> ''"
+
+# Insert or, if an Account with the same login exists,
+# replace it only when incoming Account is newer.
+UPSERT_ACCOUNT_SQL = INSERT_ACCOUNT_SQL + (
+    f" ON CONFLICT (url, username) WHERE {LOGIN_WHERE} DO UPDATE SET "
+    "item = excluded.item, password = excluded.password, notes = excluded.notes, "
+    "date_created = min(accounts.date_created, excluded.date_created), "
+    "date_modified = excluded.date_modified "
+    "WHERE excluded.date_modified > accounts.date_modified"
+)
+
+
+def _add_lookup_indexes(cursor: sqlite3.Cursor) -> None:
+    """
+    Schema version 1.
+    Adds indexes on accounts lookup columns:
+    item for search and card lookups,
+    (url, username) for account edits and deletes.
+
+    """
+
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_accounts_item ON accounts (item COLLATE NOCASE)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_accounts_url_username ON accounts (url, username)"
+    )
+
+
+# External content FTS5 index over searchable accounts columns,
+# kept in sync with accounts table by triggers.
+# Password is never indexed.
+SEARCH_INDEX_SQL: tuple = (
+    """CREATE VIRTUAL TABLE accounts_fts USING fts5(
+    item, url, username, notes,
+    content='accounts', content_rowid='id',
+    prefix='2 3', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER accounts_fts_insert AFTER INSERT ON accounts BEGIN
+    INSERT INTO accounts_fts (rowid, item, url, username, notes)
+    VALUES (new.id, new.item, new.url, new.username, new.notes);
+    END""",
+    """CREATE TRIGGER accounts_fts_delete AFTER DELETE ON accounts BEGIN
+    INSERT INTO accounts_fts (accounts_fts, rowid, item, url, username, notes)
+    VALUES ('delete', old.id, old.item, old.url, old.username, old.notes);
+    END""",
+    """CREATE TRIGGER accounts_fts_update AFTER UPDATE OF item, url, username, notes
+    ON accounts BEGIN
+    INSERT INTO accounts_fts (accounts_fts, rowid, item, url, username, notes)
+    VALUES ('delete', old.id, old.item, old.url, old.username, old.notes);
+    INSERT INTO accounts_fts (rowid, item, url, username, notes)
+    VALUES (new.id, new.item, new.url, new.username, new.notes);
+    END""",
+    "INSERT INTO accounts_fts (accounts_fts) VALUES ('rebuild')",
+)
+
+# names of triggers created by SEARCH_INDEX_SQL
+SEARCH_TRIGGERS: tuple = (
+    "accounts_fts_insert",
+    "accounts_fts_delete",
+    "accounts_fts_update",
+)
+
+# bm25 column weights: item, url, username, notes
+SEARCH_RANK_SQL = "bm25(accounts_fts, 10.0, 4.0, 4.0, 1.0)"
+
+
+def _add_search_index(cursor: sqlite3.Cursor) -> None:
+    """
+    Schema version 2.
+    Adds FTS5 full-text search index over item, url,
+    username and notes, built from existing accounts.
+    Skipped if SQLCipher was built without FTS5,
+    search falls back to SQL LIKE in that case.
+
+    """
+
+    try:
+        cursor.execute(SEARCH_INDEX_SQL[0])
+    except sqlite3.OperationalError as error:
+        if "fts5" not in str(error):
+            raise
+        return
+
+    for statement in SEARCH_INDEX_SQL[1:]:
+        cursor.execute(statement)
+
+
+def _fts_query(text: str) -> str:
+    """
+    Converts user search text into a safe FTS5 MATCH query.
+    Every word is quoted and used as a prefix,
+    all words must match (implicit AND).
+
+    Parameters
+    ----------
+    text : str
+        Search text as entered by user
+
+    Returns
+    -------
+    str
+        FTS5 query, empty if text has no searchable words
+
+    """
+
+    words: list = [word for word in text.split() if any(c.isalnum() for c in word)]
+    return " ".join('"{0}"*'.format(word.replace('"', '""')) for word in words)
+
+
+def _like_pattern(text: str) -> str:
+    """
+    Converts user search text into a SQL LIKE
+    'contains' pattern with wildcards escaped by backslash.
+
+    """
+
+    escaped: str = text.strip()
+    for symbol in ("\\", "%", "_"):
+        escaped = escaped.replace(symbol, "\\" + symbol)
+    return f"%{escaped}%"
+
+
+# Schema migrations in order of appliance.
+# Migration at index N upgrades Database to version N + 1,
+# version is stored in a Database header with PRAGMA user_version.
+# Never reorder or remove migrations, only append new ones.
+def _add_unique_login(cursor: sqlite3.Cursor) -> None:
+    """
+    Schema version 3.
+    Makes (url, username) unique for Accounts with non-empty
+    url or username. Nothing is deleted: older duplicates
+    (keeping the most recently modified Account, the latest
+    added one on ties) are moved to accounts_conflicts table
+    with their primary keys, then (url, username) index
+    is replaced with a partial unique one.
+
+    """
+
+    cursor.execute(
+        """CREATE TABLE accounts_conflicts (
+        id INTEGER PRIMARY KEY,
+        item TEXT,
+        url TEXT,
+        username TEXT,
+        password TEXT,
+        notes TEXT,
+        date_created TEXT,
+        date_modified TEXT
+        )"""
+    )
+    cursor.execute(
+        f"""INSERT INTO accounts_conflicts
+        SELECT {", ".join(ACCOUNT_COLUMNS)} FROM accounts
+        WHERE (url <> '' OR username <> '') AND EXISTS (
+        SELECT 1 FROM accounts AS newer
+        WHERE newer.url = accounts.url AND newer.username = accounts.username
+        AND (newer.date_modified > accounts.date_modified
+        OR (newer.date_modified = accounts.date_modified AND newer.id > accounts.id))
+        )"""
+    )
+    cursor.execute(
+        "DELETE FROM accounts WHERE id IN (SELECT id FROM accounts_conflicts)"
+    )
+    cursor.execute("DROP INDEX IF EXISTS idx_accounts_url_username")
+    cursor.execute(
+        "CREATE UNIQUE INDEX idx_accounts_login ON accounts (url, username) "
+        f"WHERE {LOGIN_WHERE}"
+    )
+
+
+def _rebuild_with_epoch_dates(cursor: sqlite3.Cursor, table: str) -> None:
+    """
+    Rebuilds Accounts table with INTEGER Unix time dates
+    instead of '%Y-%m-%d %H:%M:%S' local time TEXT,
+    unparsable dates are set to migration time.
+    Primary keys are kept, indexes and triggers are dropped.
+
+    """
+
+    cursor.execute(
+        f"""CREATE TABLE {table}_new (
+        id INTEGER PRIMARY KEY,
+        item TEXT,
+        url TEXT,
+        username TEXT,
+        password TEXT,
+        notes TEXT,
+        date_created INTEGER,
+        date_modified INTEGER
+        )"""
+    )
+    # text dates are local time, 'utc' modifier converts them to Unix time
+    cursor.execute(
+        f"""INSERT INTO {table}_new
+        SELECT id, item, url, username, password, notes,
+        coalesce(CAST(strftime('%s', date_created, 'utc') AS INTEGER),
+        CAST(strftime('%s', 'now') AS INTEGER)),
+        coalesce(CAST(strftime('%s', date_modified, 'utc') AS INTEGER),
+        CAST(strftime('%s', 'now') AS INTEGER))
+        FROM {table}"""
+    )
+    # dropping a table drops it's indexes and triggers too
+    cursor.execute(f"DROP TABLE {table}")
+    cursor.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+
+
+def _has_table(cursor: sqlite3.Cursor, name: str) -> bool:
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=:name",
+        {"name": name},
+    )
+    return cursor.fetchone() is not None
+
+
+def _use_epoch_dates(cursor: sqlite3.Cursor) -> None:
+    """
+    Schema version 4.
+    Rebuilds accounts and accounts_conflicts tables with
+    INTEGER Unix time dates instead of local time TEXT.
+    Indexes and search triggers are recreated,
+    date_modified is indexed for age queries.
+
+    """
+
+    _rebuild_with_epoch_dates(cursor, "accounts")
+    if _has_table(cursor, "accounts_conflicts"):
+        _rebuild_with_epoch_dates(cursor, "accounts_conflicts")
+
+    cursor.execute("CREATE INDEX idx_accounts_item ON accounts (item COLLATE NOCASE)")
+    cursor.execute(
+        "CREATE UNIQUE INDEX idx_accounts_login ON accounts (url, username) "
+        f"WHERE {LOGIN_WHERE}"
+    )
+    cursor.execute(
+        "CREATE INDEX idx_accounts_date_modified ON accounts (date_modified)"
+    )
+
+    if _has_table(cursor, "accounts_fts"):
+        for statement in SEARCH_INDEX_SQL[1:]:
+            cursor.execute(statement)
+
+
+MIGRATIONS: tuple = (
+    _add_lookup_indexes,
+    _add_search_index,
+    _add_unique_login,
+    _use_epoch_dates,
+)
+
+
+def migrate(connection: sqlite3.Connection) -> int:
+    """
+    Upgrades Database schema in place by applying
+    all migrations newer than Database user_version.
+    Every migration runs in its own transaction
+    together with user_version update.
+
+    Parameters
+    ----------
+    connection : sqlite3.Connection
+        Connection to a Database, keyed if encrypted
+
+    Returns
+    -------
+    int
+        Database schema version after migration
+
+    """
+
+    cursor = connection.cursor()
+    version: int = cursor.execute("PRAGMA user_version").fetchone()[0]
+
+    for target, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        try:
+            cursor.execute("BEGIN")
+            migration(cursor)
+            # PRAGMA does not accept parameters, target is always int
+            cursor.execute(f"PRAGMA user_version = {int(target)}")
+            connection.commit()
+        except sqlite3.Error:
+            connection.rollback()
+            raise
+        version = target
+
+    return version
+
+
+def quote_key(password: str) -> str:
+    """
+    Quotes master password as SQL string literal
+    for 'pragma key', so any symbols are allowed.
+
+    """
+
+    return "'{0}'".format(password.replace("'", "''"))
+
+
+def apply_cipher_settings(connection: sqlite3.Connection) -> None:
+    """
+    Applies SQLCipher kdf_iter and cipher_page_size from config.
+    Must run right after 'pragma key' and before first
+    Database access, with the same values Database was created with.
+    Settings set to None are left at SQLCipher defaults.
+
+    Parameters
+    ----------
+    connection : sqlite3.Connection
+        Connection to a Database with key set
+
+    """
+
+    for pragma in ("kdf_iter", "cipher_page_size"):
+        value = database_settings.get(pragma)
+        if value is not None:
+            # PRAGMA does not accept parameters, value is always int
+            connection.execute(f"PRAGMA {pragma} = {int(value)}")
+
+
+def calibrate_kdf_iter(target: float = 0.5, sample_iter: int = 20000) -> int:
+    """
+    Benchmarks SQLCipher key derivation function
+    (PBKDF2-HMAC-SHA512) on this machine and estimates
+    number of KDF iterations that makes Database unlock
+    take about target seconds. Use result as kdf_iter in config
+    before Database is created.
+
+    Parameters
+    ----------
+    target : float
+        Desired key derivation time in seconds (default is 0.5)
+    sample_iter : int
+        Number of iterations benchmarked (default is 20000)
+
+    Returns
+    -------
+    int
+        KDF iterations rounded to thousands,
+        at least KDF_MIN_ITER
+
+    """
+
+    password: bytes = os.urandom(16)
+    salt: bytes = os.urandom(16)
+
+    # best of 3 runs, to skip scheduler noise
+    elapsed: float = float("inf")
+    for _ in range(3):
+        start: float = perf_counter()
+        hashlib.pbkdf2_hmac(KDF_HASH, password, salt, sample_iter, 32)
+        elapsed = min(elapsed, perf_counter() - start)
+
+    iterations: int = int(sample_iter * target / elapsed) // 1000 * 1000
+    return max(KDF_MIN_ITER, iterations)
 
 
 def create_db(path: str, password: str, to_create: bool = False) -> None:
@@ -36,7 +470,8 @@ def create_db(path: str, password: str, to_create: bool = False) -> None:
         connection = sqlite3.connect(path)
         if password is not None:
             # set pragma key as a master password
-            connection.execute(f"pragma key = {password}")
+            connection.execute(f"pragma key = {quote_key(password)}")
+            apply_cipher_settings(connection)
         cursor = connection.cursor()
         cursor.execute(
             """CREATE TABLE accounts (
@@ -51,6 +486,7 @@ def create_db(path: str, password: str, to_create: bool = False) -> None:
             )"""
         )
         connection.commit()
+        migrate(connection)
         connection.close()
 
 
@@ -65,44 +501,352 @@ class DatabaseEngine:
         The path where Database is stored
     password : str
         The master password used for Database encryption
+    session_key : SessionKey
+        Raw key derived once per session, None if not available
+    moved_conflicts : int
+        Number of duplicate logins moved to accounts_conflicts
+        by migrations run on this connect
 
     Methods
     -------
+    check_key
+        Checks that Database can be decrypted with the key set
+    apply_profile(profile)
+        Applies tuning profile PRAGMAs to a connection
+    tuned(profile)
+        Applies tuning profile within a context
+    connect(key=None)
+        Opens Database connection and checks the key
+    reopen(profile=None)
+        Opens another connection with the session raw key
+    close
+        Closes Database connection
+    end_session
+        Closes Database connection and wipes session key
+    migrate
+        Upgrades Database schema to the latest version
+    count_conflicts
+        Counts duplicate logins moved aside by migrations
     safe_push
         Commits changes made to a Database
     add_account(account)
         Adds Account to a Database
+    add_accounts(accounts, chunk_size=1000, progress=None, skip_duplicates=False)
+        Adds many Accounts to a Database in chunked transactions
+    upsert_accounts(accounts, chunk_size=1000, progress=None)
+        Adds or updates many Accounts by (url, username)
+    is_empty
+        Checks if there are no Accounts in a Database
+    load_accounts(accounts, chunk_size=5000, progress=None)
+        Adds many Accounts to an empty Database in one transaction
     get_account(item)
-        Gets Account from a Database by Account item (description) name using SQL LIKE statement
+        Gets Account from a Database by exact item name or best search match
+    search_accounts(query, limit=50)
+        Gets ranked list of Accounts matching search query
     get_exact_account(item)
         Gets Account from a Database by Account item (description) name
+    get_account_by_id(account_id)
+        Gets Account from a Database by it's primary key
     get_all_accounts
         Gets all Accounts from a Database
+    iter_accounts(columns=None, batch=500)
+        Iterates over Accounts or selected columns in batches
+    list_items
+        Gets primary keys and item names of all Accounts
+    list_items_page(after=None, limit=200)
+        Gets a page of primary keys and item names after a given one
+    get_stale_accounts(max_age=YEAR, limit=100)
+        Gets Accounts not modified for longer than max_age
     update_account(account, password)
         Updates Account's password in a Database
+    update_accounts(changes)
+        Updates fields of many Accounts by primary key
     delete_account
         Deletes Account from a Database
+    delete_accounts(ids)
+        Deletes many Accounts by primary key
     clear_database
         Wipes Database completely
 
     """
 
-    def __init__(self, path: str, password: str = None):
+    def __init__(
+        self,
+        path: str,
+        password: str = None,
+        profile: str = None,
+        session_key: SessionKey = None,
+        check_same_thread: bool = True,
+    ):
         """
+        Opens Database with a raw session key if one is given.
+        Else if password is given, raw key is derived from it once
+        and kept in session_key for cheap reopen.
+        Password is passed to SQLCipher as is only if raw key
+        can not be derived for a file (see session_key.has_salt),
+        so a wrong password pays key derivation only once.
+
         Parameters
         ----------
         path : str
             The path where Database is stored
         password : str
             The master password used for Database encryption
+        profile : str, optional
+            Tuning profile name from TUNING_PROFILES,
+            profile from config is used if None
+        session_key : SessionKey, optional
+            Raw key derived earlier in a session
+        check_same_thread : bool
+            Whether only creating thread may use connection
+            (default is True)
+
+        Raises
+        ------
+        sqlite3.DatabaseError
+            Raises error if password is wrong
 
         """
 
-        self.connection = sqlite3.connect(path)
+        self.path = path
+        self.session_key = session_key
+        self.check_same_thread = check_same_thread
+        page_size: int = database_settings.get("cipher_page_size") or DEFAULT_PAGE_SIZE
+        if session_key is None and password is not None and has_salt(path, page_size):
+            kdf_iter: int = database_settings.get("kdf_iter") or DEFAULT_KDF_ITER
+            self.session_key = SessionKey.derive(path, password, kdf_iter)
+
+        if self.session_key is not None:
+            try:
+                self.connect(self.session_key.pragma())
+            except sqlite3.DatabaseError:
+                # raw key has the right layout, so password is wrong
+                if session_key is None:
+                    self.session_key.wipe()
+                    self.session_key = None
+                raise
+        else:
+            self.connect(None if password is None else quote_key(password))
+
+        try:
+            self.migrate()
+            self.apply_profile(profile or database_settings["profile"])
+        except (sqlite3.Error, ValueError):
+            self.close()
+            raise
+        self.full_text_search: bool = self.has_table("accounts_fts")
+
+    def connect(self, key: str = None) -> None:
+        """
+        Opens Database connection, sets key
+        and cipher settings and checks the key.
+
+        Parameters
+        ----------
+        key : str, optional
+            'pragma key' value: quoted passphrase or raw key,
+            Database is not encrypted if None
+
+        Raises
+        ------
+        sqlite3.DatabaseError
+            Raises error if key is wrong
+
+        """
+
+        self.connection = sqlite3.connect(
+            self.path, check_same_thread=self.check_same_thread
+        )
         self.cursor = self.connection.cursor()
-        if password is not None:
-            # set pragma key as a master password
-            self.cursor.execute(f"pragma key={password}")
+        # cursor for 'SELECT *' queries, builds Accounts from rows
+        self.account_cursor = self.connection.cursor()
+        self.account_cursor.row_factory = account_factory
+        if key is not None:
+            # set pragma key as a master password or raw key
+            self.cursor.execute(f"pragma key = {key}")
+            apply_cipher_settings(self.connection)
+
+        try:
+            self.check_key()
+        except sqlite3.Error:
+            self.close()
+            raise
+
+    def reopen(
+        self, profile: str = None, check_same_thread: bool = True
+    ) -> DatabaseEngine:
+        """
+        Opens another connection to the same Database
+        with the session raw key, without key derivation.
+        Used for connections owned by other threads.
+
+        Parameters
+        ----------
+        profile : str, optional
+            Tuning profile name, same as this one if None
+        check_same_thread : bool
+            Whether only creating thread may use connection
+            (default is True)
+
+        Returns
+        -------
+        DatabaseEngine
+            New DatabaseEngine with it's own connection
+
+        Raises
+        ------
+        ValueError
+            Raises error if session key is not available
+
+        """
+
+        if self.session_key is None:
+            raise ValueError("Session key is not available")
+        return DatabaseEngine(
+            self.path,
+            profile=profile or self.profile,
+            session_key=self.session_key,
+            check_same_thread=check_same_thread,
+        )
+
+    def check_key(self) -> None:
+        """
+        Checks that Database can be decrypted with the key set,
+        by the cheapest query that reads a Database schema.
+
+        Raises
+        ------
+        sqlite3.DatabaseError
+            Raises error if key is wrong or file is not a Database
+
+        """
+
+        self.cursor.execute("SELECT count(*) FROM sqlite_master")
+        self.cursor.fetchone()
+
+    def apply_profile(self, profile: str) -> None:
+        """
+        Applies tuning profile PRAGMAs to a connection.
+        Pending changes are committed first, as journal_mode
+        can not be changed inside a transaction.
+
+        Parameters
+        ----------
+        profile : str
+            Tuning profile name from TUNING_PROFILES
+
+        Raises
+        ------
+        ValueError
+            Raises error if there is no such profile
+
+        """
+
+        if profile not in TUNING_PROFILES:
+            raise ValueError(f"Available profiles: {', '.join(TUNING_PROFILES)}")
+
+        self.safe_push()
+        for pragma, value in TUNING_PROFILES[profile].items():
+            self.cursor.execute(f"PRAGMA {pragma} = {value}")
+            self.cursor.fetchall()
+        self.profile: str = profile
+
+    @contextmanager
+    def tuned(self, profile: str) -> Iterator[DatabaseEngine]:
+        """
+        Context manager that applies tuning profile
+        and restores the previous one on exit.
+
+        Parameters
+        ----------
+        profile : str
+            Tuning profile name from TUNING_PROFILES
+
+        """
+
+        previous: str = self.profile
+        self.apply_profile(profile)
+        try:
+            yield self
+        finally:
+            self.apply_profile(previous)
+
+    def close(self) -> None:
+        """
+        Closes Database connection,
+        uncommitted changes are discarded.
+
+        """
+
+        self.connection.close()
+
+    def end_session(self) -> None:
+        """
+        Commits changes, closes Database connection
+        and wipes session key from memory.
+        Connections reopened with the same key
+        should be closed before.
+
+        """
+
+        self.safe_push()
+        self.close()
+        if self.session_key is not None:
+            self.session_key.wipe()
+
+    def has_table(self, name: str) -> bool:
+        """
+        Checks if a table exists in a Database.
+
+        Parameters
+        ----------
+        name : str
+            The table name
+
+        Returns
+        -------
+        bool
+            True if table exists, False otherwise
+
+        """
+
+        return _has_table(self.cursor, name)
+
+    def migrate(self) -> int:
+        """
+        Upgrades Database schema to the latest version.
+        Existing Databases are upgraded in place on connect.
+        Sets moved_conflicts to a number of duplicate
+        logins moved to accounts_conflicts on the way.
+
+        Returns
+        -------
+        int
+            Database schema version after migration
+
+        """
+
+        before: int = self.count_conflicts()
+        version: int = migrate(self.connection)
+        self.moved_conflicts: int = self.count_conflicts() - before
+        return version
+
+    def count_conflicts(self) -> int:
+        """
+        Counts Accounts moved to accounts_conflicts table
+        when (url, username) was made unique.
+
+        Returns
+        -------
+        int
+            Number of moved Accounts, 0 if there is no such table
+
+        """
+
+        if not self.has_table("accounts_conflicts"):
+            return 0
+        self.cursor.execute("SELECT count(*) FROM accounts_conflicts")
+        return self.cursor.fetchone()[0]
 
     def safe_push(self) -> None:
         """
@@ -112,7 +856,7 @@ class DatabaseEngine:
 
         self.connection.commit()
 
-    def add_account(self, account: Account) -> None:
+    def add_account(self, account: Account) -> int:
         """
         Adds Account to a Database.
 
@@ -121,42 +865,318 @@ class DatabaseEngine:
         account : Account
             The account that will be added
 
+        Returns
+        -------
+        int
+            The primary key of added Account
+
         """
 
-        self.cursor.execute(
-            "INSERT INTO accounts (item, url, username, password, notes, date_created, date_modified) VALUES (:item, :url, :username, :password, :notes, :date_created, :date_modified)",
-            {
-                "item": account.item,
-                "url": account.url,
-                "username": account.username,
-                "password": account.password,
-                "notes": account.notes,
-                "date_created": account.date_created,
-                "date_modified": account.date_modified,
-            },
-        )
+        self.cursor.execute(INSERT_ACCOUNT_SQL, account.as_dict())
+        return self.cursor.lastrowid
+
+    def add_accounts(
+        self,
+        accounts: Iterable[Account],
+        chunk_size: int = 1000,
+        progress: Callable[[int], None] = None,
+        skip_duplicates: bool = False,
+    ) -> int:
+        """
+        Adds many Accounts to a Database using executemany.
+        Accounts are consumed lazily in chunks of chunk_size,
+        every chunk is inserted and committed in its own transaction.
+        If a chunk fails, it is rolled back and the error is raised,
+        chunks committed before stay in a Database.
+        Unlike upsert_accounts, existing Accounts are never changed.
+
+        Parameters
+        ----------
+        accounts : Iterable[Account]
+            The accounts that will be added, may be a generator
+        chunk_size : int
+            Number of accounts inserted per transaction (default is 1000)
+        progress : Callable[[int], None], optional
+            Called with a total number of processed accounts
+            after every committed chunk
+        skip_duplicates : bool
+            Whether to skip Accounts with an existing (url, username)
+            instead of failing a chunk (default is False)
+
+        Returns
+        -------
+        int
+            Number of accounts added
+
+        Raises
+        ------
+        sqlite3.IntegrityError
+            Raises error if login already exists
+            and skip_duplicates is False
+
+        """
+
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer")
+
+        # commit pending changes, so they are not mixed with chunk transactions
+        self.safe_push()
+
+        sql: str = INSERT_NEW_ACCOUNT_SQL if skip_duplicates else INSERT_ACCOUNT_SQL
+        inserted: int = 0
+        processed: int = 0
+        accounts = iter(accounts)
+        while True:
+            chunk: list = [
+                account.as_dict() for account in islice(accounts, chunk_size)
+            ]
+            if not chunk:
+                break
+
+            try:
+                self.cursor.executemany(sql, chunk)
+                # skipped rows are not counted
+                inserted += self.cursor.rowcount
+                self.connection.commit()
+            except sqlite3.Error:
+                self.connection.rollback()
+                raise
+
+            processed += len(chunk)
+            if progress is not None:
+                progress(processed)
+
+        return inserted
+
+    def upsert_accounts(
+        self,
+        accounts: Iterable[Account],
+        chunk_size: int = 1000,
+        progress: Callable[[int], None] = None,
+    ) -> tuple[int, int, int]:
+        """
+        Adds many Accounts to a Database or updates existing ones
+        with the same (url, username), in a single pass.
+        Existing Account is updated only if incoming one has
+        a newer date_modified, otherwise incoming one is skipped,
+        so merging the same file again changes nothing.
+        Accounts with both url and username empty are not
+        logins, they never match and are always added.
+        Every chunk is committed in its own transaction.
+
+        Parameters
+        ----------
+        accounts : Iterable[Account]
+            The accounts that will be merged, may be a generator
+        chunk_size : int
+            Number of accounts merged per transaction (default is 1000)
+        progress : Callable[[int], None], optional
+            Called with a total number of processed accounts
+            after every committed chunk
+
+        Returns
+        -------
+        tuple[int, int, int]
+            Numbers of inserted, updated and skipped accounts
+
+        """
+
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer")
+
+        self.safe_push()
+
+        inserted: int = 0
+        updated: int = 0
+        processed: int = 0
+        accounts = iter(accounts)
+        while True:
+            chunk: list = [
+                account.as_dict() for account in islice(accounts, chunk_size)
+            ]
+            if not chunk:
+                break
+
+            try:
+                last_id: int = self.cursor.execute(
+                    "SELECT coalesce(max(id), 0) FROM accounts"
+                ).fetchone()[0]
+                self.cursor.executemany(UPSERT_ACCOUNT_SQL, chunk)
+                # rowcount counts both inserted and updated rows
+                changed: int = self.cursor.rowcount
+                new: int = self.cursor.execute(
+                    "SELECT count(*) FROM accounts WHERE id > ?", (last_id,)
+                ).fetchone()[0]
+                self.connection.commit()
+            except sqlite3.Error:
+                self.connection.rollback()
+                raise
+
+            inserted += new
+            updated += changed - new
+            processed += len(chunk)
+            if progress is not None:
+                progress(processed)
+
+        return inserted, updated, processed - inserted - updated
+
+    def is_empty(self) -> bool:
+        """
+        Checks if there are no Accounts in a Database.
+
+        Returns
+        -------
+        bool
+            True if Database has no Accounts, False otherwise
+
+        """
+
+        self.cursor.execute("SELECT EXISTS (SELECT 1 FROM accounts)")
+        return not self.cursor.fetchone()[0]
+
+    def load_accounts(
+        self,
+        accounts: Iterable[Account],
+        chunk_size: int = 5000,
+        progress: Callable[[int], None] = None,
+    ) -> int:
+        """
+        Adds many Accounts to an empty Database in a single
+        transaction, e.g. on a restore. Search index triggers
+        are dropped while loading and the index is rebuilt once
+        at the end, which is several times faster than updating
+        it row by row. If anything fails, nothing is added.
+
+        Parameters
+        ----------
+        accounts : Iterable[Account]
+            The accounts that will be added, may be a generator
+        chunk_size : int
+            Number of accounts passed to executemany at once
+            (default is 5000)
+        progress : Callable[[int], None], optional
+            Called with a total number of inserted accounts
+            after every chunk
+
+        Returns
+        -------
+        int
+            Number of accounts added
+
+        Raises
+        ------
+        ValueError
+            Raises error if Database is not empty
+
+        """
+
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer")
+        if not self.is_empty():
+            raise ValueError("Accounts can only be loaded to an empty Database")
+
+        self.safe_push()
+
+        inserted: int = 0
+        accounts = iter(accounts)
+        try:
+            self.cursor.execute("BEGIN")
+            if self.full_text_search:
+                for trigger in SEARCH_TRIGGERS:
+                    self.cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+
+            while True:
+                chunk: list = [
+                    account.as_dict() for account in islice(accounts, chunk_size)
+                ]
+                if not chunk:
+                    break
+                self.cursor.executemany(INSERT_ACCOUNT_SQL, chunk)
+                inserted += len(chunk)
+                if progress is not None:
+                    progress(inserted)
+
+            if self.full_text_search:
+                # triggers and rebuild statements of SEARCH_INDEX_SQL
+                for statement in SEARCH_INDEX_SQL[1:]:
+                    self.cursor.execute(statement)
+            self.connection.commit()
+        except BaseException:
+            self.connection.rollback()
+            raise
+
+        return inserted
 
     def get_account(self, item: str) -> Account:
         """
         Gets Account from a Database by Account item
-        (description) name using SQL LIKE statement.
+        (description) name. Exact item match is preferred,
+        otherwise the best ranked search result is returned.
 
         Parameters
         ----------
         item : str
-            The account item name (description)
+            The account item name (description) or search text
 
         Returns
         -------
         Account
-            The Account most similar by item name
+            The Account most similar by item name,
+            None if nothing was found
 
         """
 
-        self.cursor.execute(
-            "SELECT * FROM accounts WHERE item like '%{0}%'".format(item)
+        account: Account = self.get_exact_account(item)
+        if account is not None:
+            return account
+
+        results: list[Account] = self.search_accounts(item, limit=1)
+        return results[0] if results else None
+
+    def search_accounts(self, query: str, limit: int = 50) -> list[Account]:
+        """
+        Searches Accounts by item, url, username and notes.
+        Uses FTS5 index with BM25 ranking, item matches
+        rank higher. Every word of a query is matched as a prefix.
+        Falls back to unranked SQL LIKE if FTS5 is not available.
+
+        Parameters
+        ----------
+        query : str
+            Search text
+        limit : int
+            Maximum number of results (default is 50)
+
+        Returns
+        -------
+        list[Account]
+            Accounts matching query, best matches first
+
+        """
+
+        if not self.full_text_search:
+            pattern: str = _like_pattern(query)
+            self.account_cursor.execute(
+                """SELECT * FROM accounts
+                WHERE item LIKE :pattern ESCAPE '\\' OR url LIKE :pattern ESCAPE '\\'
+                OR username LIKE :pattern ESCAPE '\\' OR notes LIKE :pattern ESCAPE '\\'
+                LIMIT :limit""",
+                {"pattern": pattern, "limit": limit},
+            )
+            return self.account_cursor.fetchall()
+
+        match: str = _fts_query(query)
+        if not match:
+            return []
+
+        self.account_cursor.execute(
+            f"""SELECT accounts.* FROM accounts_fts
+            JOIN accounts ON accounts.id = accounts_fts.rowid
+            WHERE accounts_fts MATCH :match
+            ORDER BY {SEARCH_RANK_SQL} LIMIT :limit""",
+            {"match": match, "limit": limit},
         )
-        return Account(*self.cursor.fetchone()[1:])  # [1:] -> without ID
+        return self.account_cursor.fetchall()
 
     def get_exact_account(self, item: str) -> Account:
         """
@@ -171,12 +1191,40 @@ class DatabaseEngine:
         Returns
         -------
         Account
-            The exact Account by item name
+            The exact Account by item name,
+            None if there is no such Account
+
+        """
+
+        # NOCASE term lets SQLite use idx_accounts_item,
+        # the second one keeps the match case sensitive
+        self.account_cursor.execute(
+            "SELECT * FROM accounts WHERE item = :item COLLATE NOCASE AND item = :item",
+            {"item": item},
+        )
+        return self.account_cursor.fetchone()
+
+    def get_account_by_id(self, account_id: int) -> Account:
+        """
+        Gets Account from a Database by it's primary key.
+
+        Parameters
+        ----------
+        account_id : int
+            The account primary key
+
+        Returns
+        -------
+        Account
+            The Account with such primary key,
+            None if there is no such Account
 
         """
 
-        self.cursor.execute("SELECT * FROM accounts WHERE item=:item;", {"item": item})
-        return Account(*self.cursor.fetchone()[1:])  # [1:] -> without ID
+        self.account_cursor.execute(
+            "SELECT * FROM accounts WHERE id=:id", {"id": account_id}
+        )
+        return self.account_cursor.fetchone()
 
     def get_all_accounts(self) -> list[Account]:
         """
@@ -189,14 +1237,171 @@ class DatabaseEngine:
 
         """
 
-        self.cursor.execute("SELECT * FROM accounts")
-        return [Account(*account[1:]) for account in self.cursor.fetchall()]
+        return list(self.iter_accounts())
+
+    def iter_accounts(self, columns: tuple = None, batch: int = 500) -> Iterator:
+        """
+        Iterates over all Accounts stored in a Database
+        fetching them from a cursor in batches, so only
+        one batch is held in memory at once.
+        Uses its own cursor, other queries may run
+        while iteration is not finished.
+
+        Parameters
+        ----------
+        columns : tuple, optional
+            Names of accounts table columns to select,
+            whole Accounts are yielded if None
+        batch : int
+            Number of rows fetched at once (default is 500)
+
+        Yields
+        ------
+        Account or tuple
+            Account if columns is None,
+            else tuple of selected columns values
+
+        Raises
+        ------
+        ValueError
+            Raises error if unknown column requested
+
+        """
+
+        if columns is None:
+            selected: tuple = ACCOUNT_COLUMNS
+        else:
+            unknown: set = set(columns) - set(ACCOUNT_COLUMNS)
+            if unknown or not columns:
+                raise ValueError(f"Available columns: {', '.join(ACCOUNT_COLUMNS)}")
+            selected = tuple(columns)
+
+        cursor = self.connection.cursor()
+        if columns is None:
+            cursor.row_factory = account_factory
+        try:
+            cursor.execute(f"SELECT {', '.join(selected)} FROM accounts ORDER BY id")
+            while True:
+                rows: list = cursor.fetchmany(batch)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+
+    def list_items(self) -> list[tuple[int, str]]:
+        """
+        Gets primary keys and item names of all Accounts
+        ordered by item name (case insensitive) in SQL.
+        Reads item index only, no secrets are selected.
+
+        Returns
+        -------
+        list[tuple[int, str]]
+            (id, item) pairs of all Accounts
+
+        """
+
+        self.cursor.execute(
+            "SELECT id, item FROM accounts ORDER BY item COLLATE NOCASE, id"
+        )
+        return self.cursor.fetchall()
+
+    def list_items_page(
+        self, after: tuple[int, str] = None, limit: int = 200
+    ) -> list[tuple[int, str]]:
+        """
+        Gets a page of primary keys and item names ordered
+        the same way as list_items, starting after a given
+        (id, item) pair (keyset pagination). Every page is
+        a seek in item index, so it costs the same
+        wherever in a Database it starts.
+
+        Parameters
+        ----------
+        after : tuple[int, str], optional
+            Last (id, item) pair of a previous page,
+            None for the first page
+        limit : int
+            Maximum number of pairs (default is 200)
+
+        Returns
+        -------
+        list[tuple[int, str]]
+            (id, item) pairs, fewer than limit on the last page
+
+        """
+
+        if after is None:
+            self.cursor.execute(
+                "SELECT id, item FROM accounts "
+                "ORDER BY item COLLATE NOCASE, id LIMIT :limit",
+                {"limit": limit},
+            )
+            return self.cursor.fetchall()
+
+        last_id, last_item = after
+        page: list = []
+        if last_item is None:
+            # NULL items go first, continue them, then start named ones
+            self.cursor.execute(
+                "SELECT id, item FROM accounts WHERE item IS NULL AND id > :id "
+                "ORDER BY id LIMIT :limit",
+                {"id": last_id, "limit": limit},
+            )
+            page = self.cursor.fetchall()
+            if len(page) == limit:
+                return page
+            self.cursor.execute(
+                "SELECT id, item FROM accounts WHERE item IS NOT NULL "
+                "ORDER BY item COLLATE NOCASE, id LIMIT :limit",
+                {"limit": limit - len(page)},
+            )
+            return page + self.cursor.fetchall()
+
+        # written without row values, so SQLite seeks idx_accounts_item
+        self.cursor.execute(
+            "SELECT id, item FROM accounts "
+            "WHERE item >= :item COLLATE NOCASE "
+            "AND (item > :item COLLATE NOCASE OR id > :id) "
+            "ORDER BY item COLLATE NOCASE, id LIMIT :limit",
+            {"item": last_item, "id": last_id, "limit": limit},
+        )
+        return self.cursor.fetchall()
+
+    def get_stale_accounts(
+        self, max_age: int = timestamps.YEAR, limit: int = 100
+    ) -> list[Account]:
+        """
+        Gets Accounts not modified for longer than max_age,
+        oldest first. Runs as a range scan of date_modified index.
+
+        Parameters
+        ----------
+        max_age : int
+            Age in seconds (default is one year)
+        limit : int
+            Maximum number of Accounts (default is 100)
+
+        Returns
+        -------
+        list[Account]
+            Accounts modified before now - max_age
+
+        """
+
+        self.account_cursor.execute(
+            "SELECT * FROM accounts WHERE date_modified < :before "
+            "ORDER BY date_modified LIMIT :limit",
+            {"before": timestamps.now() - max_age, "limit": limit},
+        )
+        return self.account_cursor.fetchall()
 
     def update_account(self, account: Account, password: str) -> None:
         """
-        Updates Account's password in a Database and
-        sets date_modified attribute value to current time.
-        Currently only password value update is implemented.
+        Updates Account's password in a Database by it's
+        primary key and sets date_modified to current time.
+        Runs update_accounts, so it is committed at once.
 
         Parameters
         ----------
@@ -205,37 +1410,118 @@ class DatabaseEngine:
         password: str
             The new password for a Account
 
+        Raises
+        ------
+        ValueError
+            Raises error if Account was not stored yet
+
         """
 
-        self.cursor.execute(
-            "UPDATE accounts SET password=:password, date_modified=:date_modified WHERE url=:url AND username=:username",
-            {
-                "item": account.item,
-                "url": account.url,
-                "username": account.username,
-                "password": password,
-                "notes": account.notes,
-                "date_created": account.date_created,
-                "date_modified": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            },
-        )
+        if account.id is None:
+            raise ValueError("Account is not stored in a Database")
+        self.update_accounts({account.id: {"password": password}})
 
     def delete_account(self, account: Account) -> None:
         """
-        Deletes Account from a Database
-        checked by it's url and username.
+        Deletes Account from a Database by it's primary key.
+        Runs delete_accounts, so it is committed at once.
 
         Parameters
         ----------
         account : Account
             The Account that will be deleted
 
+        Raises
+        ------
+        ValueError
+            Raises error if Account was not stored yet
+
         """
 
-        self.cursor.execute(
-            "DELETE FROM accounts WHERE url=:url AND username=:username",
-            {"url": account.url, "username": account.username},
-        )
+        if account.id is None:
+            raise ValueError("Account is not stored in a Database")
+        self.delete_accounts([account.id])
+
+    def update_accounts(self, changes: dict[int, dict]) -> int:
+        """
+        Updates fields of many Accounts by primary key in one transaction.
+        Only fields present in changes are updated,
+        date_modified is set to current time unless given.
+        Changes with the same set of fields are sent to
+        a Database as one batched (executemany) statement.
+
+        Parameters
+        ----------
+        changes : dict[int, dict]
+            {account id : {field name : new value}}
+
+        Returns
+        -------
+        int
+            Number of updated Accounts
+
+        Raises
+        ------
+        ValueError
+            Raises error if id or unknown field is to be updated
+
+        """
+
+        now: int = timestamps.now()
+        batches: dict[tuple, list] = {}
+        for account_id, fields in changes.items():
+            unknown: set = set(fields) - set(ACCOUNT_COLUMNS[1:])
+            if unknown:
+                raise ValueError(f"Unable to update fields: {', '.join(unknown)}")
+
+            params: dict = {"date_modified": now, **fields, "id": account_id}
+            columns: tuple = tuple(sorted(set(params) - {"id"}))
+            batches.setdefault(columns, []).append(params)
+
+        self.safe_push()
+        updated: int = 0
+        try:
+            for columns, params in batches.items():
+                assignments: str = ", ".join(f"{col}=:{col}" for col in columns)
+                self.cursor.executemany(
+                    f"UPDATE accounts SET {assignments} WHERE id=:id", params
+                )
+                updated += self.cursor.rowcount
+            self.connection.commit()
+        except sqlite3.Error:
+            self.connection.rollback()
+            raise
+
+        return updated
+
+    def delete_accounts(self, ids: Iterable[int]) -> int:
+        """
+        Deletes many Accounts by primary key
+        with one batched statement in one transaction.
+
+        Parameters
+        ----------
+        ids : Iterable[int]
+            Primary keys of Accounts to delete
+
+        Returns
+        -------
+        int
+            Number of deleted Accounts
+
+        """
+
+        self.safe_push()
+        try:
+            self.cursor.executemany(
+                "DELETE FROM accounts WHERE id=?", ((account_id,) for account_id in ids)
+            )
+            self.connection.commit()
+        except sqlite3.Error:
+            self.connection.rollback()
+            raise
+
+        return self.cursor.rowcount
 
     def clear_database(self) -> None:
         """
@@ -246,10 +1532,22 @@ class DatabaseEngine:
         self.cursor.execute("DELETE FROM accounts")
 
 
+def account_factory(cursor: sqlite3.Cursor, row: tuple) -> Account:
+    """
+    Cursor row_factory that builds Account
+    from a whole accounts table row ('SELECT *').
+
+    """
+
+    return Account(*row[1:], id=row[0])
+
+
 class Account:
     """
     A class used to represent an Account
     that will be stored in a Database.
+    Attributes are stored in slots, so
+    Accounts are cheap to create and keep in bulk.
 
     Attributes
     ----------
@@ -263,19 +1561,26 @@ class Account:
         The Account's password
     notes: str
         The Account's brief text notes
-    date_created: str
-        The Account's date of creation
-    date_modified: str
-        The Account's date of last edit
+    date_created: int
+        The Account's date of creation, Unix time
+    date_modified: int
+        The Account's date of last edit, Unix time
+    id: int
+        The Account's primary key in a Database,
+        None if Account was not stored yet
 
     Methods
     -------
-    from_faker
+    from_faker(faker=None)
         Generates fake Account.
         Powered by mighty Faker.
+    as_dict
+        Returns Account fields as a dictionary
 
     """
 
+    __slots__ = ACCOUNT_COLUMNS
+
     def __init__(
         self,
         item: str,
@@ -283,8 +1588,9 @@ class Account:
         username: str,
         password: str,
         notes: str,
-        date_created: str,
-        date_modified: str,
+        date_created: int,
+        date_modified: int,
+        id: int = None,
     ):
         """
         Parameters
@@ -299,12 +1605,12 @@ class Account:
             The Account's password
         notes: str
             The Account's brief text notes
-        date_created: str
-            The Account's date of creation
-            in '2020-01-26 13:52:01' format
-        date_modified: str
-            The Account's date of last edit
-            in '2020-01-26 13:52:01' format
+        date_created: int
+            The Account's date of creation, Unix time
+        date_modified: int
+            The Account's date of last edit, Unix time
+        id: int, optional
+            The Account's primary key in a Database
 
         """
 
@@ -315,13 +1621,20 @@ class Account:
         self.notes = notes
         self.date_created = date_created
         self.date_modified = date_modified
+        self.id = id
 
     @classmethod
-    def from_faker(cls) -> Account:
+    def from_faker(cls, faker: Faker = None) -> Account:
         """
         Generates fake Account.
         Powered by mighty Faker.
 
+        Parameters
+        ----------
+        faker : Faker, optional
+            Faker instance to reuse when generating
+            many accounts, a new one is created if None
+
         Returns
         -------
         Account
@@ -329,15 +1642,40 @@ class Account:
 
         """
 
-        faker = Faker()
+        if faker is None:
+            faker = Faker()
         item = faker.company()
         url = faker.url()
         username = faker.safe_email()
         password = PasswordGenerator("random", 8).generate_password()
         notes = "Some fake account created with Faker"
-        date_created = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        date_modified = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        date_created = date_modified = timestamps.now()
         return cls(item, url, username, password, notes, date_created, date_modified)
 
+    def as_dict(self) -> dict:
+        """
+        Returns Account fields as a dictionary,
+        used as SQL named parameters and for JSON export.
+
+        Returns
+        -------
+        dict
+            {field name : value} of an Account
+
+        """
+
+        return {
+            "item": self.item,
+            "url": self.url,
+            "username": self.username,
+            "password": self.password,
+            "notes": self.notes,
+            "date_created": self.date_created,
+            "date_modified": self.date_modified,
+        }
+
     def __repr__(self) -> str:
-        return f"Account(item={self.item}, url={self.url}, username={self.username}, password={self.password}, notes={self.notes}, date_created={self.date_created}, date_modified={self.date_modified})"
+        # never leak secrets into logs and tracebacks
+        password: str = "********" if self.password else self.password
+        notes: str = "********" if self.notes else self.notes
+        return f"Account(id={self.id}, item={self.item}, url={self.url}, username={self.username}, password={password}, notes={notes}, date_created={self.date_created}, date_modified={self.date_modified})"
@@ -0,0 +1,213 @@
+"""
+# TODO: should place some nice text here...
+
+This module is responsible for caching reference
+user face encoding, so face authentification encodes
+only a taken picture. Encoding file layout:
+- header: magic, format version, reference image
+  size, modification time and BLAKE2b hash
+- 128 float64 values of the encoding
+- BLAKE2b checksum of header and values
+
+Cache is NOT encrypted: there is no secret available
+before face authentification, and an encoding is derived
+from a reference image stored next to it anyway.
+It is bound to the exact reference image, so it is
+recomputed when the image changes.
+...
+
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import struct
+import hashlib
+
+import numpy
+from face_recognition import load_image_file, face_encodings
+
+from twopasswords.utils.transfer import atomic_writer, commit_atomic, discard_atomic
+
+MAGIC = b"2PWENC"
+FORMAT_VERSION = 2
+DIGEST_SIZE = 32
+# magic, version, reference image size, mtime in nanoseconds and hash
+HEADER = struct.Struct(f">{len(MAGIC)}sBQq{DIGEST_SIZE}s")
+ENCODING_SIZE = 128
+ENCODING_DTYPE = "<f8"
+ENCODING_BYTES = ENCODING_SIZE * numpy.dtype(ENCODING_DTYPE).itemsize
+ENCODING_SUFFIX = ".encoding"
+
+
+def encoding_path(user_face: str) -> str:
+    """
+    Gets encoding file path: reference image path
+    with ENCODING_SUFFIX extension, e.g. user_face.encoding
+
+    Parameters
+    ----------
+    user_face : str
+        Reference user face picture file path
+
+    Returns
+    -------
+    str
+        Encoding file path
+
+    """
+
+    return os.path.splitext(user_face)[0] + ENCODING_SUFFIX
+
+
+def _digest(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=DIGEST_SIZE).digest()
+
+
+def _image_header(user_face: str, image: bytes = None) -> bytes:
+    """
+    Packs header of a reference image. Image is hashed only
+    if it's bytes are given, else hash is left empty.
+
+    """
+
+    stat: os.stat_result = os.stat(user_face)
+    digest: bytes = _digest(image) if image is not None else bytes(DIGEST_SIZE)
+    return HEADER.pack(MAGIC, FORMAT_VERSION, stat.st_size, stat.st_mtime_ns, digest)
+
+
+def compute_reference_encoding(user_face: str, path: str = None):
+    """
+    Encodes reference user face and saves encoding
+    to a disk. Reference image is read once,
+    it's bytes are both decoded and hashed.
+
+    Parameters
+    ----------
+    user_face : str
+        Reference user face picture file path
+    path : str, optional
+        Encoding file path (default is encoding_path)
+
+    Returns
+    -------
+    numpy.ndarray
+        Reference face encoding, None if no face
+        was detected on a reference image
+
+    """
+
+    path = path or encoding_path(user_face)
+    with open(user_face, "rb") as image_file:
+        image: bytes = image_file.read()
+    header: bytes = _image_header(user_face, image)
+
+    encodings: list = face_encodings(load_image_file(io.BytesIO(image)))
+    if not encodings:
+        remove_reference_encoding(user_face, path)
+        return None
+
+    encoding = encodings[0]
+    data: bytes = header + encoding.astype(ENCODING_DTYPE).tobytes()
+
+    out, temp_path = atomic_writer(path, "wb")
+    try:
+        out.write(data + _digest(data))
+        commit_atomic(out, temp_path, path)
+    except BaseException:
+        discard_atomic(out, temp_path)
+        raise
+
+    return encoding
+
+
+def load_reference_encoding(user_face: str, path: str = None):
+    """
+    Loads cached reference user face encoding.
+    Cache is stale if reference image size or mtime
+    differs from ones it was encoded with (checked
+    first, without reading an image), or if image hash
+    differs. Corrupted cache fails a checksum.
+
+    Parameters
+    ----------
+    user_face : str
+        Reference user face picture file path
+    path : str, optional
+        Encoding file path (default is encoding_path)
+
+    Returns
+    -------
+    numpy.ndarray
+        Reference face encoding, None if cache
+        is missing, stale or corrupted
+
+    """
+
+    path = path or encoding_path(user_face)
+    try:
+        with open(path, "rb") as encoding_file:
+            data: bytes = encoding_file.read()
+    except FileNotFoundError:
+        return None
+
+    if len(data) != HEADER.size + ENCODING_BYTES + DIGEST_SIZE:
+        return None
+    body, checksum = data[:-DIGEST_SIZE], data[-DIGEST_SIZE:]
+    if _digest(body) != checksum:
+        return None
+
+    # size and mtime are compared before an image is read and hashed
+    stat_size: int = HEADER.size - DIGEST_SIZE
+    if body[:stat_size] != _image_header(user_face)[:stat_size]:
+        return None
+    with open(user_face, "rb") as image_file:
+        if body[: HEADER.size] != _image_header(user_face, image_file.read()):
+            return None
+
+    return numpy.frombuffer(body[HEADER.size :], dtype=ENCODING_DTYPE)
+
+
+def reference_encoding(user_face: str, path: str = None):
+    """
+    Gets reference user face encoding from a cache,
+    encodes reference image if cache is stale.
+
+    Parameters
+    ----------
+    user_face : str
+        Reference user face picture file path
+    path : str, optional
+        Encoding file path (default is encoding_path)
+
+    Returns
+    -------
+    numpy.ndarray
+        Reference face encoding, None if no face
+        was detected on a reference image
+
+    """
+
+    encoding = load_reference_encoding(user_face, path)
+    if encoding is None:
+        encoding = compute_reference_encoding(user_face, path)
+    return encoding
+
+
+def remove_reference_encoding(user_face: str, path: str = None) -> None:
+    """
+    Removes cached reference user face encoding if exists.
+
+    Parameters
+    ----------
+    user_face : str
+        Reference user face picture file path
+    path : str, optional
+        Encoding file path (default is encoding_path)
+
+    """
+
+    path = path or encoding_path(user_face)
+    if os.path.exists(path):
+        os.remove(path)
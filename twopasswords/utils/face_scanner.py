@@ -7,18 +7,49 @@ recognition authentification processes.
 
 """
 
-from time import sleep
-from cv2 import VideoCapture, imwrite, imread, rectangle
-
-from face_recognition import (
-    load_image_file,
-    face_landmarks,
-    compare_faces,
-    face_encodings,
-    face_locations,
+import os
+import threading
+from time import perf_counter
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Iterator
+from cv2 import (
+    VideoCapture,
+    imwrite,
+    rectangle,
+    cvtColor,
+    COLOR_BGR2RGB,
+    COLOR_RGB2BGR,
 )
 
-from twopasswords.utils.emailer import Emailer
+from face_recognition import compare_faces, face_encodings, face_locations
+
+from twopasswords.utils import emailer
+from twopasswords.utils.face_encoding import reference_encoding
+
+# auth stages in order they run, used in timings report
+AUTH_STAGES: tuple = (
+    "reference",
+    "camera",
+    "capture",
+    "detect",
+    "encode",
+    "compare",
+)
+
+# first webcam frames are dark, frames are read until
+# mean brightness (0-255) changes less than WARMUP_TOLERANCE
+# for WARMUP_STABLE_FRAMES frames in a row, or WARMUP_TIMEOUT
+WARMUP_TOLERANCE = 2.0
+WARMUP_STABLE_FRAMES = 2
+WARMUP_TIMEOUT = 1.0
+# all black frames some webcams return while starting
+WARMUP_BLACK = 1.0
+# every WARMUP_STEP pixel is enough for mean brightness
+WARMUP_STEP = 8
+
+# retryable results of failed burst frames, ties go to a higher priority
+RETRY_PRIORITY: dict[int, int] = {2: 1, 0: 0}
 
 
 class FaceScanner:
@@ -27,29 +58,83 @@ class FaceScanner:
     functionality and face recognition
     processes needed for user authentification.
 
+    Taken frame is kept in memory and faces are detected
+    only once per frame, found face locations are
+    reused for counting, encoding and annotation.
+    In a burst, frames are scored in a thread pool
+    while next ones are captured, auth succeeds on
+    the first matching frame, else frames vote.
+    Frame is saved on a disk only if auth fails,
+    in a background thread, for an auth report.
+
     Attributes
     ----------
     user_face : str
         Reference user face picture file path
     try_face : str
         Image that should be compared file path
+    timings : dict[str, float]
+        Seconds spent in every stage of last auth
+        and in total
+    saving : threading.Thread
+        Last started save_picture thread, None if
+        taken frame was not saved
+    keep_camera : bool
+        Keep webcam open after a picture is taken,
+        so next auth skips opening and warm-up
+    capture : cv2.VideoCapture
+        Open webcam, None if camera is released
+    user_encoding : numpy.ndarray
+        Reference user face encoding, loaded once
+        per FaceScanner by load_user_encoding
+    burst : int
+        Number of frames captured per auth
+    tolerance : float
+        Face compare tolerance
+    frames : int
+        Number of frames scored in last auth
 
     Methods
     -------
+    open_camera
+        Opens webcam if it is not open yet
+    release_camera
+        Releases webcam
+    warm_up(capture)
+        Reads frames until brightness settles
+    take_pictures(count=1)
+        Takes images with a webcam in a row
     take_picture
         Takes image with a webcam
-    count_faces
-        Counts faces on taken image
-    draw_rectangle
+    save_picture(image, locations=(), report=None)
+        Saves image in a background thread
+    locate_faces(image)
+        Detects faces on taken image
+    encode_face(image, location)
+        Encodes a face at detected location
+    draw_rectangle(image, locations)
         Draws nice red rectangles around faces
-    compare_faces(tolerance=0.6)
+    load_user_encoding
+        Loads reference user face encoding once
+    compare_faces(encoding, tolerance=0.6)
         Compares reference image face with other
+    score_frame(image, stop=None)
+        Gets auth result of a single frame
     auth
         Implements main face authentification logic
+    timings_report
+        Formats timings of last auth
 
     """
 
-    def __init__(self, user_face: str, try_face: str) -> None:
+    def __init__(
+        self,
+        user_face: str,
+        try_face: str,
+        keep_camera: bool = False,
+        burst: int = 1,
+        tolerance: float = 0.6,
+    ) -> None:
         """
         Attributes
         ----------
@@ -57,69 +142,304 @@ class FaceScanner:
             Reference user face picture file path
         try_face : str
             Image that should be compared file path
+        keep_camera : bool
+            Keep webcam open after a picture is taken,
+            release_camera should be called when
+            done (default is False)
+        burst : int
+            Number of frames captured per auth (default is 1)
+        tolerance : float
+            Face compare tolerance (default is 0.6)
 
         """
 
         self.user_face = user_face
         self.try_face = try_face
+        self.keep_camera = keep_camera
+        self.timings: dict[str, float] = {}
+        self.saving: threading.Thread = None
+        self.capture: VideoCapture = None
+        self.burst = max(burst, 1)
+        self.tolerance = tolerance
+        self.frames: int = 0
+        self.user_encoding = None
+        self._user_encoding_loaded: bool = False
+        # stages are timed from scoring threads too
+        self._timings_lock = threading.Lock()
+
+    @contextmanager
+    def _stage(self, name: str):
+        """
+        Adds time spent in a with block to timings[name].
 
-    def take_picture(self) -> None:
         """
-        Takes a picture with a default builtin
-        webcam and saves taken image on a disk.
 
+        start: float = perf_counter()
+        try:
+            yield
+        finally:
+            elapsed: float = perf_counter() - start
+            with self._timings_lock:
+                self.timings[name] = self.timings.get(name, 0.0) + elapsed
+
+    def open_camera(self) -> VideoCapture:
         """
-        cap = VideoCapture(0)
+        Opens a default builtin webcam,
+        reuses already open one.
 
-        # images from a webcam are too dark
-        # without a small sleep pause:
-        sleep(1)
+        Returns
+        -------
+        cv2.VideoCapture
+            Open webcam
 
-        ret, frame = cap.read()
-        imwrite(self.try_face, frame)
-        cap.release()
+        """
+
+        if self.capture is None or not self.capture.isOpened():
+            self.capture = VideoCapture(0)
+        return self.capture
+
+    def release_camera(self) -> None:
+        """
+        Releases webcam if it is open.
 
-    def count_faces(self) -> int:
         """
-        Loads a picture and counts faces detected in one.
+
+        if self.capture is not None:
+            self.capture.release()
+            self.capture = None
+
+    def warm_up(self, capture: VideoCapture, timeout: float = WARMUP_TIMEOUT):
+        """
+        Reads frames until webcam exposure settles:
+        mean brightness changes less than WARMUP_TOLERANCE
+        for WARMUP_STABLE_FRAMES frames in a row.
+        Stops after timeout seconds anyway.
+
+        Already warm webcam settles in a few frames,
+        which also drops stale buffered frames.
+
+        Parameters
+        ----------
+        capture : cv2.VideoCapture
+            Open webcam
+        timeout : float
+            Maximum warm-up seconds (default is WARMUP_TIMEOUT)
 
         Returns
         -------
-        int
-            Number of faces detected in image:
-            0 if no faces detected
-            1 if one face detected
-            >1 if multiple faces detected
+        numpy.ndarray
+            Last read BGR frame, None if webcam returned no frame
 
         """
 
-        load_image = load_image_file(self.try_face)
-        face_landmarks_list = face_landmarks(load_image)
-        return len(face_landmarks_list)
+        deadline: float = perf_counter() + timeout
+        frame = None
+        previous: float = None
+        stable: int = 0
+
+        while True:
+            ret, next_frame = capture.read()
+            if not ret:
+                break
+            frame = next_frame
+
+            brightness: float = frame[::WARMUP_STEP, ::WARMUP_STEP].mean()
+            if (
+                previous is not None
+                and brightness > WARMUP_BLACK
+                and abs(brightness - previous) < WARMUP_TOLERANCE
+            ):
+                stable += 1
+            else:
+                stable = 0
+            previous = brightness
+
+            if stable >= WARMUP_STABLE_FRAMES or perf_counter() > deadline:
+                break
+
+        return frame
+
+    def take_pictures(self, count: int = 1) -> Iterator:
+        """
+        Takes pictures with a default builtin webcam:
+        first one as soon as it's exposure settles, then
+        next count - 1 frames in a row. Frames are kept
+        in memory, their BGR channels are converted
+        to RGB in place for face recognition.
+
+        Parameters
+        ----------
+        count : int
+            Number of pictures (default is 1)
+
+        Returns
+        -------
+        Iterator[numpy.ndarray]
+            RGB images yielded as soon as they are read,
+            stops early if camera returned no frame
+
+        """
+
+        with self._stage("camera"):
+            capture: VideoCapture = self.open_camera()
+        try:
+            with self._stage("capture"):
+                frame = self.warm_up(capture)
+
+            for index in range(count):
+                if index:
+                    with self._stage("capture"):
+                        ret, frame = capture.read()
+                    if not ret:
+                        frame = None
+                if frame is None:
+                    return
+                yield cvtColor(frame, COLOR_BGR2RGB, dst=frame)
+        finally:
+            if not self.keep_camera:
+                self.release_camera()
+
+    def take_picture(self):
+        """
+        Takes a picture with a default builtin webcam
+        as soon as it's exposure settles.
+
+        Returns
+        -------
+        numpy.ndarray
+            RGB image, None if camera returned no frame
+
+        """
+
+        pictures: Iterator = self.take_pictures(1)
+        try:
+            return next(pictures, None)
+        finally:
+            pictures.close()
+
+    def save_picture(
+        self, image, locations: list[tuple] = (), report: str = None
+    ) -> threading.Thread:
+        """
+        Saves image with faces annotated to try_face
+        in a background thread, so auth does not wait
+        for JPEG encoding and disk. If report is given,
+        sends auth report with saved image attached.
+
+        Parameters
+        ----------
+        image : numpy.ndarray
+            RGB image
+        locations : list[tuple]
+            Detected locations of faces to annotate
+        report : str, optional
+            Auth report email body
+
+        Returns
+        -------
+        threading.Thread
+            Started thread, join it to wait for a saved file
+
+        """
+
+        def save() -> None:
+            self.draw_rectangle(image, locations)
+            if report is not None:
+                emailer.send_auth_report(report)
+
+        self.saving = threading.Thread(target=save, name="twopasswords-face-save")
+        self.saving.start()
+        return self.saving
+
+    def locate_faces(self, image) -> list[tuple]:
+        """
+        Detects faces on taken image.
+
+        Parameters
+        ----------
+        image : numpy.ndarray
+            RGB image
+
+        Returns
+        -------
+        list[tuple]
+            (top, right, bottom, left) locations of faces:
+            empty if no faces detected, one per face otherwise
 
-    def draw_rectangle(self) -> None:
         """
-        Draws nice red rectangles around all
-        faces that were detected on the image.
 
+        return face_locations(image)
+
+    def encode_face(self, image, location: tuple):
         """
+        Encodes a face at already detected location,
+        so detection does not run again.
 
-        img = imread(self.try_face)
-        taken_img = load_image_file(self.try_face)
-        taken_img_faces = face_locations(taken_img)
+        Parameters
+        ----------
+        image : numpy.ndarray
+            RGB image
+        location : tuple
+            (top, right, bottom, left) location of a face
 
-        for face in taken_img_faces:
+        Returns
+        -------
+        numpy.ndarray
+            128-d face encoding
+
+        """
+
+        return face_encodings(image, known_face_locations=[location])[0]
+
+    def draw_rectangle(self, image, locations: list[tuple]) -> None:
+        """
+        Draws nice red rectangles around all
+        faces that were detected on the image
+        and saves annotated image on a disk.
+
+        Parameters
+        ----------
+        image : numpy.ndarray
+            RGB image
+        locations : list[tuple]
+            Detected locations of faces
+
+        """
+
+        img = cvtColor(image, COLOR_RGB2BGR)
+        for face in locations:
             top_left = face[3], face[0]
             bottom_right = face[1], face[2]
             rectangle(img, top_left, bottom_right, (255, 0, 255), 2)
         imwrite(self.try_face, img)
 
-    def compare_faces(self, tolerance: float = 0.6) -> bool:
+    def load_user_encoding(self):
+        """
+        Loads reference user face encoding from a cache
+        (see face_encoding.reference_encoding) on the first
+        call, next calls reuse it without reading any files.
+
+        Returns
+        -------
+        numpy.ndarray
+            Reference face encoding, None if no face
+            is detected on a reference image
+
+        """
+
+        if not self._user_encoding_loaded:
+            self.user_encoding = reference_encoding(self.user_face)
+            self._user_encoding_loaded = True
+        return self.user_encoding
+
+    def compare_faces(self, encoding, tolerance: float = 0.6) -> bool:
         """
         Compares reference user face with other face.
 
         Parameters
         ----------
+        encoding : numpy.ndarray
+            Encoding of a face that should be compared
         tolerance : float
             The tolerance that will be
             applied in face recognition process.
@@ -128,30 +448,78 @@ class FaceScanner:
 
         Returns
         -------
-        numpy.bool_
+        bool
             True if compare successfull,
-            False otherwise.
+            False otherwise, also if no face
+            is detected on a reference image.
 
         """
 
-        # Load and encode reference user image
-        reference_img = load_image_file(self.user_face)
-        reference_encoding = face_encodings(reference_img)[0]
+        # reference encoding is loaded once, only taken image is encoded
+        user_encoding = self.load_user_encoding()
+        if user_encoding is None:
+            return False
 
-        # Load and get face landmarks from taken image
-        try_img = load_image_file(self.try_face)
-        try_encoding = face_encodings(try_img)
+        results = compare_faces([user_encoding], encoding, tolerance=tolerance)
+        return bool(results[0])
 
-        results = compare_faces(
-            [reference_encoding], try_encoding[0], tolerance=tolerance
-        )
+    def score_frame(
+        self, image, stop: threading.Event = None
+    ) -> tuple[int, list[tuple]]:
+        """
+        Gets auth result of a single frame: faces
+        are detected once, a single face is encoded
+        and compared with reference user face.
+
+        Parameters
+        ----------
+        image : numpy.ndarray
+            RGB image
+        stop : threading.Event, optional
+            Once set, scoring is abandoned
+            before the next expensive stage
+
+        Returns
+        -------
+        tuple[int, list[tuple]]
+            Auth result (see auth) and detected face locations,
+            result is None if scoring was abandoned
+
+        """
+
+        if stop is not None and stop.is_set():
+            return None, []
+        with self._stage("detect"):
+            locations: list[tuple] = self.locate_faces(image)
+
+        if not locations:
+            return 0, locations
+
+        if len(locations) > 1:
+            return 2, locations
+
+        if stop is not None and stop.is_set():
+            return None, locations
+        with self._stage("encode"):
+            encoding = self.encode_face(image, locations[0])
+        with self._stage("compare"):
+            matched: bool = self.compare_faces(encoding, self.tolerance)
 
-        # returns <class 'numpy.bool_'> object
-        return results[0]
+        return (1 if matched else -1), locations
 
     def auth(self) -> int:
         """
         Authentificates user via face recognition.
+        Captures burst frames, every frame is scored
+        in a thread pool as soon as it is read.
+        Returns Auth OK on the first matching frame,
+        remaining frames are not captured or scored.
+        Otherwise stranger's face is reported only if
+        more than half of frames show it, else the most
+        frequent retryable result wins (multiple faces
+        on ties), so a single bad frame does not fail
+        auth harder than a single frame auth does.
+        Time spent in every stage is kept in timings.
 
         Returns
         -------
@@ -164,22 +532,102 @@ class FaceScanner:
 
         """
 
-        self.take_picture()
-
-        if self.count_faces() == 0:
+        self.timings = {}
+        self.frames = 0
+        start: float = perf_counter()
+        try:
+            # loaded before frames are scored in parallel
+            with self._stage("reference"):
+                self.load_user_encoding()
+            return self._auth()
+        finally:
+            self.timings["total"] = perf_counter() - start
+
+    def _auth(self) -> int:
+        images: dict[Future, object] = {}
+        pending: set[Future] = set()
+        votes: list[int] = []
+        # first frame of every failed result, for annotation
+        failed: dict[int, tuple] = {}
+
+        def matched(futures) -> bool:
+            for future in futures:
+                result, locations = future.result()
+                votes.append(result)
+                failed.setdefault(result, (images[future], locations))
+            self.frames = len(votes)
+            return 1 in votes
+
+        stop = threading.Event()
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.burst, os.cpu_count() or 1),
+            thread_name_prefix="twopasswords-face",
+        )
+        pictures: Iterator = self.take_pictures(self.burst)
+        try:
+            for image in pictures:
+                future: Future = executor.submit(self.score_frame, image, stop)
+                images[future] = image
+                pending.add(future)
+
+                done: set[Future] = {future for future in pending if future.done()}
+                pending -= done
+                if matched(done):
+                    return 1
+
+            for future in as_completed(pending):
+                if matched([future]):
+                    return 1
+        finally:
+            pictures.close()
+            # queued frames are dropped, running ones stop at the next
+            # stage and are waited for, so no scoring outlives auth
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        if not votes:
             return 0
 
-        if self.count_faces() > 1:
-            self.draw_rectangle()
-            return 2
-
-        # if result of auth is not True:
-        if self.compare_faces() != [True]:
-            self.draw_rectangle()
-            Emailer.send_auth_report(
-                "Warning! Stranger's face detected. Check the image in attachments."
+        if votes.count(-1) * 2 > len(votes):
+            result: int = -1
+        else:
+            result: int = max(
+                RETRY_PRIORITY,
+                key=lambda vote: (votes.count(vote), RETRY_PRIORITY[vote]),
+            )
+        if result == 2:
+            self.save_picture(*failed[2])
+
+        if result == -1:
+            self.save_picture(
+                *failed[-1],
+                report="Warning! Stranger's face detected. "
+                "Check the image in attachments.",
             )
-            return -1
 
-        # else: AUTH OK
-        return 1
+        return result
+
+    def timings_report(self) -> str:
+        """
+        Formats timings of last auth in milliseconds,
+        e.g. 'Face scan 420 ms, 2 frames: capture 350, detect 180, ...'
+        Stages of frames scored in parallel are summed,
+        so they may add up to more than total.
+
+        Returns
+        -------
+        str
+            Timings report, empty if auth did not run
+
+        """
+
+        if "total" not in self.timings:
+            return ""
+
+        stages: str = ", ".join(
+            f"{name} {self.timings[name] * 1000:.0f}"
+            for name in AUTH_STAGES
+            if name in self.timings
+        )
+        total: float = self.timings["total"] * 1000
+        return f"Face scan {total:.0f} ms, {self.frames} frames: {stages}"
@@ -0,0 +1,240 @@
+"""
+# TODO: should place some nice text here...
+
+This module is responsible for Database connections
+used by background worker threads:
+- every thread gets it's own keyed connection
+- all writes go through a single writer thread
+...
+
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+from twopasswords.utils.database import DatabaseEngine
+
+
+class ConnectionPool:
+    """
+    A class used to represent a pool of Database connections
+    for worker threads. Connections are opened with a session
+    raw key of a base DatabaseEngine, so no key derivation
+    is needed. SQLite allows only one writer at a time,
+    so writes are queued and run by a single writer thread,
+    while readers use their own thread-local connections.
+
+    Attributes
+    ----------
+    database : DatabaseEngine
+        Base DatabaseEngine with a session key
+    busy_timeout : int
+        Milliseconds a connection waits for a locked Database
+    max_pending : int
+        Maximum number of queued writes, 0 for unlimited
+
+    Methods
+    -------
+    reader
+        Gets DatabaseEngine owned by a calling thread
+    submit_read(operation, *args, **kwargs)
+        Runs read operation on a background reader thread
+    submit_write(operation, *args, **kwargs)
+        Queues write operation for the writer thread
+    close
+        Stops the writer thread and closes all connections
+
+    """
+
+    def __init__(
+        self, database: DatabaseEngine, busy_timeout: int = 5000, max_pending: int = 0
+    ):
+        """
+        Parameters
+        ----------
+        database : DatabaseEngine
+            Base DatabaseEngine with a session key
+        busy_timeout : int
+            Milliseconds a connection waits for a locked Database
+            (default is 5000)
+        max_pending : int
+            Maximum number of queued writes, submit_write blocks
+            when queue is full (default is 0 - unlimited)
+
+        """
+
+        self.database = database
+        self.busy_timeout = busy_timeout
+        self.max_pending = max_pending
+
+        self._local = threading.local()
+        self._engines: list[DatabaseEngine] = []
+        self._lock = threading.Lock()
+        self._writes: queue.Queue = queue.Queue(max_pending)
+        self._writer: threading.Thread = None
+        self._readers: ThreadPoolExecutor = None
+        self._closed: bool = False
+
+    def _open(self) -> DatabaseEngine:
+        """
+        Opens new connection with a session key and busy timeout.
+
+        """
+
+        # pool closes connections from other threads on close
+        engine: DatabaseEngine = self.database.reopen(check_same_thread=False)
+        # PRAGMA does not accept parameters, busy_timeout is always int
+        engine.cursor.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout)}")
+        with self._lock:
+            self._engines.append(engine)
+        return engine
+
+    def reader(self) -> DatabaseEngine:
+        """
+        Gets DatabaseEngine owned by a calling thread,
+        opens one on first call from a thread.
+        Should be used for reads only, writes go to submit_write.
+
+        Returns
+        -------
+        DatabaseEngine
+            DatabaseEngine with a thread-local connection
+
+        """
+
+        engine: DatabaseEngine = getattr(self._local, "engine", None)
+        if engine is None:
+            engine = self._local.engine = self._open()
+        return engine
+
+    def submit_read(self, operation: Callable, *args, **kwargs) -> Future:
+        """
+        Runs read operation on a background reader thread.
+        Operation is called as operation(engine, *args, **kwargs)
+        with the reader thread DatabaseEngine, so long reads
+        (exports, snapshots) block neither TUI nor writes.
+
+        Parameters
+        ----------
+        operation : Callable
+            Function that reads from a Database
+
+        Returns
+        -------
+        Future
+            Future with operation result or exception
+
+        Raises
+        ------
+        RuntimeError
+            Raises error if pool is closed
+
+        """
+
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+
+        with self._lock:
+            if self._readers is None:
+                self._readers = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="twopasswords-reader"
+                )
+
+        return self._readers.submit(lambda: operation(self.reader(), *args, **kwargs))
+
+    def submit_write(self, operation: Callable, *args, **kwargs) -> Future:
+        """
+        Queues write operation for the writer thread.
+        Operation is called as operation(engine, *args, **kwargs)
+        with the writer DatabaseEngine, changes are committed
+        if it succeeds and rolled back if it raises.
+
+        Parameters
+        ----------
+        operation : Callable
+            Function that writes to a Database
+
+        Returns
+        -------
+        Future
+            Future with operation result or exception
+
+        Raises
+        ------
+        RuntimeError
+            Raises error if pool is closed
+
+        """
+
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write_loop, name="twopasswords-writer", daemon=True
+                )
+                self._writer.start()
+
+        future: Future = Future()
+        self._writes.put((future, operation, args, kwargs))
+        return future
+
+    def _write_loop(self) -> None:
+        """
+        Runs queued write operations one by one
+        until None is received from a queue.
+
+        """
+
+        try:
+            engine: DatabaseEngine = self._open()
+            open_error: Exception = None
+        except Exception as error:
+            # queued writes fail instead of waiting forever
+            engine, open_error = None, error
+
+        while True:
+            job = self._writes.get()
+            if job is None:
+                break
+
+            future, operation, args, kwargs = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            if engine is None:
+                future.set_exception(open_error)
+                continue
+
+            try:
+                result = operation(engine, *args, **kwargs)
+                engine.safe_push()
+            except Exception as error:
+                engine.connection.rollback()
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def close(self) -> None:
+        """
+        Waits for queued reads and writes, stops reader
+        and writer threads and closes all pool connections.
+        Connections should not be used after that.
+
+        """
+
+        self._closed = True
+        if self._readers is not None:
+            self._readers.shutdown(wait=True)
+        if self._writer is not None:
+            self._writes.put(None)
+            self._writer.join()
+
+        with self._lock:
+            for engine in self._engines:
+                engine.close()
+            self._engines.clear()
@@ -0,0 +1,221 @@
+"""
+# TODO: should place some nice text here...
+
+This module is responsible for keeping Database
+raw encryption key for a session, so new Database
+connections skip SQLCipher key derivation.
+...
+
+"""
+
+from __future__ import annotations
+
+import os
+import ctypes
+import ctypes.util
+import hashlib
+
+# SQLCipher 4 defaults: PBKDF2-HMAC-SHA512, 256000 iterations,
+# 256 bit key, 16 bytes salt stored at a Database file start
+KDF_HASH = "sha512"
+DEFAULT_KDF_ITER = 256000
+KEY_SIZE = 32
+SALT_SIZE = 16
+DEFAULT_PAGE_SIZE = 4096
+# plain SQLite file header, an encrypted Database starts with a salt
+SQLITE_HEADER = b"SQLite format 3\x00"
+
+
+def has_salt(path: str, page_size: int = DEFAULT_PAGE_SIZE) -> bool:
+    """
+    Checks if a Database file has SQLCipher 4 layout
+    a raw key can be derived for: it starts with a salt,
+    not a plain SQLite header, and consists of whole
+    page_size pages (SQLCipher 3 files use 1024 byte pages).
+
+    Parameters
+    ----------
+    path : str
+        The path where Database is stored
+    page_size : int
+        Cipher page size Database was created with
+
+    Returns
+    -------
+    bool
+        True if raw key may be derived, False otherwise
+
+    """
+
+    try:
+        size: int = os.path.getsize(path)
+        with open(path, "rb") as database_file:
+            header: bytes = database_file.read(len(SQLITE_HEADER))
+    except OSError:
+        return False
+
+    return size >= page_size and size % page_size == 0 and header != SQLITE_HEADER
+
+
+def _libc():
+    """
+    Loads C library used for locking key memory,
+    returns None if it is not available.
+
+    """
+
+    try:
+        return ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    except OSError:
+        return None
+
+
+LIBC = _libc()
+
+
+class SessionKey:
+    """
+    A class used to represent a Database raw key
+    derived from a master password once per session.
+    Key and salt are kept in a single bytearray buffer,
+    locked in RAM (best effort, not swapped out)
+    and zeroed by wipe at the end of a session.
+
+    Note: hex string returned by pragma is an immutable
+    copy of a key that can not be zeroed, it should
+    only be passed to a connection and dropped.
+
+    Attributes
+    ----------
+    wiped : bool
+        Whether key was already wiped
+
+    Methods
+    -------
+    derive(path, passphrase, kdf_iter)
+        Derives key from a passphrase and Database salt
+    pragma
+        Gets SQLCipher raw key PRAGMA value
+    wipe
+        Zeroes and unlocks key buffer
+
+    """
+
+    def __init__(self, key: bytes, salt: bytes):
+        """
+        Parameters
+        ----------
+        key : bytes
+            Raw 256 bit encryption key
+        salt : bytes
+            Database salt, 16 bytes
+
+        """
+
+        self._buffer = bytearray(len(key) + len(salt))
+        self._buffer[: len(key)] = key
+        self._buffer[len(key) :] = salt
+        self._locked: bool = self._lock()
+        self.wiped: bool = False
+
+    @classmethod
+    def derive(
+        cls, path: str, passphrase: str, kdf_iter: int = DEFAULT_KDF_ITER
+    ) -> SessionKey:
+        """
+        Derives raw key the same way SQLCipher does
+        from a passphrase and a salt read from a Database file.
+
+        Parameters
+        ----------
+        path : str
+            The path where Database is stored
+        passphrase : str
+            The master password
+        kdf_iter : int
+            KDF iterations Database was created with
+
+        Returns
+        -------
+        SessionKey
+            Derived session key
+
+        """
+
+        with open(path, "rb") as database_file:
+            salt: bytes = database_file.read(SALT_SIZE)
+
+        key = bytearray(
+            hashlib.pbkdf2_hmac(
+                KDF_HASH, passphrase.encode(), salt, int(kdf_iter), KEY_SIZE
+            )
+        )
+        try:
+            return cls(key, salt)
+        finally:
+            key[:] = bytes(len(key))
+
+    def _lock(self) -> bool:
+        """
+        Locks key buffer pages in RAM with mlock.
+
+        Returns
+        -------
+        bool
+            True if buffer was locked, False otherwise
+
+        """
+
+        if LIBC is None:
+            return False
+
+        buffer = (ctypes.c_char * len(self._buffer)).from_buffer(self._buffer)
+        self._address: int = ctypes.addressof(buffer)
+        try:
+            return LIBC.mlock(ctypes.c_void_p(self._address), len(self._buffer)) == 0
+        except AttributeError:
+            return False
+
+    def pragma(self) -> str:
+        """
+        Gets SQLCipher raw key PRAGMA value
+        "x'<64 hex key><32 hex salt>'".
+
+        Returns
+        -------
+        str
+            Raw key PRAGMA value
+
+        Raises
+        ------
+        ValueError
+            Raises error if key was wiped
+
+        """
+
+        if self.wiped:
+            raise ValueError("Session key was wiped")
+        return f"\"x'{self._buffer.hex()}'\""
+
+    def wipe(self) -> None:
+        """
+        Zeroes key buffer in place and unlocks it.
+        Key can not be used after that.
+
+        """
+
+        if self.wiped:
+            return
+
+        self._buffer[:] = bytes(len(self._buffer))
+        if self._locked:
+            LIBC.munlock(ctypes.c_void_p(self._address), len(self._buffer))
+            self._locked = False
+        self.wiped = True
+
+    def __del__(self):
+        if hasattr(self, "wiped"):
+            self.wipe()
+
+    def __repr__(self) -> str:
+        return f"SessionKey(wiped={self.wiped}, locked={self._locked})"
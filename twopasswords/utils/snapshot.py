@@ -0,0 +1,235 @@
+"""
+# TODO: should place some nice text here...
+
+This module is responsible for Database snapshots:
+encrypted page by page copies of a live Database
+made with SQLite online backup API, stored with
+a timestamp and rotated by a retention policy.
+...
+
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from datetime import datetime
+from typing import Callable
+
+from sqlcipher3 import dbapi2 as sqlite3
+
+from twopasswords.utils.database import (
+    DatabaseEngine,
+    apply_cipher_settings,
+    database_settings,
+)
+
+# timestamp with microseconds, so snapshots taken
+# within the same second get different names
+SNAPSHOT_TIME_FORMAT = "%Y%m%d-%H%M%S-%f"
+# older snapshots were named with one second resolution
+LEGACY_TIME_FORMAT = "%Y%m%d-%H%M%S"
+SNAPSHOT_SUFFIX = ".sqlite"
+
+
+def snapshot_dir(database: DatabaseEngine) -> str:
+    """
+    Gets snapshots directory: snapshot_dir from config
+    or "snapshots" next to a Database file.
+
+    Parameters
+    ----------
+    database : DatabaseEngine
+        Database snapshots are taken of
+
+    Returns
+    -------
+    str
+        Snapshots directory path
+
+    """
+
+    return database_settings.get("snapshot_dir") or os.path.join(
+        os.path.dirname(os.path.abspath(database.path)), "snapshots"
+    )
+
+
+def _snapshot_prefix(database: DatabaseEngine) -> str:
+    # accounts.sqlite -> accounts-
+    return os.path.splitext(os.path.basename(database.path))[0] + "-"
+
+
+def _parse_stamp(stamp: str) -> datetime:
+    # snapshot time from a name, None if it is not a snapshot name
+    for time_format in (SNAPSHOT_TIME_FORMAT, LEGACY_TIME_FORMAT):
+        try:
+            return datetime.strptime(stamp, time_format)
+        except ValueError:
+            pass
+    return None
+
+
+def list_snapshots(database: DatabaseEngine, directory: str = None) -> list[str]:
+    """
+    Gets snapshots of a Database, oldest first.
+
+    Parameters
+    ----------
+    database : DatabaseEngine
+        Database snapshots are taken of
+    directory : str, optional
+        Snapshots directory (default is snapshot_dir)
+
+    Returns
+    -------
+    list[str]
+        Snapshot file paths
+
+    """
+
+    directory = directory or snapshot_dir(database)
+    if not os.path.isdir(directory):
+        return []
+
+    prefix: str = _snapshot_prefix(database)
+    snapshots: list[tuple[datetime, str]] = []
+    for name in os.listdir(directory):
+        if not (name.startswith(prefix) and name.endswith(SNAPSHOT_SUFFIX)):
+            continue
+        taken: datetime = _parse_stamp(name[len(prefix) : -len(SNAPSHOT_SUFFIX)])
+        if taken is not None:
+            snapshots.append((taken, name))
+
+    return [os.path.join(directory, name) for _, name in sorted(snapshots)]
+
+
+def rotate_snapshots(
+    database: DatabaseEngine, keep: int, directory: str = None
+) -> list[str]:
+    """
+    Removes all but keep newest snapshots of a Database.
+
+    Parameters
+    ----------
+    database : DatabaseEngine
+        Database snapshots are taken of
+    keep : int
+        Number of newest snapshots kept
+    directory : str, optional
+        Snapshots directory (default is snapshot_dir)
+
+    Returns
+    -------
+    list[str]
+        Removed snapshot file paths
+
+    """
+
+    snapshots: list[str] = list_snapshots(database, directory)
+    removed: list[str] = snapshots[: max(len(snapshots) - max(keep, 1), 0)]
+    for path in removed:
+        os.remove(path)
+    return removed
+
+
+def take_snapshot(
+    database: DatabaseEngine,
+    directory: str = None,
+    keep: int = None,
+    pages: int = 64,
+    sleep: float = 0.005,
+    progress: Callable[[int, int], None] = None,
+) -> str:
+    """
+    Copies a live Database to a timestamped snapshot file
+    with SQLite online backup API. Pages are copied in steps
+    of pages pages, source is unlocked between steps
+    for sleep seconds, so other connections keep reading
+    and writing while a snapshot is taken.
+
+    Snapshot is encrypted with the same session raw key
+    (and salt) as a Database, so it opens with the same
+    master password. It is written to a temporary file
+    and renamed when complete, then old snapshots
+    are rotated.
+
+    Parameters
+    ----------
+    database : DatabaseEngine
+        Database with a session key, it's connection
+        is a backup source, so it should be used by
+        a calling thread only
+    directory : str, optional
+        Snapshots directory (default is snapshot_dir)
+    keep : int, optional
+        Number of newest snapshots kept
+        (default is snapshot_keep from config)
+    pages : int
+        Pages copied per step (default is 64)
+    sleep : float
+        Seconds source is unlocked between steps (default is 0.005)
+    progress : Callable[[int, int], None], optional
+        Called with copied and total pages after every step
+
+    Returns
+    -------
+    str
+        Snapshot file path
+
+    Raises
+    ------
+    ValueError
+        Raises error if session key is not available
+    FileExistsError
+        Raises error if a snapshot with the same name exists,
+        existing snapshots are never overwritten
+
+    """
+
+    if database.session_key is None:
+        raise ValueError("Session key is not available")
+
+    directory = directory or snapshot_dir(database)
+    keep = keep if keep is not None else database_settings.get("snapshot_keep")
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    stamp: str = datetime.now().strftime(SNAPSHOT_TIME_FORMAT)
+    filename: str = os.path.join(
+        directory, f"{_snapshot_prefix(database)}{stamp}{SNAPSHOT_SUFFIX}"
+    )
+    descriptor, temp_path = tempfile.mkstemp(
+        prefix=".twopasswords-", suffix=".tmp", dir=directory
+    )
+    os.close(descriptor)
+
+    def report(status: int, remaining: int, total: int) -> None:
+        progress(total - remaining, total)
+
+    try:
+        target = sqlite3.connect(temp_path)
+        try:
+            target.execute(f"PRAGMA key = {database.session_key.pragma()}")
+            apply_cipher_settings(target)
+            database.connection.backup(
+                target,
+                pages=pages,
+                progress=report if progress is not None else None,
+                sleep=sleep,
+            )
+        finally:
+            target.close()
+
+        with open(temp_path, "rb") as snapshot_file:
+            os.fsync(snapshot_file.fileno())
+        # only possible if a clock was set back
+        if os.path.exists(filename):
+            raise FileExistsError(f"Snapshot {filename} already exists")
+        os.replace(temp_path, filename)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    if keep:
+        rotate_snapshots(database, keep, directory)
+    return filename
@@ -0,0 +1,127 @@
+"""
+# TODO: should place some nice text here...
+
+This module is responsible for Account dates.
+Database keeps dates as integer Unix time (seconds),
+files and TUI use text dates converted here.
+...
+
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime
+from functools import lru_cache
+
+# text format of dates in JSON / CSV files and old Databases
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+# format of dates in TUI account card
+DISPLAY_FORMAT = "%d %b %Y at %H:%M"
+
+DAY = 24 * 60 * 60
+YEAR = 365 * DAY
+
+
+def now() -> int:
+    """
+    Gets current time as Unix time.
+
+    Returns
+    -------
+    int
+        Seconds since epoch
+
+    """
+
+    return int(time.time())
+
+
+def parse_date(value) -> int:
+    """
+    Converts date to Unix time. Accepts Unix time in seconds
+    or milliseconds (int or digits), DATE_FORMAT text in local
+    time and ISO 8601 text, e.g. "2021-03-01T10:00:00Z".
+
+    Parameters
+    ----------
+    value : int | str
+        Date to convert
+
+    Returns
+    -------
+    int
+        Seconds since epoch
+
+    Raises
+    ------
+    ValueError
+        Raises error if value is not a date
+
+    """
+
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"invalid date {value!r}")
+
+    if isinstance(value, str):
+        value = value.strip()
+        if not value.isdigit():
+            return _parse_text(value)
+    # Unix time in milliseconds (Firefox) has more than 11 digits
+    return int(value) // 1000 if len(str(value)) > 11 else int(value)
+
+
+def _parse_text(value: str) -> int:
+    try:
+        return int(datetime.strptime(value, DATE_FORMAT).timestamp())
+    except ValueError:
+        pass
+    try:
+        return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp())
+    except ValueError:
+        raise ValueError(f"invalid date {value!r}") from None
+
+
+def to_text(timestamp: int, date_format: str = DATE_FORMAT) -> str:
+    """
+    Converts Unix time to a local time text date.
+
+    Parameters
+    ----------
+    timestamp : int
+        Seconds since epoch
+    date_format : str
+        strftime format (default is DATE_FORMAT)
+
+    Returns
+    -------
+    str
+        Text date, empty string if timestamp is None
+
+    """
+
+    if timestamp is None:
+        return ""
+    return datetime.fromtimestamp(timestamp).strftime(date_format)
+
+
+@lru_cache(maxsize=4096)
+def format_date(timestamp: int) -> str:
+    """
+    Formats Unix time for TUI, e.g. '21 Dec 2021 at 10:01'.
+    Results are cached, so redrawing a card does not
+    format the same dates again.
+
+    Parameters
+    ----------
+    timestamp : int
+        Seconds since epoch
+
+    Returns
+    -------
+    str
+        Date in DISPLAY_FORMAT
+
+    """
+
+    return to_text(timestamp, DISPLAY_FORMAT)
@@ -0,0 +1,951 @@
+"""
+# TODO: should place some nice text here...
+
+This module is responsible for Accounts import
+and export. Accounts are streamed between files
+and a Database, so memory use does not depend
+on a number of Accounts.
+...
+
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import csv
+import json
+import tempfile
+from datetime import datetime
+from typing import Callable, IO, Iterable, Iterator
+from urllib.parse import urlparse
+
+from twopasswords.utils import timestamps
+from twopasswords.utils.database import Account, DatabaseEngine
+
+# text fields of an Account in a JSON file
+TEXT_FIELDS = ("item", "url", "username", "password", "notes")
+# suffix of an import checkpoint file kept next to an imported file
+CHECKPOINT_SUFFIX = ".part"
+# read / write buffer size of CSV files
+CSV_BUFFER_SIZE = 1024 * 1024
+# longest JSON array element in characters, a syntax error
+# is only detected after so much of a file is buffered
+MAX_ELEMENT_SIZE = 1024 * 1024
+# characters a JSON number may continue with
+NUMBER_TAIL = re.compile(r"[0-9.eE+\-]*")
+
+
+def atomic_writer(filename: str, mode: str = "w", **kwargs):
+    """
+    Opens temporary file next to filename for writing.
+    Temporary file is created with owner only permissions.
+    Use commit_atomic to move it in place when done.
+
+    Parameters
+    ----------
+    filename : str
+        Final file path
+
+    Returns
+    -------
+    tuple[IO, str]
+        Open file and temporary file path
+
+    """
+
+    directory: str = os.path.dirname(os.path.abspath(filename))
+    descriptor, temp_path = tempfile.mkstemp(
+        prefix=".twopasswords-", suffix=".tmp", dir=directory
+    )
+    return os.fdopen(descriptor, mode, **kwargs), temp_path
+
+
+def commit_atomic(out, temp_path: str, filename: str) -> None:
+    """
+    Flushes temporary file to a disk and atomically
+    renames it to filename, so filename is never
+    left partially written.
+
+    """
+
+    out.flush()
+    os.fsync(out.fileno())
+    out.close()
+    os.replace(temp_path, filename)
+
+
+def discard_atomic(out, temp_path: str) -> None:
+    """
+    Closes and removes unfinished temporary file.
+
+    """
+
+    out.close()
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+
+def export_json(
+    database: DatabaseEngine,
+    filename: str,
+    progress: Callable[[int], None] = None,
+    progress_every: int = 1000,
+) -> int:
+    """
+    Exports all Accounts to a JSON file as an array of objects.
+    Accounts are read from a cursor in batches and written
+    one by one, so only a single batch is held in memory.
+    File is written to a temporary file and renamed when done.
+
+    Parameters
+    ----------
+    database : DatabaseEngine
+        Database to export Accounts from
+    filename : str
+        Path to a JSON file
+    progress : Callable[[int], None], optional
+        Called with a number of exported Accounts
+        every progress_every Accounts and when done
+    progress_every : int
+        Progress callback period (default is 1000)
+
+    Returns
+    -------
+    int
+        Number of exported Accounts
+
+    """
+
+    exported: int = 0
+    out, temp_path = atomic_writer(filename)
+    try:
+        out.write("[")
+        for account in database.iter_accounts():
+            if exported:
+                out.write(", ")
+            record: dict = account.as_dict()
+            # text dates keep files compatible with older versions
+            for field in ("date_created", "date_modified"):
+                record[field] = timestamps.to_text(record[field])
+            out.write(json.dumps(record))
+            exported += 1
+            if progress is not None and exported % progress_every == 0:
+                progress(exported)
+        out.write("]")
+        commit_atomic(out, temp_path, filename)
+    except BaseException:
+        discard_atomic(out, temp_path)
+        raise
+
+    if progress is not None:
+        progress(exported)
+    return exported
+
+
+class ImportSummary:
+    """
+    A class used to represent a result of Accounts import.
+    Only first max_rejects rejected elements are kept
+    with a reason, the rest are only counted.
+
+    Attributes
+    ----------
+    inserted : int
+        Number of added Accounts
+    updated : int
+        Number of existing Accounts replaced by newer ones
+    skipped : int
+        Number of Accounts not newer than existing ones
+    resumed : int
+        Number of elements skipped, because they were
+        processed by a previous interrupted import
+    rejected : int
+        Number of invalid elements
+    rejects : list[tuple[int, str]]
+        (element index, reason) of first rejected elements
+    max_rejects : int
+        Maximum number of kept rejects
+
+    """
+
+    def __init__(self, max_rejects: int = 100):
+        self.inserted: int = 0
+        self.updated: int = 0
+        self.skipped: int = 0
+        self.resumed: int = 0
+        self.rejected: int = 0
+        self.rejects: list[tuple[int, str]] = []
+        self.max_rejects = max_rejects
+
+    def reject(self, index: int, reason: str) -> None:
+        """
+        Counts rejected element and keeps a reason.
+
+        Parameters
+        ----------
+        index : int
+            Element index in a JSON array
+        reason : str
+            Why element was rejected
+
+        """
+
+        self.rejected += 1
+        if len(self.rejects) < self.max_rejects:
+            self.rejects.append((index, reason))
+
+    def __str__(self) -> str:
+        lines: list[str] = [
+            f"{self.inserted} inserted, {self.updated} updated, "
+            f"{self.skipped} skipped"
+        ]
+        if self.resumed:
+            lines.append(f"{self.resumed} items were imported before")
+        if self.rejected:
+            lines.append(f"{self.rejected} items were rejected:")
+            lines.extend(f"#{index}: {reason}" for index, reason in self.rejects)
+            if self.rejected > len(self.rejects):
+                lines.append(f"... and {self.rejected - len(self.rejects)} more")
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        return (
+            f"ImportSummary(inserted={self.inserted}, updated={self.updated}, "
+            f"skipped={self.skipped}, resumed={self.resumed}, "
+            f"rejected={self.rejected})"
+        )
+
+
+def iter_json_array(
+    stream: IO[str],
+    buffer_size: int = 65536,
+    max_element_size: int = MAX_ELEMENT_SIZE,
+) -> Iterator[object]:
+    """
+    Parses JSON array from a text stream element by element.
+    Only a current element and a read buffer are held in memory,
+    so memory use depends on the largest element, not a file size.
+    An element that does not decode is read further only until
+    max_element_size, so a corrupted file is never buffered whole.
+
+    Parameters
+    ----------
+    stream : IO[str]
+        Text stream with a JSON array
+    buffer_size : int
+        Number of characters read at once (default is 65536)
+    max_element_size : int
+        Maximum number of characters in an array element
+        (default is MAX_ELEMENT_SIZE)
+
+    Returns
+    -------
+    Iterator[object]
+        Decoded array elements
+
+    Raises
+    ------
+    ValueError
+        Raises error if stream is not a valid JSON array
+
+    """
+
+    decoder = json.JSONDecoder()
+    whitespace = json.decoder.WHITESPACE
+    buffer: str = ""
+    index: int = 0  # current position in buffer
+    consumed: int = 0  # characters dropped from buffer start
+    eof: bool = False
+
+    def fill() -> bool:
+        # drops consumed part of buffer and reads next chunk
+        nonlocal buffer, index, consumed, eof
+        chunk: str = stream.read(buffer_size)
+        if not chunk:
+            eof = True
+            return False
+        consumed += index
+        buffer, index = buffer[index:] + chunk, 0
+        return True
+
+    def next_token() -> str:
+        # skips whitespace, returns next character or "" at the end
+        nonlocal index
+        while True:
+            index = whitespace.match(buffer, index).end()
+            if index < len(buffer) or not fill():
+                return buffer[index : index + 1]
+
+    def grow() -> bool:
+        # reads more of a current element if it is not too long yet
+        return len(buffer) - index <= max_element_size and not eof and fill()
+
+    def finish() -> None:
+        # only whitespace may follow the closing bracket
+        nonlocal index
+        index += 1
+        if next_token():
+            raise ValueError(
+                f"Unexpected data after JSON array at character {consumed + index}"
+            )
+
+    if next_token() != "[":
+        raise ValueError("JSON file should contain an array of accounts")
+    index += 1
+    if next_token() == "]":
+        finish()
+        return
+
+    while True:
+        next_token()
+        while True:
+            try:
+                element, end = decoder.raw_decode(buffer, index)
+            except json.JSONDecodeError as error:
+                # element may continue in a not yet read part of a file
+                if grow():
+                    continue
+                if len(buffer) - index > max_element_size:
+                    raise ValueError(
+                        f"Invalid JSON at character {consumed + index}: element "
+                        f"is longer than {max_element_size} characters or broken "
+                        f"({error.msg})"
+                    ) from None
+                raise ValueError(
+                    f"Invalid JSON at character {consumed + error.pos}: {error.msg}"
+                ) from None
+            # a number may be cut by a buffer end anywhere, e.g. "12|.5"
+            # or "1|e5", read more if it may continue after the end
+            if (
+                isinstance(element, (int, float))
+                and not isinstance(element, bool)
+                and NUMBER_TAIL.match(buffer, end).end() == len(buffer)
+                and grow()
+            ):
+                continue
+            break
+
+        index = end
+        yield element
+
+        token: str = next_token()
+        if token == "]":
+            finish()
+            return
+        if not token:
+            raise ValueError("Unexpected end of JSON file")
+        if token != ",":
+            raise ValueError(f"Expected ',' or ']' at character {consumed + index}")
+        index += 1
+
+
+def _normalize_date(value, now: int) -> int:
+    """
+    Checks Account date and converts it to Unix time,
+    missing date is replaced with now.
+
+    """
+
+    if value is None or value == "":
+        return now
+    return timestamps.parse_date(value)
+
+
+def validate_account(element: object, now: int = None) -> Account:
+    """
+    Validates JSON array element and converts it to an Account.
+    Item, url and username are stripped and may be empty,
+    as in Accounts added with TUI. Password and notes
+    are kept as they are, dates are converted to Unix time
+    (see timestamps.parse_date), missing dates are set to now.
+
+    Parameters
+    ----------
+    element : object
+        Decoded JSON array element
+    now : int, optional
+        Date used for missing dates (default is current time)
+
+    Returns
+    -------
+    Account
+        Normalized Account
+
+    Raises
+    ------
+    ValueError
+        Raises error with a reason if element is not a valid Account
+
+    """
+
+    if not isinstance(element, dict):
+        raise ValueError("account should be an object")
+
+    fields: dict = {}
+    for field in TEXT_FIELDS:
+        value = element.get(field)
+        if value is None:
+            value = ""
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = str(value)
+        elif not isinstance(value, str):
+            raise ValueError(f"{field} should be a string")
+        fields[field] = value
+
+    for field in ("item", "url", "username"):
+        fields[field] = fields[field].strip()
+    if not fields["password"]:
+        raise ValueError("password is missing")
+
+    now = now or timestamps.now()
+    date_created: int = _normalize_date(element.get("date_created"), now)
+    date_modified: int = _normalize_date(element.get("date_modified"), date_created)
+
+    return Account(date_created=date_created, date_modified=date_modified, **fields)
+
+
+def _checkpoint_path(filename: str) -> str:
+    return filename + CHECKPOINT_SUFFIX
+
+
+def _file_stamp(filename: str) -> dict:
+    """
+    Gets size and modification time of a file,
+    so checkpoint of a changed file is not used.
+
+    """
+
+    stat: os.stat_result = os.stat(filename)
+    return {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+
+def read_checkpoint(filename: str) -> int:
+    """
+    Gets number of elements processed by a previous
+    interrupted import of filename.
+
+    Parameters
+    ----------
+    filename : str
+        Path to an imported JSON file
+
+    Returns
+    -------
+    int
+        Number of processed elements, 0 if there
+        is no checkpoint or file was changed since
+
+    """
+
+    try:
+        with open(_checkpoint_path(filename), "r") as checkpoint_file:
+            checkpoint: dict = json.load(checkpoint_file)
+    except (OSError, ValueError):
+        return 0
+
+    if not isinstance(checkpoint, dict) or any(
+        checkpoint.get(key) != value for key, value in _file_stamp(filename).items()
+    ):
+        return 0
+    processed = checkpoint.get("processed")
+    return processed if isinstance(processed, int) and processed > 0 else 0
+
+
+def _write_checkpoint(filename: str, processed: int) -> None:
+    checkpoint: dict = dict(_file_stamp(filename), processed=processed)
+    out, temp_path = atomic_writer(_checkpoint_path(filename))
+    try:
+        out.write(json.dumps(checkpoint))
+        commit_atomic(out, temp_path, _checkpoint_path(filename))
+    except BaseException:
+        discard_atomic(out, temp_path)
+        raise
+
+
+def clear_checkpoint(filename: str) -> None:
+    """
+    Removes import checkpoint of filename, so next
+    import of it starts from the beginning.
+
+    Parameters
+    ----------
+    filename : str
+        Path to an imported JSON file
+
+    """
+
+    if os.path.exists(_checkpoint_path(filename)):
+        os.remove(_checkpoint_path(filename))
+
+
+def _import_elements(
+    database: DatabaseEngine,
+    filename: str,
+    elements: Iterable[object],
+    chunk_size: int,
+    progress: Callable[[ImportSummary], None],
+    resume: bool,
+) -> ImportSummary:
+    """
+    Validates elements read from filename and merges them
+    to a Database in chunks, keeping a checkpoint of filename.
+    See import_json.
+
+    """
+
+    summary = ImportSummary()
+    skip: int = read_checkpoint(filename) if resume else 0
+    now: int = timestamps.now()
+
+    processed: int = 0
+    chunk: list[Account] = []
+
+    def commit() -> None:
+        inserted, updated, skipped = database.upsert_accounts(
+            chunk, chunk_size=chunk_size
+        )
+        summary.inserted += inserted
+        summary.updated += updated
+        summary.skipped += skipped
+        chunk.clear()
+        _write_checkpoint(filename, processed)
+        if progress is not None:
+            progress(summary)
+
+    for index, element in enumerate(elements):
+        processed = index + 1
+        if index < skip:
+            summary.resumed += 1
+            continue
+
+        try:
+            chunk.append(validate_account(element, now))
+        except ValueError as error:
+            summary.reject(index, str(error))
+            continue
+
+        if len(chunk) >= chunk_size:
+            commit()
+
+    if chunk:
+        commit()
+    clear_checkpoint(filename)
+    return summary
+
+
+def import_json(
+    database: DatabaseEngine,
+    filename: str,
+    chunk_size: int = 1000,
+    progress: Callable[[ImportSummary], None] = None,
+    resume: bool = True,
+) -> ImportSummary:
+    """
+    Imports Accounts from a JSON array of objects.
+    Elements are parsed one by one, validated and merged
+    in chunks with DatabaseEngine.upsert_accounts, so Accounts
+    with known (url, username) update existing ones if newer.
+    Every chunk is committed in its own transaction.
+    Invalid elements are rejected without stopping an import.
+
+    After every committed chunk a number of processed elements
+    is saved to a "<filename>.part" checkpoint, so an interrupted
+    import continues after the last committed chunk.
+    Checkpoint is removed when import is done.
+
+    Parameters
+    ----------
+    database : DatabaseEngine
+        Database to import Accounts to
+    filename : str
+        Path to a JSON file
+    chunk_size : int
+        Number of Accounts committed at once (default is 1000)
+    progress : Callable[[ImportSummary], None], optional
+        Called with a current summary after every committed chunk
+    resume : bool
+        Whether to continue from a checkpoint (default is True)
+
+    Returns
+    -------
+    ImportSummary
+        Numbers of inserted, updated, skipped,
+        resumed and rejected elements
+
+    Raises
+    ------
+    ValueError
+        Raises error if file is not a valid JSON array,
+        chunks committed before the error stay in a Database
+
+    """
+
+    with open(filename, "r", encoding="utf-8") as open_file:
+        return _import_elements(
+            database,
+            filename,
+            iter_json_array(open_file),
+            chunk_size,
+            progress,
+            resume,
+        )
+
+
+class CsvProfile:
+    """
+    A class used to represent a CSV layout of another
+    password manager: which CSV column holds which
+    Account field and how dates are written.
+
+    Attributes
+    ----------
+    name : str
+        Profile name shown in TUI
+    columns : dict[str, str]
+        CSV column name by Account field,
+        fields missing from a layout are not listed
+    header : tuple[str]
+        All CSV columns in export order
+    constants : dict[str, str]
+        Values of CSV columns that are not Account fields,
+        written on export
+    dates : str
+        How dates are exported: "text" (timestamps.DATE_FORMAT),
+        "iso" (ISO 8601) or "epoch_ms" (Unix time in milliseconds)
+
+    """
+
+    def __init__(
+        self,
+        name: str,
+        columns: dict[str, str],
+        header: tuple = None,
+        constants: dict[str, str] = None,
+        dates: str = "text",
+    ):
+        self.name = name
+        self.columns = columns
+        self.header = tuple(header or columns.values())
+        self.constants = constants or {}
+        self.dates = dates
+
+    def read(self, row: dict) -> dict:
+        """
+        Converts CSV row to an Account fields dictionary.
+        Item name is taken from url host if layout has no item.
+
+        Parameters
+        ----------
+        row : dict
+            {column name : value} CSV row
+
+        Returns
+        -------
+        dict
+            {field name : value} of an Account
+
+        """
+
+        element: dict = {
+            field: row.get(column) for field, column in self.columns.items()
+        }
+        if not element.get("item") and element.get("url"):
+            element["item"] = urlparse(element["url"]).hostname or element["url"]
+        return element
+
+    def write(self, account: Account) -> list:
+        """
+        Converts Account to a CSV row in header order.
+
+        Parameters
+        ----------
+        account : Account
+            The account that will be written
+
+        Returns
+        -------
+        list
+            CSV row values
+
+        """
+
+        values: dict = dict(self.constants)
+        for field, column in self.columns.items():
+            value = getattr(account, field)
+            if field.startswith("date_"):
+                value = self._export_date(value)
+            values[column] = value
+        return [values.get(column, "") for column in self.header]
+
+    def _export_date(self, value: int) -> str:
+        if value is None:
+            return ""
+        if self.dates == "epoch_ms":
+            return str(value * 1000)
+        if self.dates == "iso":
+            return datetime.fromtimestamp(value).astimezone().isoformat()
+        return timestamps.to_text(value)
+
+    def __repr__(self) -> str:
+        return f"CsvProfile(name={self.name})"
+
+
+CSV_PROFILES: dict[str, CsvProfile] = {
+    profile.name: profile
+    for profile in (
+        CsvProfile(
+            "twopasswords",
+            {
+                "item": "item",
+                "url": "url",
+                "username": "username",
+                "password": "password",
+                "notes": "notes",
+                "date_created": "date_created",
+                "date_modified": "date_modified",
+            },
+        ),
+        CsvProfile(
+            "bitwarden",
+            {
+                "item": "name",
+                "url": "login_uri",
+                "username": "login_username",
+                "password": "login_password",
+                "notes": "notes",
+            },
+            header=(
+                "folder",
+                "favorite",
+                "type",
+                "name",
+                "notes",
+                "fields",
+                "reprompt",
+                "login_uri",
+                "login_username",
+                "login_password",
+                "login_totp",
+            ),
+            constants={"type": "login", "reprompt": "0"},
+        ),
+        CsvProfile(
+            "keepassxc",
+            {
+                "item": "Title",
+                "url": "URL",
+                "username": "Username",
+                "password": "Password",
+                "notes": "Notes",
+                "date_created": "Created",
+                "date_modified": "Last Modified",
+            },
+            header=(
+                "Group",
+                "Title",
+                "Username",
+                "Password",
+                "URL",
+                "Notes",
+                "TOTP",
+                "Icon",
+                "Last Modified",
+                "Created",
+            ),
+            constants={"Group": "Root", "Icon": "0"},
+            dates="iso",
+        ),
+        CsvProfile(
+            "chrome",
+            {
+                "item": "name",
+                "url": "url",
+                "username": "username",
+                "password": "password",
+                "notes": "note",
+            },
+        ),
+        CsvProfile(
+            "firefox",
+            {
+                "url": "url",
+                "username": "username",
+                "password": "password",
+                "date_created": "timeCreated",
+                "date_modified": "timePasswordChanged",
+            },
+            header=(
+                "url",
+                "username",
+                "password",
+                "httpRealm",
+                "formActionOrigin",
+                "guid",
+                "timeCreated",
+                "timeLastUsed",
+                "timePasswordChanged",
+            ),
+            dates="epoch_ms",
+        ),
+    )
+}
+
+
+def _csv_profile(profile: str) -> CsvProfile:
+    try:
+        return CSV_PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Unknown CSV profile {profile}") from None
+
+
+def iter_csv(stream: IO[str], profile: str = "twopasswords") -> Iterator[dict]:
+    """
+    Reads CSV rows one by one and converts them
+    to Account fields dictionaries with a profile.
+
+    Parameters
+    ----------
+    stream : IO[str]
+        Text stream with a CSV file opened with newline=""
+    profile : str
+        CSV profile name, one of CSV_PROFILES (default is "twopasswords")
+
+    Returns
+    -------
+    Iterator[dict]
+        {field name : value} of every row
+
+    Raises
+    ------
+    ValueError
+        Raises error if profile is unknown
+        or CSV header lacks password column
+
+    """
+
+    layout: CsvProfile = _csv_profile(profile)
+    reader = csv.DictReader(stream)
+    if layout.columns["password"] not in (reader.fieldnames or ()):
+        raise ValueError(
+            f"CSV file has no {layout.columns['password']!r} column "
+            f"of {layout.name} format"
+        )
+    for row in reader:
+        yield layout.read(row)
+
+
+def import_csv(
+    database: DatabaseEngine,
+    filename: str,
+    profile: str = "twopasswords",
+    chunk_size: int = 1000,
+    progress: Callable[[ImportSummary], None] = None,
+    resume: bool = True,
+) -> ImportSummary:
+    """
+    Imports Accounts from a CSV file of a given profile.
+    Rows are read one by one and merged the same way as in
+    import_json, with validation, chunked commits and checkpoints.
+
+    Parameters
+    ----------
+    database : DatabaseEngine
+        Database to import Accounts to
+    filename : str
+        Path to a CSV file
+    profile : str
+        CSV profile name, one of CSV_PROFILES (default is "twopasswords")
+    chunk_size : int
+        Number of Accounts committed at once (default is 1000)
+    progress : Callable[[ImportSummary], None], optional
+        Called with a current summary after every committed chunk
+    resume : bool
+        Whether to continue from a checkpoint (default is True)
+
+    Returns
+    -------
+    ImportSummary
+        Numbers of inserted, updated, skipped,
+        resumed and rejected rows
+
+    Raises
+    ------
+    ValueError
+        Raises error if profile is unknown or CSV header does not match it
+
+    """
+
+    # utf-8-sig skips byte order mark written by some exporters
+    with open(
+        filename, "r", encoding="utf-8-sig", newline="", buffering=CSV_BUFFER_SIZE
+    ) as open_file:
+        return _import_elements(
+            database,
+            filename,
+            iter_csv(open_file, profile),
+            chunk_size,
+            progress,
+            resume,
+        )
+
+
+def export_csv(
+    database: DatabaseEngine,
+    filename: str,
+    profile: str = "twopasswords",
+    progress: Callable[[int], None] = None,
+    progress_every: int = 1000,
+) -> int:
+    """
+    Exports all Accounts to a CSV file of a given profile.
+    Accounts are streamed the same way as in export_json.
+
+    Parameters
+    ----------
+    database : DatabaseEngine
+        Database to export Accounts from
+    filename : str
+        Path to a CSV file
+    profile : str
+        CSV profile name, one of CSV_PROFILES (default is "twopasswords")
+    progress : Callable[[int], None], optional
+        Called with a number of exported Accounts
+        every progress_every Accounts and when done
+    progress_every : int
+        Progress callback period (default is 1000)
+
+    Returns
+    -------
+    int
+        Number of exported Accounts
+
+    Raises
+    ------
+    ValueError
+        Raises error if profile is unknown
+
+    """
+
+    layout: CsvProfile = _csv_profile(profile)
+
+    exported: int = 0
+    out, temp_path = atomic_writer(
+        filename, encoding="utf-8", newline="", buffering=CSV_BUFFER_SIZE
+    )
+    try:
+        writer = csv.writer(out)
+        writer.writerow(layout.header)
+        for account in database.iter_accounts():
+            writer.writerow(layout.write(account))
+            exported += 1
+            if progress is not None and exported % progress_every == 0:
+                progress(exported)
+        commit_atomic(out, temp_path, filename)
+    except BaseException:
+        discard_atomic(out, temp_path)
+        raise
+
+    if progress is not None:
+        progress(exported)
+    return exported
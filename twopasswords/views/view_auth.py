@@ -13,6 +13,7 @@ import logging
 import threading
 
 import py_cui
+from sqlcipher3 import dbapi2 as sqlite3
 
 from twopasswords.utils.emailer import Emailer
 from twopasswords.config.config import load_config
@@ -42,6 +43,10 @@ class AuthenticationView:
         Managing login try attempts.
         At init it equals 4, then substracts 1
         after each unseccessful login attempt.
+    scan_timings : str
+        Per stage timings report of last face scan
+    scanner : FaceScanner
+        FaceScanner reused by every face scan retry
     database : DatabaseEngine
         Creates DatabaseEngine instance
         for checking the master password entered.
@@ -51,6 +56,8 @@ class AuthenticationView:
     check_attempts
         Checks login try attempts and stops
         program if there's no attempts left.
+    update_auth_menu
+        Shows last face scan timings and attempts left.
     show_facescan_popup
         Shows 'Scanning your face' popup
         and runs scan_face method as a parallel thread.
@@ -59,7 +66,8 @@ class AuthenticationView:
         checking user's face.
     quit_from_facescan(try_again)
         Stops scan_face or restarts one
-        if try_again = True.
+        if try_again = True. Retry reuses
+        webcam kept open by FaceScanner.
     show_enter_pragma_box
         Shows enter master password input box
         if FaceScan Auth passed successfully.
@@ -73,7 +81,7 @@ class AuthenticationView:
 
     """
 
-    def __init__(self, root: py_cui.PyCUI):
+    def __init__(self, root: py_cui.PyCUI, keep_camera: bool = True, burst: int = 3):
         """
         Sets attempts attribute equal to 4.
         Runs check_attempts and show_facescan_popup
@@ -91,12 +99,26 @@ class AuthenticationView:
             Managing login try attempts.
             At init it equals 4, then substracts 1
             after each unseccessful login attempt.
+        keep_camera : bool
+            Keep webcam open between face scan retries,
+            so a retry skips opening and warm-up
+            (default is True)
+        burst : int
+            Number of frames captured per face scan,
+            scan passes if any of them matches (default is 3)
 
         """
 
         self.root = root
         self.create_ui_content()
         self.attempts: int = 4
+        self.scan_timings: str = ""
+        self.scanner = FaceScanner(
+            file_paths["user_image"],
+            file_paths["last_image"],
+            keep_camera=keep_camera,
+            burst=burst,
+        )
         self.check_attempts()
         self.show_scan_face_popup()
 
@@ -118,13 +140,26 @@ class AuthenticationView:
         self.attempts -= 1
 
         if self.attempts < 1:
+            self.scanner.release_camera()
             self.root.stop()
             self.rage_quit()
 
         else:
-            self.auth_menu.clear()
-            list_of_text = [""] * 25 + [f"Attempts left: {self.attempts}"]
-            self.auth_menu.add_item_list(list_of_text)
+            self.update_auth_menu()
+
+    def update_auth_menu(self):
+        """
+        Updates auth_menu with last face scan
+        timings and attempts left counter.
+
+        """
+
+        self.auth_menu.clear()
+        list_of_text = [""] * 24 + [
+            self.scan_timings,
+            f"Attempts left: {self.attempts}",
+        ]
+        self.auth_menu.add_item_list(list_of_text)
 
     def show_scan_face_popup(self) -> None:
         """
@@ -141,8 +176,8 @@ class AuthenticationView:
 
     def scan_face(self) -> None:
         """
-        Creates FaceScan class instance and
-        checks user's face.
+        Checks user's face with FaceScanner.
+        Webcam is released unless a retry may follow.
         If auth passed successfully,
         continues to master password check.
         Else asks to try again or quits program.
@@ -156,11 +191,14 @@ class AuthenticationView:
             1: "Auth OK",
             2: "Multiple faces detected",
         }
-        result: int = FaceScanner(
-            file_paths["user_image"], file_paths["last_image"]
-        ).auth()
+        result: int = self.scanner.auth()
+        if result not in (0, 2):
+            self.scanner.release_camera()
         self.root.stop_loading_popup()
 
+        self.scan_timings = self.scanner.timings_report()
+        self.update_auth_menu()
+
         # auth succeed, continue to password check
         if result == 1:
             self.show_enter_pragma_box()
@@ -179,7 +217,8 @@ class AuthenticationView:
     def quit_from_facescan(self, try_again):
         """
         Stops scan_face or restarts one
-        if try_again = True.
+        if try_again = True. Retry reuses
+        webcam kept open by FaceScanner.
 
         Parameters
         ----------
@@ -191,6 +230,7 @@ class AuthenticationView:
         if try_again:
             self.show_scan_face_popup()
         else:
+            self.scanner.release_camera()
             self.root.stop()
 
     def show_enter_pragma_box(self):
@@ -209,11 +249,12 @@ class AuthenticationView:
     def check_pragma(self, pragma):
         """
         Checks master password by creating
-        DatabaseEngine instance and trying
-        to get all accounts list as a test.
+        DatabaseEngine instance, which probes
+        a Database schema with the key.
         If operation was successful,
         stops current root PyCUI instance and
-        switches to a main TwoPasswords TUI.
+        switches to a main TwoPasswords TUI
+        passing it the opened DatabaseEngine.
 
         Parameters
         ----------
@@ -223,17 +264,19 @@ class AuthenticationView:
 
         """
 
-        self.database = DatabaseEngine(file_paths["db_path"], pragma)
-
         try:
-            self.database.get_all_accounts()
-            self.root.forget_widget(self.auth_menu)
-            self.root.stop()
-            views_handler.VIEWS_HANDLER.open_view_main(pragma)
-            # views_handler.VIEWS_HANDLER.from_auth_to_main(pragma)
-        except:
+            # a wrong key fails on connect, when key is checked
+            self.database = DatabaseEngine(file_paths["db_path"], pragma)
+        except sqlite3.DatabaseError:
             self.check_attempts()
             self.show_enter_pragma_box()
+            return
+
+        self.root.forget_widget(self.auth_menu)
+        self.root.stop()
+        # already keyed connection is reused by main view
+        views_handler.VIEWS_HANDLER.open_view_main(self.database)
+        # views_handler.VIEWS_HANDLER.from_auth_to_main(self.database)
 
     def rage_quit(self):
         """
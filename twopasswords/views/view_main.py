@@ -7,23 +7,42 @@ This module is responsible for main TwoPasswords app.
 """
 
 import os
-import json
+import queue
 import logging
-import datetime
 import webbrowser
+from concurrent.futures import Future
 
 
 import py_cui
 import pyperclip
+from sqlcipher3 import dbapi2 as sqlite3
+from faker import Faker
 
 
 from twopasswords.config.config import load_config
+from twopasswords.utils import timestamps
+from twopasswords.utils.account_cache import AccountCache, AccountEntry
+from twopasswords.utils.backup import restore_backup, write_backup
 from twopasswords.utils.database import Account, DatabaseEngine
+from twopasswords.utils.face_encoding import remove_reference_encoding
+from twopasswords.utils.pool import ConnectionPool
 from twopasswords.utils.pwd_generator import PasswordGenerator
+from twopasswords.utils.snapshot import list_snapshots, take_snapshot
+from twopasswords.utils.transfer import (
+    CSV_PROFILES,
+    ImportSummary,
+    export_csv,
+    export_json,
+    import_csv,
+    import_json,
+)
 
 # load configuration
 file_paths, email_settings = load_config()
 
+# accounts menu loads next page when selection is this close to the end
+PAGE_MARGIN = 20
+
 
 class MainView:
     """
@@ -34,7 +53,18 @@ class MainView:
     root : py_cui.PyCUI
         Instance of a base PyCUI main interface class
     database : DatabaseEngine
-        Creates DatabaseEngine instance
+        DatabaseEngine instance unlocked on authentication
+    accounts : AccountCache
+        In-memory Accounts cache loaded by read_database,
+        used for browsing Accounts without repeated SQL queries
+    card_account : Account
+        Account shown in account_card_block,
+        None if logo is shown
+    pool : ConnectionPool
+        Connections for long operations run on a worker thread,
+        None if session key is not available
+    ui_tasks : queue.Queue
+        Callbacks from worker threads run on a TUI thread
     all_accounts_menu
         Creates scroll menu on the left side
         for listing all accounts that are stored
@@ -48,14 +78,26 @@ class MainView:
 
     """
 
-    def __init__(self, root: py_cui.PyCUI, pragma: str):
+    def __init__(self, root: py_cui.PyCUI, database: DatabaseEngine):
         """
         Parameters
         ----------
         root : py_cui.PyCUI
             Instance of a base PyCUI main interface class
         database : DatabaseEngine
-            Creates DatabaseEngine instance
+            DatabaseEngine instance already unlocked
+            with the master password on authentication
+        accounts : AccountCache
+            In-memory Accounts cache loaded by read_database,
+            used for browsing Accounts without repeated SQL queries
+        card_account : Account
+            Account shown in account_card_block,
+            None if logo is shown
+        pool : ConnectionPool
+            Connections for long operations run on a worker thread,
+            None if session key is not available
+        ui_tasks : queue.Queue
+            Callbacks from worker threads run on a TUI thread
         all_accounts_menu
             Creates scroll menu on the left side
             for listing all accounts that are stored
@@ -70,17 +112,25 @@ class MainView:
         """
 
         self.root = root
-        self.database = DatabaseEngine(file_paths["db_path"], pragma)
+        self.database = database
+        self.accounts = AccountCache(self.database)
+        self.card_account: Account = None
+        self.pool: ConnectionPool = (
+            ConnectionPool(self.database) if self.database.session_key else None
+        )
+        self.ui_tasks: queue.Queue = queue.Queue()
 
         self.create_ui_content()
         self.read_database()
+        self.show_moved_conflicts()
 
         self.root.add_key_command(py_cui.keys.KEY_M_LOWER, self.show_menu)
         self.root.add_key_command(py_cui.keys.KEY_TAB, self.switch_widget)
+        self.root.set_on_draw_update_func(self.run_ui_tasks)
         self.root.set_status_bar_text("Quit - q | Menu - m ")
 
-        # say bye on exit
-        self.root.run_on_exit(self.say_bye)
+        # close database and say bye on exit
+        self.root.run_on_exit(self.on_exit)
 
     def create_ui_content(self):
         ################ ALL AccountS MENU ################
@@ -101,6 +151,15 @@ class MainView:
         self.all_accounts_menu.add_key_command(
             py_cui.keys.KEY_A_LOWER, self.show_add_form
         )
+        self.all_accounts_menu.add_key_command(
+            py_cui.keys.KEY_X_LOWER, self.toggle_account_mark
+        )
+        self.all_accounts_menu.add_key_command(
+            py_cui.keys.KEY_D_LOWER, self.show_bulk_delete_form
+        )
+        self.all_accounts_menu.add_text_color_rule(
+            AccountEntry.MARK, py_cui.CYAN_ON_BLACK, "startswith"
+        )
 
         # Mamma mia!
         # Updates account_card_block on all_accounts_menu scrolling
@@ -109,7 +168,7 @@ class MainView:
         )
 
         self.all_accounts_menu.set_help_text(
-            "|  (o)pen website |  (a)dd  |  Arrows - scroll, Esc - exit"
+            "|  (o)pen website |  (a)dd  |  mar(x)  |  (d)elete marked  |  Arrows - scroll, Esc - exit"
         )
 
         ################ Account CARD BLOCK ################
@@ -200,6 +259,7 @@ class MainView:
             "2passwords ###          ######   ",
         ]
         self.account_card_block.set_title("2passwords")
+        self.card_account = None
         return logo
 
     ################ MAIN MENU ################
@@ -216,6 +276,12 @@ class MainView:
             "CLEAR DATABASE",
             "Import JSON",
             "Export JSON",
+            "Import CSV",
+            "Export CSV",
+            "Backup",
+            "Restore backup",
+            "Snapshot database",
+            "Stale passwords",
             "--Remove database and user picture files--",
         ]
         self.root.show_menu_popup(
@@ -239,6 +305,18 @@ class MainView:
             self.show_import_popup()
         elif option == "Export JSON":
             self.show_export_popup()
+        elif option == "Import CSV":
+            self.show_import_csv_popup()
+        elif option == "Export CSV":
+            self.show_export_csv_popup()
+        elif option == "Backup":
+            self.show_backup_popup()
+        elif option == "Restore backup":
+            self.show_restore_popup()
+        elif option == "Snapshot database":
+            self.snapshot_database()
+        elif option == "Stale passwords":
+            self.show_stale_accounts()
         elif option == "--Remove database and user picture files--":
             self.show_remove_database_popup()
 
@@ -261,7 +339,9 @@ class MainView:
     def import_json(self, filename):
         """
         Import selected in show_import_popup
-        JSON file with a path = filename to a Database
+        JSON file with a path = filename to a Database.
+        File is parsed and imported in chunks on a worker thread,
+        an interrupted import continues from the last chunk.
 
         Parameters
         ----------
@@ -270,24 +350,36 @@ class MainView:
 
         """
 
-        with open(filename, "r") as open_file:
-            content: dict = json.load(open_file)
+        def import_accounts(database: DatabaseEngine) -> ImportSummary:
+            with database.tuned("bulk"):
+                return import_json(database, filename)
 
-        for element in content:
-            account = Account(
-                item=element.get("item"),
-                url=element.get("url"),
-                username=element.get("username"),
-                password=element.get("password"),
-                notes=element.get("notes"),
-                date_created=element.get("date_created"),
-                date_modified=element.get("date_modified"),
-            )
-            self.database.add_account(account)
-
-        self.root.show_message_popup(
-            "Import Done!", f"{len(content)} items were imported"
+        self.run_in_background(
+            "Importing accounts", import_accounts, self.show_import_summary
         )
+
+    def show_import_summary(self, summary: ImportSummary) -> None:
+        """
+        Shows import result, lists rejected elements if any,
+        and reloads accounts menu.
+
+        Parameters
+        ----------
+        summary : ImportSummary
+            Result of an import
+
+        """
+
+        if summary.rejected:
+            # rejects are listed, so they can be fixed in a file
+            self.root.show_menu_popup(
+                f"{summary.inserted + summary.updated} imported, "
+                f"{summary.rejected} rejected",
+                str(summary).splitlines()[1:],
+                lambda selected: None,
+            )
+        else:
+            self.root.show_message_popup("Import Done!", str(summary))
         self.read_database()
 
     ################ EXPORT JSON ################
@@ -308,7 +400,8 @@ class MainView:
     def export_json(self, filename):
         """
         Export selected in show_export_popup
-        JSON file with a path = filename from a Database
+        JSON file with a path = filename from a Database.
+        Accounts are streamed to a file on a worker thread.
 
         Parameters
         ----------
@@ -317,29 +410,239 @@ class MainView:
 
         """
 
-        out: list = []
-        accounts: list[Account] = self.database.get_all_accounts()
-        for account in accounts:
-            out.append(
-                {
-                    "item": account.item,
-                    "url": account.url,
-                    "username": account.username,
-                    "password": account.password,
-                    "notes": account.notes,
-                    "date_created": account.date_created,
-                    "date_modified": account.date_modified,
-                }
+        def done(exported: int) -> None:
+            self.root.show_message_popup(
+                "Export Done!", f"{exported} items were exported"
             )
 
-        export_data: dict = json.dumps(out)
-        with open(filename, "w") as save_file:
-            save_file.write(export_data)
+        self.run_in_background(
+            "Exporting accounts",
+            lambda database: export_json(database, filename),
+            done,
+            write=False,
+        )
 
-        self.root.show_message_popup(
-            "Export Done!", f"{len(accounts)} items were exported"
+    ################ IMPORT / EXPORT CSV ################
+    def show_import_csv_popup(self):
+        """
+        Shows import CSV file dialog popup,
+        then asks for a CSV format of a selected file.
+
+        """
+
+        self.root.show_filedialog_popup(
+            popup_type="openfile",
+            initial_dir=".",
+            callback=lambda filename: self.show_csv_profile_popup(
+                filename, self.import_csv
+            ),
+            ascii_icons=True,
+            limit_extensions=[".csv"],
         )
-        self.read_database()
+
+    def show_export_csv_popup(self):
+        """
+        Shows export CSV file dialog popup,
+        then asks for a CSV format to write.
+
+        """
+
+        self.root.show_filedialog_popup(
+            popup_type="saveas",
+            initial_dir=".",
+            callback=lambda filename: self.show_csv_profile_popup(
+                filename, self.export_csv
+            ),
+            ascii_icons=True,
+            limit_extensions=[".csv"],
+        )
+
+    def show_csv_profile_popup(self, filename, callback):
+        """
+        Shows CSV format (password manager) selection popup
+        and passes filename and selected format to a callback.
+
+        Parameters
+        ----------
+        filename : str
+            Path to a selected CSV file
+        callback : Callable[[str, str], None]
+            Called with filename and CSV profile name
+
+        """
+
+        self.root.show_menu_popup(
+            "CSV format",
+            list(CSV_PROFILES),
+            lambda profile: callback(filename, profile),
+        )
+
+    def import_csv(self, filename, profile):
+        """
+        Imports CSV file of a given format to a Database.
+        Rows are imported in chunks on a worker thread,
+        the same way as JSON files.
+
+        Parameters
+        ----------
+        filename : str
+            Path to a selected CSV file
+        profile : str
+            CSV profile name
+
+        """
+
+        def import_accounts(database: DatabaseEngine) -> ImportSummary:
+            with database.tuned("bulk"):
+                return import_csv(database, filename, profile)
+
+        self.run_in_background(
+            "Importing accounts", import_accounts, self.show_import_summary
+        )
+
+    def export_csv(self, filename, profile):
+        """
+        Exports all accounts to a CSV file of a given format.
+        Accounts are streamed to a file on a worker thread.
+
+        Parameters
+        ----------
+        filename : str
+            Path to a selected CSV file
+        profile : str
+            CSV profile name
+
+        """
+
+        def done(exported: int) -> None:
+            self.root.show_message_popup(
+                "Export Done!", f"{exported} items were exported to {profile} CSV"
+            )
+
+        self.run_in_background(
+            "Exporting accounts",
+            lambda database: export_csv(database, filename, profile),
+            done,
+            write=False,
+        )
+
+    ################ BACKUP / RESTORE ################
+    def show_backup_popup(self):
+        """
+        Shows backup file dialog popup,
+        then asks for a backup password.
+
+        """
+
+        self.root.show_filedialog_popup(
+            popup_type="saveas",
+            initial_dir=".",
+            callback=lambda filename: self.root.show_text_box_popup(
+                "Backup password",
+                lambda passphrase: self.write_backup(filename, passphrase),
+                password=True,
+            ),
+            ascii_icons=True,
+            limit_extensions=[".2pwbak"],
+        )
+
+    def write_backup(self, filename, passphrase):
+        """
+        Writes encrypted binary backup of all accounts
+        on a worker thread.
+
+        Parameters
+        ----------
+        filename : str
+            Path to a backup file
+        passphrase : str
+            Backup password
+
+        """
+
+        if not passphrase:
+            self.root.show_error_popup("Backup failed", "Password can not be empty")
+            return
+
+        def done(written: int) -> None:
+            self.root.show_message_popup(
+                "Backup Done!", f"{written} items were backed up"
+            )
+
+        self.run_in_background(
+            "Backing up accounts",
+            lambda database: write_backup(database, filename, passphrase),
+            done,
+            write=False,
+        )
+
+    def show_restore_popup(self):
+        """
+        Shows restore file dialog popup,
+        then asks for a backup password.
+
+        """
+
+        self.root.show_filedialog_popup(
+            popup_type="openfile",
+            initial_dir=".",
+            callback=lambda filename: self.root.show_text_box_popup(
+                "Backup password",
+                lambda passphrase: self.restore_backup(filename, passphrase),
+                password=True,
+            ),
+            ascii_icons=True,
+            limit_extensions=[".2pwbak"],
+        )
+
+    def restore_backup(self, filename, passphrase):
+        """
+        Restores accounts from encrypted binary backup
+        on a worker thread.
+
+        Parameters
+        ----------
+        filename : str
+            Path to a backup file
+        passphrase : str
+            Backup password
+
+        """
+
+        def restore(database: DatabaseEngine) -> tuple:
+            with database.tuned("bulk"):
+                return restore_backup(database, filename, passphrase)
+
+        def done(result: tuple) -> None:
+            inserted, updated, skipped = result
+            self.root.show_message_popup(
+                "Restore Done!",
+                f"{inserted} inserted, {updated} updated, {skipped} skipped",
+            )
+            self.read_database()
+
+        self.run_in_background("Restoring accounts", restore, done)
+
+    ################ SNAPSHOT ################
+    def snapshot_database(self):
+        """
+        Takes encrypted snapshot of a Database on a reader
+        thread and rotates old snapshots, TUI stays usable.
+
+        """
+
+        if self.pool is None:
+            self.root.show_error_popup(
+                "Snapshot failed", "Snapshots need a session key, log in again"
+            )
+            return
+
+        def done(filename: str) -> None:
+            self.root.show_message_popup(
+                "Snapshot Done!", f"Saved to {os.path.basename(filename)}"
+            )
+
+        self.run_in_background("Taking snapshot", take_snapshot, done, write=False)
 
     ################ HANDLE ARROW KEY PRESSES IN ALL AccountS MENU ################
     def handle_all_accounts_menu_arrows(self, item):
@@ -350,14 +653,36 @@ class MainView:
 
         Parameters
         ----------
-        item : str
-            Account's Item (description) selected
+        item : AccountEntry
+            Account's menu entry selected
 
         """
 
-        current_account: Account = self.database.get_exact_account(item)
+        current_account: Account = self.accounts.get(item.id)
         self.populate_account_card(current_account)
 
+        # load next page when selection gets close to the end
+        selected: int = self.all_accounts_menu.get_selected_item_index()
+        loaded: int = len(self.all_accounts_menu.get_item_list())
+        if selected >= loaded - PAGE_MARGIN:
+            self.append_accounts_page(self.accounts.load_page())
+
+    def append_accounts_page(self, entries: list) -> None:
+        """
+        Appends loaded account entries to all_accounts_menu,
+        keeps selection and updates menu title.
+
+        Parameters
+        ----------
+        entries : list[AccountEntry]
+            Entries ordered after menu items
+
+        """
+
+        if entries:
+            self.all_accounts_menu.add_item_list(entries)
+        self.set_all_accounts_menu_title()
+
     ################ Clear database ################
     def show_clear_database_popup(self):
         """
@@ -389,14 +714,20 @@ class MainView:
         """
         Shows Yes / No popup for deleting* a Database
         *Note: also deletes user picture file
+        and all Database snapshots
 
         """
 
-        self.root.show_yes_no_popup("ARE YOU SURE ?!", self.remove_database)
+        snapshots: int = len(list_snapshots(self.database))
+        self.root.show_yes_no_popup(
+            f"ARE YOU SURE ?! {snapshots} snapshots will be deleted too",
+            self.remove_database,
+        )
 
     def remove_database(self, to_remove):
         """
-        Deletes database AND user pictire files if to_remove = True
+        Deletes database AND it's snapshots, user pictire
+        and face encoding files if to_remove = True
 
         Parameters
         ----------
@@ -406,8 +737,12 @@ class MainView:
         """
 
         if to_remove:
+            # snapshots are full copies of a Database
+            for snapshot in list_snapshots(self.database):
+                os.remove(snapshot)
             os.remove(file_paths["db_path"])
             os.remove(file_paths["user_image"])
+            remove_reference_encoding(file_paths["user_image"])
             self.root.stop()
 
     ################ Fill database with Fakes! ################
@@ -431,13 +766,22 @@ class MainView:
             Number of fake accounts to fill in
         """
 
-        for _ in range(int(number)):
-            new_account: Account = Account.from_faker()
-            self.database.add_account(new_account)
-        self.root.show_message_popup(
-            "Done!", f"Database was filled with {number} fake accounts"
-        )
-        self.read_database()
+        def fill_accounts(database: DatabaseEngine) -> int:
+            faker = Faker()
+            with database.tuned("bulk"):
+                # fake logins may collide, colliding ones are skipped
+                return database.add_accounts(
+                    (Account.from_faker(faker) for _ in range(int(number))),
+                    skip_duplicates=True,
+                )
+
+        def done(filled: int) -> None:
+            self.root.show_message_popup(
+                "Done!", f"Database was filled with {filled} fake accounts"
+            )
+            self.read_database()
+
+        self.run_in_background("Creating fake accounts", fill_accounts, done)
 
     ################ ADD FORM ################
     def show_add_form(self):
@@ -486,18 +830,25 @@ class MainView:
             form_output["Username"],
             new_password,
             form_output["Notes"],
-            datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            timestamps.now(),
+            timestamps.now(),
         )
 
-        self.database.add_account(new_account)
-        self.read_database(preserve_selected=True)
+        try:
+            new_account.id = self.database.add_account(new_account)
+        # only non-empty (url, username) logins are unique
+        except sqlite3.IntegrityError:
+            self.database.connection.rollback()
+            self.root.show_error_popup(
+                "Account exists",
+                f"{new_account.username} at {new_account.url} is already saved",
+            )
+            return
+        self.database.safe_push()
+        self.accounts.put(new_account)
+        self.refresh_all_accounts_menu()
         self.populate_account_card(new_account)
-
-        new_account_idx: int = self.all_accounts_menu.get_item_list().index(
-            new_account.item
-        )
-        self.all_accounts_menu.set_selected_item_index(new_account_idx)
+        self.select_in_menu(new_account.id)
 
         self.root.show_message_popup(
             "Done", f"Account for {new_account.url} added successfully."
@@ -529,8 +880,9 @@ class MainView:
 
         """
 
-        current_line: str = self.all_accounts_menu.get()
-        current_account: Account = self.database.get_account(current_line)
+        current_account: Account = self.card_account
+        if current_account is None:
+            return
 
         if form_output == "x":
             new_password: str = PasswordGenerator("xkcd", 4).generate_password()
@@ -541,10 +893,10 @@ class MainView:
         else:
             new_password: str = form_output
 
-        self.database.update_account(current_account, new_password)
-        self.read_database(preserve_selected=True)
+        self.database.update_accounts({current_account.id: {"password": new_password}})
+        self.accounts.forget(current_account.id)
 
-        updated_account: Account = self.database.get_account(current_line)
+        updated_account: Account = self.accounts.get(current_account.id)
         self.populate_account_card(updated_account)
 
         self.root.show_message_popup(
@@ -574,12 +926,11 @@ class MainView:
 
         """
 
-        if to_delete:
-            current_line: str = self.all_accounts_menu.get()
-            current_account: Account = self.database.get_account(current_line)
-            self.database.delete_account(current_account)
-
-            self.read_database(preserve_selected=True)
+        if to_delete and self.card_account is not None:
+            current_account: Account = self.card_account
+            self.database.delete_accounts([current_account.id])
+            self.accounts.discard(current_account.id)
+            self.refresh_all_accounts_menu(preserve_selected=True)
 
             self.account_card_block.clear()
             self.account_card_block.add_item_list(self.get_logo())
@@ -590,6 +941,66 @@ class MainView:
         else:
             pass
 
+    ################ BULK DELETE ################
+    def toggle_account_mark(self):
+        """
+        Marks or unmarks account selected in
+        all_accounts_menu for bulk deletion
+
+        """
+
+        entry: AccountEntry = self.all_accounts_menu.get()
+        if entry is not None:
+            self.accounts.toggle_mark(entry.id)
+
+    def show_bulk_delete_form(self):
+        """
+        Show Yes / No delete marked accounts popup,
+        selected account is used if nothing is marked.
+        Passes bool to a callback function
+
+        """
+
+        if not self.accounts.marked():
+            self.toggle_account_mark()
+        if not self.accounts.marked():
+            return
+
+        self.root.show_yes_no_popup(
+            f"Delete {len(self.accounts.marked())} marked accounts? ",
+            self.save_bulk_delete_form_results,
+        )
+
+    def save_bulk_delete_form_results(self, to_delete: bool):
+        """
+        Deletes marked accounts from a Database if to_delete = True,
+        else unmarks them
+
+        Parameters
+        ----------
+        to_delete : bool
+
+        """
+
+        marked: list[int] = self.accounts.marked()
+        if not to_delete:
+            for account_id in marked:
+                self.accounts.toggle_mark(account_id)
+            return
+
+        deleted: int = self.database.delete_accounts(marked)
+        for account_id in marked:
+            self.accounts.discard(account_id)
+        self.refresh_all_accounts_menu(preserve_selected=True)
+
+        if self.card_account is not None and self.card_account.id in marked:
+            self.account_card_block.clear()
+            self.account_card_block.add_item_list(self.get_logo())
+
+        self.root.show_message_popup(
+            "Done", f"{deleted} accounts deleted successfully."
+        )
+
     ################ POPULATION FUNCTIONS ################
     def populate_all_accounts_menu(self, accounts: list) -> None:
         """
@@ -604,8 +1015,18 @@ class MainView:
 
         self.all_accounts_menu.clear()
         self.all_accounts_menu.add_item_list(accounts)
+        self.set_all_accounts_menu_title()
+
+    def set_all_accounts_menu_title(self) -> None:
+        """
+        Shows number of loaded accounts in all_accounts_menu title,
+        with "+" if there are more pages to load.
+
+        """
+
+        more: str = "" if self.accounts.exhausted else "+"
         self.all_accounts_menu.set_title(
-            f"All accounts: {len(self.all_accounts_menu.get_item_list())} items"
+            f"All accounts: {len(self.all_accounts_menu.get_item_list())}{more} items"
         )
 
     def populate_account_card(self, account: Account, reveal_password: bool = False):
@@ -622,6 +1043,7 @@ class MainView:
 
         """
 
+        self.card_account = account
         self.account_card_block.clear()
         self.account_card_block.set_title(account.item)
         structure: list = [
@@ -647,36 +1069,32 @@ class MainView:
         self.account_card_block.add_item_list(structure)
 
     @staticmethod
-    def format_date(datetime_string: str):
+    def format_date(timestamp: int):
         """
         Formats dates in account_card_block menu
-        from '2021-12-21 10:01:20' to '21 Dec 2021 10:01'
+        from Unix time to '21 Dec 2021 at 10:01',
+        formatted dates are cached by timestamps.format_date
 
         Parameters
         ----------
-        datetime_string : str
-            Date as a string that should be formatted
+        timestamp : int
+            Date as Unix time that should be formatted
 
         Returns
         -------
-        new_datetime_object : str
-            Date in a '21 Dec 2021 10:01' format
+        str
+            Date in a '21 Dec 2021 at 10:01' format
 
         """
 
-        datetime_object: str = datetime.datetime.strptime(
-            datetime_string, "%Y-%m-%d %H:%M:%S"
-        )
-        new_datetime_object: str = datetime.datetime.strftime(
-            datetime_object, "%d %b %Y at %H:%M"
-        )
-
-        return new_datetime_object
+        return timestamps.format_date(timestamp)
 
     ################ SEARCH FUNCTION ################
     def search_account_card(self) -> None:
         """
-        Searches Database for account
+        Searches Database for accounts by item, url,
+        username and notes. Opens account if there is
+        a single match, else shows ranked results popup.
 
         """
 
@@ -687,20 +1105,107 @@ class MainView:
             )
             return
 
-        try:
-            result: Account = self.database.get_account(search_value)
-            self.populate_account_card(result)
-            self.root.move_focus(self.account_card_block)
+        # unique exact item name of a loaded Account opens it without SQL
+        if len(self.accounts.by_item.get(search_value, ())) == 1:
+            self.search_textbox.clear()
+            self.select_account(self.accounts.get_by_item(search_value))
+            return
 
-            # set selection on result in all_accounts_menu
-            account_idx: int = self.all_accounts_menu.get_item_list().index(result.item)
-            self.all_accounts_menu.set_selected_item_index(account_idx)
+        results: list[Account] = self.database.search_accounts(search_value)
+        self.search_textbox.clear()
 
-        except:
+        if not results:
             self.root.show_warning_popup(
                 "Search error", "Unable to get such account from database"
             )
-        self.search_textbox.clear()
+        elif len(results) == 1:
+            self.select_account(results[0])
+        else:
+            # numbered labels keep accounts with same item name apart
+            self.search_results: dict = {
+                f"{number}. {account.item} - {account.username}": account
+                for number, account in enumerate(results, start=1)
+            }
+            self.root.show_menu_popup(
+                f"Found {len(results)} accounts",
+                list(self.search_results),
+                self.select_search_result,
+            )
+
+    def show_stale_accounts(self) -> None:
+        """
+        Shows accounts with passwords not changed
+        for more than a year, oldest first.
+        Uses the same popup as search results.
+
+        """
+
+        stale: list[Account] = self.database.get_stale_accounts(timestamps.YEAR)
+        if not stale:
+            self.root.show_message_popup("All good!", "No passwords older than a year")
+            return
+
+        self.search_results: dict = {}
+        for number, account in enumerate(stale, start=1):
+            changed: str = self.format_date(account.date_modified)
+            self.search_results[f"{number}. {account.item} - {changed}"] = account
+        self.root.show_menu_popup(
+            f"{len(stale)} passwords older than a year",
+            list(self.search_results),
+            self.select_search_result,
+        )
+
+    def select_search_result(self, label: str) -> None:
+        """
+        Opens account chosen in search results popup
+
+        Parameters
+        ----------
+        label : str
+            Search result label selected in popup
+
+        """
+
+        self.select_account(self.search_results[label])
+
+    def select_account(self, account: Account) -> None:
+        """
+        Opens account in account_card_block menu,
+        selects it in all_accounts_menu and
+        moves focus to account menu
+
+        Parameters
+        ----------
+        account : Account
+            Account to select
+
+        """
+
+        self.populate_account_card(account)
+        self.root.move_focus(self.account_card_block)
+        self.select_in_menu(account.id)
+
+    def select_in_menu(self, account_id: int) -> None:
+        """
+        Sets selection on account in all_accounts_menu
+
+        Parameters
+        ----------
+        account_id : int
+            The account primary key
+
+        """
+
+        if account_id not in self.accounts.entries:
+            account: Account = self.accounts.get(account_id)
+            if account is None:
+                return
+            self.append_accounts_page(self.accounts.load_through(account))
+
+        for idx, entry in enumerate(self.all_accounts_menu.get_item_list()):
+            if entry.id == account_id:
+                self.all_accounts_menu.set_selected_item_index(idx)
+                return
 
     ################ PREVIEW CARD ################
     def preview_account_card(self):
@@ -709,8 +1214,8 @@ class MainView:
 
         """
 
-        current_account: str = self.all_accounts_menu.get()
-        account_info: Account = self.database.get_account(current_account)
+        current_account: AccountEntry = self.all_accounts_menu.get()
+        account_info: Account = self.accounts.get(current_account.id)
         self.populate_account_card(account_info)
 
     ################ OPEN CARD ################
@@ -721,8 +1226,8 @@ class MainView:
 
         """
 
-        current_account: str = self.all_accounts_menu.get()
-        account_info: Account = self.database.get_account(current_account)
+        current_account: AccountEntry = self.all_accounts_menu.get()
+        account_info: Account = self.accounts.get(current_account.id)
         self.populate_account_card(account_info)
         self.root.move_focus(self.account_card_block)
 
@@ -734,9 +1239,9 @@ class MainView:
 
         """
 
-        account_title: str = self.account_card_block.get_title()
-        account: Account = self.database.get_account(account_title)
-        pyperclip.copy(account.password)
+        if self.card_account is None:
+            return
+        pyperclip.copy(self.card_account.password)
 
     ################ REVEAL PASSWORD ################
     def reveal_password(self):
@@ -745,9 +1250,9 @@ class MainView:
 
         """
 
-        account_title: str = self.account_card_block.get_title()
-        account: Account = self.database.get_account(account_title)
-        self.populate_account_card(account, reveal_password=True)
+        if self.card_account is None:
+            return
+        self.populate_account_card(self.card_account, reveal_password=True)
 
     ################ OPEN WEBBROWSER ################
     def open_website(self):
@@ -757,8 +1262,8 @@ class MainView:
 
         """
 
-        account_title: str = self.all_accounts_menu.get()
-        account: Account = self.database.get_account(account_title)
+        current_account: AccountEntry = self.all_accounts_menu.get()
+        account: Account = self.accounts.get(current_account.id)
         pyperclip.copy(account.password)
         webbrowser.open(account.url)
 
@@ -783,7 +1288,8 @@ class MainView:
     def read_database(self, preserve_selected=False):
         """
         Commits changes to a Database.
-        Loads all items from a Database.
+        Loads the first page of ids and item names to accounts cache,
+        next pages and secrets are loaded on demand.
         Shows an error if Database is not reachable or broken.
 
         Parameters
@@ -794,16 +1300,9 @@ class MainView:
         """
 
         try:
-            selected_account: int = self.all_accounts_menu.get_selected_item_index()
             self.database.safe_push()
-            accounts: list = sorted(
-                account.item for account in self.database.get_all_accounts()
-            )
-
-            self.populate_all_accounts_menu(accounts)
-
-            if preserve_selected:
-                self.all_accounts_menu.set_selected_item_index(selected_account)
+            self.accounts.reload()
+            self.refresh_all_accounts_menu(preserve_selected)
 
         except:
             self.root.show_warning_popup(
@@ -811,6 +1310,134 @@ class MainView:
                 "Unable to open database",
             )
 
+    def show_moved_conflicts(self):
+        """
+        Warns that Database upgrade moved duplicate
+        logins aside, as logins became unique.
+        Moved Accounts are kept, not deleted.
+
+        """
+
+        moved: int = self.database.moved_conflicts
+        if moved:
+            self.root.show_warning_popup(
+                "Duplicate logins",
+                f"{moved} older accounts with the same url and username "
+                "were moved to accounts_conflicts table of your database",
+            )
+
+    def refresh_all_accounts_menu(self, preserve_selected=False):
+        """
+        Fills all_accounts_menu with account entries
+        from accounts cache without querying a Database.
+
+        Parameters
+        ----------
+        preserve_selected : bool
+            To preserve selection in all_accounts_menu
+
+        """
+
+        selected_account: int = self.all_accounts_menu.get_selected_item_index()
+        self.populate_all_accounts_menu(self.accounts.items())
+
+        if preserve_selected:
+            self.all_accounts_menu.set_selected_item_index(selected_account)
+
+    ################ BACKGROUND OPERATIONS ################
+    def run_in_background(
+        self, message: str, operation, on_done, write: bool = True
+    ) -> None:
+        """
+        Shows loading popup and runs Database operation
+        on a pool writer thread, or a reader thread if it only
+        reads, so TUI is not blocked. Runs in place if there is no pool.
+        on_done is called on a TUI thread with operation result,
+        error popup is shown if operation fails.
+
+        Parameters
+        ----------
+        message : str
+            Loading popup message
+        operation : Callable[[DatabaseEngine], Any]
+            Function that writes to (or reads from) a Database
+        on_done : Callable[[Any], None]
+            Function called with operation result
+        write : bool
+            Whether operation writes to a Database (default is True)
+
+        """
+
+        self.root.show_loading_icon_popup("Please Wait", message)
+
+        if self.pool is None:
+            future: Future = Future()
+            try:
+                future.set_result(operation(self.database))
+            except Exception as error:
+                future.set_exception(error)
+            self.finish_background(future, on_done)
+            return
+
+        # done callback runs on a pool thread, finish on a TUI thread
+        submit = self.pool.submit_write if write else self.pool.submit_read
+        future: Future = submit(operation)
+        future.add_done_callback(
+            lambda done: self.ui_tasks.put(
+                lambda: self.finish_background(done, on_done)
+            )
+        )
+
+    def finish_background(self, future: Future, on_done) -> None:
+        """
+        Stops loading popup and passes background
+        operation result to on_done or shows an error.
+
+        Parameters
+        ----------
+        future : Future
+            Finished background operation
+        on_done : Callable[[Any], None]
+            Function called with operation result
+
+        """
+
+        self.root.stop_loading_popup()
+        try:
+            result = future.result()
+        except Exception as error:
+            self.root.show_error_popup("Operation failed", str(error))
+            return
+        on_done(result)
+
+    def run_ui_tasks(self) -> None:
+        """
+        Runs callbacks queued by worker threads.
+        Called by PyCUI on every draw on a TUI thread.
+
+        """
+
+        while True:
+            try:
+                task = self.ui_tasks.get_nowait()
+            except queue.Empty:
+                return
+            task()
+
+    ################ ON EXIT ################
+    def on_exit(self):
+        """
+        Waits for background operations, ends Database
+        session, so session key is wiped from memory,
+        and says bye
+
+        """
+
+        if self.pool is not None:
+            self.pool.close()
+        self.database.end_session()
+        self.say_bye()
+
     ################ SAY BYE ON EXIT ################
     def say_bye(self):
         """
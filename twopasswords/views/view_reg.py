@@ -9,12 +9,14 @@ needed for new user registration:
 
 """
 
+import os
 from time import sleep
 
 import py_cui
 
 from twopasswords.utils import database
 from twopasswords.utils.face_scanner import FaceScanner
+from twopasswords.utils.face_encoding import compute_reference_encoding
 from twopasswords.config.config import load_config
 from twopasswords import views_handler
 
@@ -58,7 +60,7 @@ class RegistrationView:
     populate_welcome_text
         Populates welcome block with text
     take_new_user_image
-        Takes new user photo and saves it on a disk
+        Takes new user photo, saves it and it's encoding on a disk
     show_create_database_popup
         Shows popup with new master password and confirmation inputs
     check_new_pragma
@@ -166,11 +168,26 @@ class RegistrationView:
 
     def take_new_user_image(self):
         """
-        Takes new user photo and saves it on a disk
+        Takes new user photo and saves it on a disk.
+        User face is encoded once here, encoding cache
+        is saved next to a photo and reused on every login.
+        If no face is detected, asks to take photo again.
 
         """
 
-        FaceScanner("", file_paths["user_image"]).take_picture()
+        scanner = FaceScanner("", file_paths["user_image"])
+        image = scanner.take_picture()
+        if image is None:
+            self.root.show_error_popup("Error", "Camera is not available")
+            return
+
+        # reference image is encoded from a file, so wait for it
+        scanner.save_picture(image).join()
+        if compute_reference_encoding(file_paths["user_image"]) is None:
+            os.remove(file_paths["user_image"])
+            self.root.show_error_popup("Error", "No face detected, try again")
+            return
+
         sleep(1)
         self.root.show_message_popup("Done!", "Face registered successfully")
 
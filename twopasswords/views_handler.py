@@ -39,11 +39,11 @@ class ViewsHandler:
             return
         self.authentication_view_window.stop()
 
-    def open_view_main(self, pragma):
+    def open_view_main(self, database):
         self.close_view_registration()
         self.close_view_authentication()
         self.main_view_window = self.create_view()
-        view_main.MainView(self.main_view_window, pragma)
+        view_main.MainView(self.main_view_window, database)
         self.main_view_window.start()
 
     def close_view_main(self):
@@ -58,9 +58,9 @@ class ViewsHandler:
         # self.main_view_window._stopped = False
         # self.main_view_window.start()
 
-    def from_auth_to_main(self, pragma):
+    def from_auth_to_main(self, database):
         self.close_view_authentication()
-        self.open_view_main(self, pragma)
+        self.open_view_main(database)
 
 
 VIEWS_HANDLER = ViewsHandler()